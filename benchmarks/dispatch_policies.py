@@ -0,0 +1,85 @@
+"""Compares the makespan of dispatch policies on random plans.
+
+Random DAGs are executed in simulated time by the real TaskManager and
+dispatch policies, with a fixed number of slots (as under rate limits): every
+tick the policy orders the READY tasks and the first ones take the free slots.
+Agents have different mean task durations, which the policies know from
+history; actual durations vary around them.
+
+    python benchmarks/dispatch_policies.py
+    python benchmarks/dispatch_policies.py --tasks 500 --slots 8 --plans 50
+"""
+
+import argparse
+import heapq
+import logging
+import random
+from typing import Dict, List
+
+from t20.core.common.types import Plan, Task
+from t20.core.orchestration.dispatch import DISPATCH_POLICIES, TaskLatencies, make_dispatch_policy
+from t20.core.orchestration.task_manager import TaskManager
+
+
+def random_plan(n: int, agents: List[str], rng: random.Random, edge_probability: float) -> Plan:
+    """A random DAG: each task depends on earlier tasks with `edge_probability`, mostly recent ones."""
+    tasks = []
+    for i in range(n):
+        candidates = range(max(0, i - 50), i)
+        deps = [f"T{j}" for j in candidates if rng.random() < edge_probability]
+        tasks.append(Task(id=f"T{i}", description="Benchmark step", role="Worker", agent=rng.choice(agents),
+                          deps=deps))
+    return Plan(high_level_goal="Benchmark", reasoning="", roles=[], tasks=tasks)
+
+
+def simulate(plan: Plan, policy_name: str, latencies: TaskLatencies, durations: Dict[str, float], slots: int) -> float:
+    """Returns the simulated makespan of `plan` with `slots` tasks running at a time."""
+    manager = TaskManager(plan)
+    policy = make_dispatch_policy(policy_name, latencies)
+    policy.prepare(manager)
+    now, running = 0.0, []
+    while not manager.is_all_completed():
+        for task in policy.order(manager.get_ready_tasks())[:slots - len(running)]:
+            manager.mark_running(task.id)
+            heapq.heappush(running, (now + durations[task.id], task.id))
+        if not running:
+            raise RuntimeError("Plan cannot finish.")
+        now, task_id = heapq.heappop(running)
+        manager.mark_completed(task_id, "")
+    return now
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=200)
+    parser.add_argument("--slots", type=int, default=4)
+    parser.add_argument("--plans", type=int, default=20)
+    parser.add_argument("--edge-probability", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    rng = random.Random(args.seed)
+    # Mean task duration per agent in seconds, e.g. a fast summarizer next to a slow coder.
+    agent_means = {"Summarizer": 5.0, "Researcher": 20.0, "Writer": 40.0, "Coder": 90.0}
+    latencies = TaskLatencies()
+    for agent, seconds in agent_means.items():
+        latencies.observe(agent, seconds)
+
+    policies = sorted(DISPATCH_POLICIES)
+    totals = {name: 0.0 for name in policies}
+    for _ in range(args.plans):
+        plan = random_plan(args.tasks, list(agent_means), rng, args.edge_probability)
+        durations = {t.id: agent_means[t.agent] * rng.lognormvariate(0, 0.3) for t in plan.tasks}
+        for name in policies:
+            totals[name] += simulate(plan, name, latencies, durations, args.slots)
+
+    print(f"{args.plans} plans of {args.tasks} tasks, {args.slots} slots")
+    print(f"{'policy':<14} {'makespan s':>11} {'vs fifo':>8}")
+    for name in policies:
+        mean = totals[name] / args.plans
+        print(f"{name:<14} {mean:>11.1f} {mean / (totals['fifo'] / args.plans):>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
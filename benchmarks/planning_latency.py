@@ -0,0 +1,86 @@
+"""Compares the latency of single-pass and verbose planning.
+
+The orchestrator plans against a fake model with a fixed latency per call, so
+the measured time is dominated by the number of sequential planning calls.
+
+    python benchmarks/planning_latency.py
+    python benchmarks/planning_latency.py --latency 0.2 --rounds 10
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import logging
+import shutil
+import tempfile
+import time
+
+from t20.core.agents.agent import Agent
+from t20.core.agents.llm import LLM
+from t20.core.common.types import Plan, Role, Task
+from t20.core.data.db import SessionDB
+from t20.core.orchestration.orchestrator import Orchestrator
+from t20.core.system.session import Session
+
+PLAN = Plan(high_level_goal="Goal", reasoning="Split into one writing step.",
+            roles=[Role(title="Writer", purpose="p")],
+            tasks=[Task(id="T1", description="Write", role="Writer", agent="Writer", deps=[])])
+
+
+class PlanningLLM(LLM):
+    """Answers planning calls after a fixed latency."""
+    provider_name = "fake"
+
+    def __init__(self, latency: float) -> None:
+        super().__init__("fake-model")
+        self.latency = latency
+        self.calls = 0
+
+    async def generate_content(self, model_name, contents, system_instruction='', temperature=0.7,
+                               response_mime_type='text/plain', response_schema=None):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        return PLAN if response_schema is Plan else "Free-text plan."
+
+
+def make_orchestrator(mode: str, latency: float) -> Orchestrator:
+    orchestrator = Orchestrator(name="Boss", role="Orchestrator", goal="Plan", model="fake", system_prompt="",
+                                message_bus=None)
+    orchestrator.llm = PlanningLLM(latency)
+    orchestrator.planning_mode = mode
+    orchestrator.team = {"Writer": Agent(name="Writer", role="Writer", goal="Write", model="fake", system_prompt="",
+                                         message_bus=None)}
+    return orchestrator
+
+
+async def measure(orchestrator: Orchestrator, session: Session, rounds: int) -> float:
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):  # the orchestrator prints its plans
+        for _ in range(rounds):
+            await orchestrator.generate_plan(session, "Goal")
+    return (time.perf_counter() - started) / rounds
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds per model call.")
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    project_root = tempfile.mkdtemp()
+    try:
+        session = Session(project_root=project_root)
+        print(f"{'mode':<8} {'calls':>6} {'ms/plan':>9}")
+        for mode in ("single", "verbose"):
+            orchestrator = make_orchestrator(mode, args.latency)
+            elapsed = asyncio.run(measure(orchestrator, session, args.rounds))
+            print(f"{mode:<8} {orchestrator.llm.calls // args.rounds:>6} {elapsed * 1000:>9.1f}")
+    finally:
+        SessionDB._reset_instance()
+        shutil.rmtree(project_root)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""Measures the scheduling overhead of `System.run` per task.
+
+Synthetic plans of 10k-100k tasks are run with a zero-latency agent, so the
+measured time is spent in the TaskManager and the dispatch loop only.
+
+    python benchmarks/scheduler_overhead.py
+    python benchmarks/scheduler_overhead.py --tasks 10000 --shapes chain layered
+"""
+
+import argparse
+import asyncio
+import logging
+import random
+import shutil
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional
+
+from t20.core.agents.agent import Agent
+from t20.core.agents.llm import LLM, register_provider
+from t20.core.common.types import Plan, Role, Task
+from t20.core.data.db import SessionDB
+from t20.core.orchestration.orchestrator import Orchestrator
+from t20.core.system.session import ExecutionContext, Session
+from t20.core.system.system import System
+
+
+def _task(task_id: str, deps: List[str], subtasks: Optional[List[Task]] = None) -> Task:
+    return Task(id=task_id, description="Benchmark step", role="Worker", agent="Worker", deps=deps, subtasks=subtasks)
+
+
+def chain(n: int, rng: random.Random) -> List[Task]:
+    """Every task depends on the previous one."""
+    return [_task(f"T{i}", [f"T{i - 1}"] if i else []) for i in range(n)]
+
+
+def wide(n: int, rng: random.Random) -> List[Task]:
+    """Independent tasks."""
+    return [_task(f"T{i}", []) for i in range(n)]
+
+
+def layered(n: int, rng: random.Random) -> List[Task]:
+    """A random DAG in layers of ~sqrt(n) tasks, each depending on 1-3 tasks of the previous layer."""
+    width = max(1, int(n ** 0.5))
+    tasks: List[Task] = []
+    for i in range(n):
+        layer = i // width
+        previous = range((layer - 1) * width, layer * width) if layer else range(0)
+        deps = [f"T{j}" for j in rng.sample(previous, min(len(previous), rng.randint(1, 3)))]
+        tasks.append(_task(f"T{i}", deps))
+    return tasks
+
+
+def htn(n: int, rng: random.Random) -> List[Task]:
+    """Containers of 10 sequential subtasks, each container depending on the previous one."""
+    tasks = []
+    for c in range(max(1, n // 11)):
+        subtasks = [_task(f"C{c}.{i}", [f"C{c}.{i - 1}"] if i else []) for i in range(10)]
+        tasks.append(_task(f"C{c}", [f"C{c - 1}"] if c else [], subtasks))
+    return tasks
+
+
+SHAPES: Dict[str, Callable[[int, random.Random], List[Task]]] = {
+    "chain": chain, "wide": wide, "layered": layered, "htn": htn}
+
+
+@register_provider("instant")
+class InstantLLM(LLM):
+    """Never called: the agents of InstantSystem do not use their model."""
+
+    async def generate_content(self, model_name, contents, *args, **kwargs):
+        return ""
+
+
+class InstantSystem(System):
+    """A System whose tasks are answered immediately by a fake agent."""
+
+    async def _execute_task(self, task: Task, context: ExecutionContext, stream: bool = False) -> Optional[str]:
+        return task.id
+
+
+async def measure(system: System, plan: Plan) -> float:
+    started = time.perf_counter()
+    async for _ in system.run(plan):
+        pass
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--shapes", nargs="+", choices=sorted(SHAPES), default=list(SHAPES))
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    project_root = tempfile.mkdtemp()
+    try:
+        system = InstantSystem(root_dir=project_root)
+        system.session = Session(project_root=project_root)
+        system.orchestrator = Orchestrator(name="Lead", role="Orchestrator", goal="", model="instant:none",
+                                           system_prompt="", message_bus=system.message_bus)
+        system.agents = [Agent(name="Worker", role="Worker", goal="", model="instant:none", system_prompt="",
+                               message_bus=system.message_bus)]
+        system.task_checkpoints = False  # measure the scheduler, not SQLite
+
+        print(f"{'shape':<8} {'tasks':>8} {'total s':>9} {'us/task':>9}")
+        for n in args.tasks:
+            for shape in args.shapes:
+                tasks = SHAPES[shape](n, random.Random(args.seed))
+                plan = Plan(high_level_goal="Benchmark", reasoning="", roles=[Role(title="Worker", purpose="")],
+                            tasks=tasks)
+                count = sum(1 + len(t.subtasks or []) for t in tasks)
+                elapsed = asyncio.run(measure(system, plan))
+                print(f"{shape:<8} {count:>8} {elapsed:>9.3f} {elapsed / count * 1e6:>9.1f}")
+    finally:
+        SessionDB._reset_instance()
+        shutil.rmtree(project_root)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,24 +4,42 @@ It includes the agent's lifecycle methods, task execution logic, and
 helper functions for agent instantiation and discovery.
 """
 
-import json
 import uuid
+from contextlib import aclosing
 from dataclasses import dataclass, field
 import re
 import logging
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, AsyncIterator, Callable, Optional, Tuple
 
+from t20.core.agents.cascade import CascadeCheckError, get_cascade_config, parse_cascade
 from t20.core.agents.llm import LLM
+from t20.core.agents.metrics import report_repair
+from t20.core.agents.model_routing import get_model_routing
+from t20.core.agents.rate_limit import estimate_tokens
 
 from t20.core.system.session import ExecutionContext, Session
 
 
 logger = logging.getLogger(__name__)
 
-from t20.core.common.types import AgentOutput, Task, AgentProfile, Feedback
+from t20.core.common.types import AgentOutput, Task, AgentProfile, Feedback, File, OutputField, Prompt, TokenDelta
+from t20.core.parsing.json_repair import JSONRepairError, repair_json
+from t20.core.parsing.json_stream import JSONStreamError, StreamingJSONParser, format_path
+from pydantic import ValidationError
+
+# Fields of an AgentOutput that are handled as soon as the model has generated them.
+STREAMED_OUTPUT_FIELDS = [("output",), ("artifact", "files", "*"), ("team", "prompts", "*")]
 
 from t20.core.system.message_bus import MessageBus
 
+
+@dataclass
+class _Attempt:
+    """The outcome of running a task on one model."""
+    output: Optional[AgentOutput] = None
+    files_saved: bool = False
+
+
 class Agent:
     """Represents a runtime agent instance."""
     profile: AgentProfile
@@ -37,7 +55,11 @@ class Agent:
         self.system_prompt = system_prompt
         self.message_bus = message_bus
         logger.debug(f"Agent instance created: {self.profile.name} (Role: {self.profile.role}, Model: {self.model})")
-        self.llm = LLM.factory(model)
+        self.llm = LLM.factory(model, message_bus=message_bus)
+        # Model cascade, cheapest first (see t20.core.agents.cascade); empty to use `model` only.
+        self.cascade: List[str] = []
+        self.llm_prefix = ""
+        self._tier_llms: Dict[str, LLM] = {}
 
     def subscribe(self, topic: str, callback: Any) -> None:
         """Subscribes to a topic on the message bus."""
@@ -61,19 +83,186 @@ class Agent:
 
         logger.debug(f"Agent '{self.profile.name}' system prompt updated:\n{new_prompt}\n")
 
-    async def execute_task(self, context: ExecutionContext, task: Task) -> Optional[str]:
+    async def execute_task(self, context: ExecutionContext, task: Task,
+                           on_delta: Optional[Callable[[TokenDelta], None]] = None) -> Optional[str]:
         """
         Executes a task using the Generative AI model based on the provided context.
 
+        The response is consumed as a stream (see `execute_task_stream`), so files are
+        stored as soon as they are generated and malformed output fails early.
+
         Args:
             context (ExecutionContext): The execution context containing goal, plan, and artifacts.
             task (Task): The task to execute.
+            on_delta (Callable[[TokenDelta], None], optional): Called with each chunk of the raw output.
 
         Returns:
-            Optional[str]: The result of the task execution as a string, or an error string.
+            Optional[str]: The validated (and, if needed, repaired) AgentOutput as JSON.
+        """
+        outcome = _Attempt()
+        async with aclosing(self._execute_stream(context, task, outcome)) as stream:
+            async for delta in stream:
+                if on_delta:
+                    on_delta(delta)
+        return outcome.output.model_dump_json() if outcome.output else None
+
+    async def execute_task_stream(self, context: ExecutionContext, task: Task) -> AsyncIterator[TokenDelta]:
+        """
+        Executes a task like `execute_task`, yielding the model's output as it is generated.
+
+        The output is parsed incrementally: `output`, each file and each prompt is handled
+        by `_handle_output_field` as soon as it is complete, and the request is aborted at
+        the first invalid field. With a model cascade (see `t20.core.agents.cascade`), a
+        tier whose output is invalid or rejected escalates the task to the next tier, which
+        restarts the output at `index` 0; files are then only stored once accepted.
+
+        Args:
+            context (ExecutionContext): The execution context containing goal, plan, and artifacts.
+            task (Task): The task to execute.
+
+        Yields:
+            TokenDelta: The next chunk of the agent's raw output.
+
+        Raises:
+            JSONStreamError: If a streamed output field is invalid.
+            JSONRepairError: If the output cannot be repaired into an AgentOutput document.
         """
+        async with aclosing(self._execute_stream(context, task, _Attempt())) as stream:
+            async for delta in stream:
+                yield delta
+
+    async def _execute_stream(self, context: ExecutionContext, task: Task, outcome: "_Attempt") -> AsyncIterator[TokenDelta]:
+        """Runs `execute_task_stream` and leaves the output of the tier that served the task in `outcome`."""
+        prompt = self._prepare_task(context, task)
+
+        tiers = self._cascade_tiers(task, prompt)
+        escalations: List[str] = []
+        for tier, (model, llm) in enumerate(tiers):
+            final = tier == len(tiers) - 1
+            attempt = _Attempt()
+            try:
+                async for delta in self._stream_output(context, task, prompt, model, llm, tier, attempt, store_files=final):
+                    yield delta
+                if not final:
+                    reason = get_cascade_config().rejection(attempt.output, task)
+                    if reason:
+                        raise CascadeCheckError(reason)
+            except (JSONStreamError, JSONRepairError, ValidationError, CascadeCheckError) as e:
+                if final:
+                    raise
+                logger.info(f"Escalating task {task.id} of {self.profile.name} from {model} to {tiers[tier + 1][0]}: {e}")
+                escalations.append(f"{model}: {e}")
+                continue
+
+            if len(tiers) > 1:
+                context.record_artifact("cascade.json", {
+                    "tiers": [name for name, _ in tiers], "served_by": model, "tier": tier, "escalations": escalations,
+                }, task)
+            self._complete_task(context, task, attempt.output, files_saved=attempt.files_saved)
+            outcome.output, outcome.files_saved = attempt.output, attempt.files_saved
+            return
+
+    def model_for(self, context: ExecutionContext, task: Task) -> str:
+        """Returns the model `task` will be sent to first, e.g. to apply per-model caps before it runs."""
+        # Only routing rules look at the prompt (its size), so it is not built without them.
+        prompt = self._build_prompt(context, task) if get_model_routing().rules and not self.cascade else ""
+        return self._cascade_models(task, prompt)[0]
+
+    def _cascade_models(self, task: Task, prompt: str, log: bool = False) -> List[str]:
+        """
+        Returns the models to try for `task`, cheapest first: the agent's own cascade, the model
+        of the first matching routing rule, the cascade configured for the agent or role, or
+        the agent's model.
+        """
+        models = self.cascade
+        routing = get_model_routing()
+        if not models and routing.rules:
+            prompt_tokens = estimate_tokens(self.system_instructions) + estimate_tokens(prompt)
+            routed = routing.model_for(self.profile.name, task, prompt_tokens)
+            if routed:
+                if log:
+                    logger.info(f"Routing task {task.id} of {self.profile.name} (~{prompt_tokens} prompt tokens) to {routed}")
+                models = parse_cascade(routed)
+        return models or get_cascade_config().tiers_for(self.profile.name, task.role) or [self.model]
+
+    def _cascade_tiers(self, task: Task, prompt: str) -> List[Tuple[str, LLM]]:
+        """Returns the models to try for `task` (see `_cascade_models`) with their LLMs."""
+        models = self._cascade_models(task, prompt, log=True)
+        if models == [self.model]:
+            return [(self.model, self.llm)]
+        for model in models:
+            if model not in self._tier_llms:
+                self._tier_llms[model] = LLM.factory(self.llm_prefix + model, message_bus=self.message_bus)
+        return [(model, self._tier_llms[model]) for model in models]
+
+    async def _stream_output(self, context: ExecutionContext, task: Task, prompt: str, model: str, llm: LLM,
+                             tier: int, attempt: "_Attempt", store_files: bool) -> AsyncIterator[TokenDelta]:
+        """Streams one model's output for `task` and leaves the validated AgentOutput in `attempt`."""
+        parser: Optional[StreamingJSONParser] = StreamingJSONParser(watch=STREAMED_OUTPUT_FIELDS)
+        chunks: List[str] = []
+        stream = llm.generate_stream(
+            model_name=model,
+            contents=prompt,
+            system_instruction=self.system_instructions,
+            temperature=0.1,
+            response_mime_type='application/json',
+            response_schema=AgentOutput
+        )
+        async with aclosing(stream):
+            async for text in stream:
+                if parser is not None:
+                    try:
+                        fields = parser.feed(text)
+                    except JSONStreamError as e:
+                        # Malformed but possibly repairable: stop acting on fields and repair the complete text.
+                        logger.warning(f"Output of {self.profile.name} is not well-formed JSON, repairing it once complete: {e}")
+                        parser = None
+                    else:
+                        for path, value in fields:
+                            self._handle_output_field(context, task, path, value, store=store_files)
+                yield TokenDelta(task_id=task.id, agent=self.profile.name, index=len(chunks), text=text, tier=tier)
+                chunks.append(text)
+
+        document = None
+        if parser is not None:
+            try:
+                document = parser.close()
+            except JSONStreamError as e:
+                logger.warning(f"Output of {self.profile.name} is incomplete, repairing it: {e}")
+        if document is None:
+            repaired = repair_json("".join(chunks), AgentOutput)
+            report_repair(repaired.repairs)
+            attempt.output = repaired.value
+        else:
+            attempt.output = AgentOutput.model_validate(document)
+            attempt.files_saved = store_files
+
+    def _handle_output_field(self, context: ExecutionContext, task: Task, path: tuple, value: Any, store: bool = True) -> None:
+        """Validates a streamed output field, stores it if it is a file (and `store` is set) and publishes it as an OutputField."""
+        try:
+            if path[0] == "output" and not isinstance(value, str):
+                raise JSONStreamError(f"'output' must be a string, got {type(value).__name__}.")
+            if path[0] == "artifact":
+                file = File.model_validate(value)
+                if store:
+                    context.session.add_artifact(file.path, file.content)
+            elif path[0] == "team":
+                Prompt.model_validate(value)
+        except ValidationError as e:
+            raise JSONStreamError(f"Invalid '{format_path(path)}' in the output of {self.profile.name}: {e}") from e
+        if self.message_bus:
+            self.message_bus.publish("output_field", OutputField(
+                task_id=task.id, agent=self.profile.name, path=format_path(path), value=value))
+
+    def _prepare_task(self, context: ExecutionContext, task: Task) -> str:
+        """Builds the task prompt and records it, with the agent's instructions, in the context."""
         context.record_artifact(f"{self.profile.name}_instructions.txt", self.system_instructions, task)
+        prompt = self._build_prompt(context, task)
+        context.record_artifact(f"{self.profile.name}_prompt.txt", prompt, task)
+        return prompt
 
+    def _build_prompt(self, context: ExecutionContext, task: Task) -> str:
+        """Builds the task prompt from the plan and the artifacts of the task's dependencies."""
         required_task_ids = ['initial']
         required_task_ids.extend(task.deps)
 
@@ -109,21 +298,28 @@ class Agent:
 
         prompt = "\n\n".join(task_prompt)
 
-        context.record_artifact(f"{self.profile.name}_prompt.txt", prompt, task)
+        return prompt
 
-        ret = await self._run(prompt)
+    def _complete_task(self, context: ExecutionContext, task: Task, ret: Any, files_saved: bool = False) -> None:
+        """
+        Validates the agent's output and stores the files it produced.
 
+        Args:
+            ret (Any): The output as JSON text, the parsed document or an AgentOutput.
+            files_saved (bool): The files were already stored while the output was streamed.
+        """
         logger.info(f"Agent '{self.profile.name}' completed task: {task.description}")
 
         print(f"\n====== Task '{task.id}' <= {task.deps} ======\n[{task.agent} | {task.role}] \"{task.description}\"\n")
 
-        response = AgentOutput.model_validate_json(ret)
+        response = AgentOutput.model_validate_json(ret) if isinstance(ret, str) else AgentOutput.model_validate(ret)
 
         print(f"\n--- Output:\n{response.output}\n")
         if response.artifact and response.artifact.files:
             for file in response.artifact.files:
                 print(f"\n--- File: {file.path}\n{file.content}\n")
-                context.session.add_artifact(file.path, file.content)
+                if not files_saved:
+                    context.session.add_artifact(file.path, file.content)
         if response.team:
             print(f"\n--- Team:\n\"{response.team.notes}\"")
             if response.team.prompts:
@@ -131,34 +327,6 @@ class Agent:
         if response.reasoning:
             print(f"\n--- Reasoning:\n{response.reasoning}\n")
 
-        return ret
-
-
-    async def _run(self, prompt: str) -> Optional[str]:
-        try:
-            response = await self.llm.generate_content(
-                model_name=self.model,
-                contents=prompt,
-                system_instruction=self.system_instructions,
-                temperature=0.1,
-                response_mime_type='application/json',
-                response_schema=AgentOutput
-            )
-
-            if isinstance(response, AgentOutput):
-                result = response.model_dump_json(indent=4)
-            else:
-                if isinstance(response, str):
-                    result = response
-                else:
-                    result = json.dumps(response)
-
-        except Exception as e:
-            logger.exception(f"Error executing task for {self.profile.name}: {e}")
-            return f"Error executing task for {self.profile.name}: {e}"
-
-        return result
-
 def find_agent_by_role(agents: List[Agent], role: str) -> Optional[Agent]:
     """
     Finds an agent in a list by its role.
@@ -0,0 +1,87 @@
+"""This module provides model cascades: cheap models first, larger ones on demand.
+
+A cascade lists models from cheapest to most capable, e.g.
+`ollama:qwen2.5 -> gemini-2.5-flash-lite -> gemini-2.5-pro`. An agent runs a
+task on the first tier and escalates to the next one only when the output
+cannot be parsed into an AgentOutput or fails the acceptance check. Cascades
+are set per agent (the `cascade:` key of its YAML) or per agent name and task
+role in the `llm_cascade` section of the runtime configuration.
+"""
+
+import importlib
+import logging
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from t20.core.common.types import AgentOutput, Task
+
+logger = logging.getLogger(__name__)
+
+
+class CascadeCheckError(ValueError):
+    """Raised when a tier's output is rejected by the acceptance check."""
+
+
+def parse_cascade(spec: Union[str, List[str], None]) -> List[str]:
+    """Parses `"a -> b -> c"` (or a list of models) into the list of tiers."""
+    if not spec:
+        return []
+    tiers = spec.split("->") if isinstance(spec, str) else spec
+    return [str(tier).strip() for tier in tiers if str(tier).strip()]
+
+
+def _load_check(path: str) -> Callable[[AgentOutput, Task], bool]:
+    module_name, _, attr = path.partition(":")
+    return getattr(importlib.import_module(module_name), attr)
+
+
+class CascadeConfig:
+    """
+    Cascades and acceptance check shared by all agents (the `llm_cascade` section of the runtime configuration).
+    """
+
+    def __init__(self, agents: Optional[Dict[str, Any]] = None, roles: Optional[Dict[str, Any]] = None,
+                 min_output_chars: int = 1, require_files: bool = False, check: Optional[str] = None):
+        """
+        Args:
+            agents (Dict[str, Any]): Cascades by agent name.
+            roles (Dict[str, Any]): Cascades by task role, used for agents without their own cascade.
+            min_output_chars (int): Escalate if the `output` text is shorter than this.
+            require_files (bool): Escalate if the output contains no files.
+            check (str, optional): A `module:function` called with the AgentOutput and the Task;
+                escalate if it returns False.
+        """
+        self.agents = {name.lower(): parse_cascade(spec) for name, spec in (agents or {}).items()}
+        self.roles = {role.lower(): parse_cascade(spec) for role, spec in (roles or {}).items()}
+        self.min_output_chars = min_output_chars
+        self.require_files = require_files
+        self.check = _load_check(check) if check else None
+
+    def tiers_for(self, agent: str, role: str) -> List[str]:
+        """Returns the configured cascade for an agent and task role (empty if there is none)."""
+        return self.agents.get(agent.lower()) or self.roles.get(role.lower()) or []
+
+    def rejection(self, output: AgentOutput, task: Task) -> Optional[str]:
+        """Returns why `output` is not good enough for `task`, or None if it is accepted."""
+        if len(output.output.strip()) < self.min_output_chars:
+            return f"output is shorter than {self.min_output_chars} characters"
+        if self.require_files and not (output.artifact and output.artifact.files):
+            return "output contains no files"
+        if self.check is not None and not self.check(output, task):
+            return f"output rejected by {self.check.__module__}.{self.check.__name__}"
+        return None
+
+
+_cascade_config = CascadeConfig()
+
+
+def configure_cascade(config: Optional[Dict[str, Any]]) -> CascadeConfig:
+    """Installs the process-wide cascades from the `llm_cascade` section of the runtime configuration."""
+    global _cascade_config
+    _cascade_config = CascadeConfig(**{k: v for k, v in (config or {}).items()
+                                       if k in ("agents", "roles", "min_output_chars", "require_files", "check")})
+    return _cascade_config
+
+
+def get_cascade_config() -> CascadeConfig:
+    """Returns the process-wide cascades."""
+    return _cascade_config
@@ -0,0 +1,262 @@
+"""This module provides per-provider circuit breakers for LLM calls.
+
+A breaker guards one `provider:model` key. It opens after a number of
+consecutive failures (transient errors, or calls slower than the latency
+budget) and then fails fast, or sends the call to a fallback species, instead
+of letting every task sit through the full retry schedule. After a cool-down
+the breaker is half-open and lets a single probe request through: success
+closes it, failure opens it again. State changes are published on the
+MessageBus.
+"""
+
+import asyncio
+import logging
+import time
+from enum import Enum
+from typing import Any, AsyncIterator, Dict, Optional
+
+from pydantic import BaseModel
+
+from t20.core.agents.llm import LLM, LLMWrapper, CircuitOpenError, current_call
+from t20.core.agents.retry import get_retry_policy
+
+logger = logging.getLogger(__name__)
+
+BREAKER_TOPIC = "circuit_breaker"
+
+
+class CircuitState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class BreakerEvent(BaseModel):
+    """Published on the MessageBus whenever a circuit breaker changes state."""
+    key: str
+    state: CircuitState
+    previous: CircuitState
+    reason: str
+
+
+class CircuitBreaker:
+    """
+    The state machine of one `provider:model` key.
+    """
+
+    def __init__(self, key: str, failure_threshold: int = 5, latency_budget: Optional[float] = None,
+                 reset_timeout: float = 30.0, fallback: Optional[str] = None):
+        """
+        Args:
+            key (str): The `provider:model` key this breaker guards.
+            failure_threshold (int): Consecutive failures that open the breaker.
+            latency_budget (float, optional): Calls slower than this many seconds count as failures.
+            reset_timeout (float): Seconds the breaker stays open before a probe is allowed.
+            fallback (str, optional): Species that serves calls while the breaker is open.
+        """
+        self.key = key
+        self.failure_threshold = failure_threshold
+        self.latency_budget = latency_budget
+        self.reset_timeout = reset_timeout
+        self.fallback = fallback
+        self.state = CircuitState.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.probe_in_flight = False
+        self.trips = 0
+
+    def _transition(self, state: CircuitState, reason: str) -> BreakerEvent:
+        event = BreakerEvent(key=self.key, state=state, previous=self.state, reason=reason)
+        logger.warning(f"Circuit breaker '{self.key}': {self.state.value} -> {state.value} ({reason})")
+        self.state = state
+        if state == CircuitState.OPEN:
+            self.opened_at = time.monotonic()
+            self.trips += 1
+        return event
+
+    def before_call(self) -> Optional[BreakerEvent]:
+        """
+        Admits a call, or raises CircuitOpenError.
+
+        Returns:
+            Optional[BreakerEvent]: The transition to half-open, if this call is the probe.
+        """
+        if self.state == CircuitState.CLOSED:
+            return None
+        if self.state == CircuitState.OPEN:
+            remaining = self.reset_timeout - (time.monotonic() - self.opened_at)
+            if remaining > 0:
+                raise CircuitOpenError(f"Circuit breaker '{self.key}' is open (next probe in {remaining:.1f}s).")
+            self.probe_in_flight = True
+            return self._transition(CircuitState.HALF_OPEN, "sending a probe request")
+        if self.probe_in_flight:
+            raise CircuitOpenError(f"Circuit breaker '{self.key}' is half-open and waiting for its probe.")
+        self.probe_in_flight = True
+        return None
+
+    def after_call(self, latency: Optional[float], ok: bool) -> Optional[BreakerEvent]:
+        """Records the outcome of an admitted call and returns the resulting transition, if any."""
+        probe, self.probe_in_flight = self.probe_in_flight, False
+        if ok and self.latency_budget is not None and latency is not None and latency > self.latency_budget:
+            ok = False
+            reason = f"latency {latency:.1f}s over budget of {self.latency_budget}s"
+        else:
+            reason = "call failed"
+
+        if ok:
+            self.consecutive_failures = 0
+            if self.state != CircuitState.CLOSED:
+                return self._transition(CircuitState.CLOSED, "probe succeeded" if probe else "call succeeded")
+            return None
+
+        self.consecutive_failures += 1
+        if probe and self.state == CircuitState.HALF_OPEN:
+            return self._transition(CircuitState.OPEN, f"probe failed: {reason}")
+        if self.state == CircuitState.CLOSED and self.consecutive_failures >= self.failure_threshold:
+            return self._transition(CircuitState.OPEN, f"{self.consecutive_failures} consecutive failures, last: {reason}")
+        return None
+
+    def release(self) -> None:
+        """Gives the probe slot back when an admitted call was cancelled."""
+        self.probe_in_flight = False
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "state": self.state.value,
+            "consecutive_failures": self.consecutive_failures,
+            "trips": self.trips,
+            "fallback": self.fallback,
+        }
+
+
+class BreakerRegistry:
+    """
+    Shared registry of CircuitBreakers, configured like the rate limits:
+    `provider:model`, then `provider`, then `default`.
+    """
+
+    SETTING_KEYS = ("failure_threshold", "latency_budget", "reset_timeout", "fallback")
+
+    def __init__(self) -> None:
+        self._settings: Dict[str, Dict[str, Any]] = {}
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def configure(self, settings: Optional[Dict[str, Dict[str, Any]]]) -> None:
+        """Replaces the configured settings (the `llm_breakers` section of the runtime configuration)."""
+        self._settings = {key: dict(value or {}) for key, value in (settings or {}).items()}
+        self._breakers.clear()
+
+    def get(self, provider: str, model: str) -> CircuitBreaker:
+        key = f"{provider}:{model}"
+        breaker = self._breakers.get(key)
+        if breaker is None:
+            settings: Dict[str, Any] = {}
+            for source in ("default", provider, key):
+                settings.update(self._settings.get(source, {}))
+            breaker = CircuitBreaker(key, **{k: v for k, v in settings.items() if k in self.SETTING_KEYS})
+            self._breakers[key] = breaker
+        return breaker
+
+    def states(self) -> Dict[str, Dict[str, Any]]:
+        """Returns the state of every breaker that has seen a call."""
+        return {key: breaker.as_dict() for key, breaker in self._breakers.items()}
+
+
+_registry = BreakerRegistry()
+
+
+def get_breaker_registry() -> BreakerRegistry:
+    """Returns the process-wide circuit breaker registry."""
+    return _registry
+
+
+class CircuitBreakerLLM(LLMWrapper):
+    """
+    Fails fast, or calls the fallback species, while the provider's breaker is open.
+    Only transient errors (see RetryPolicy.is_retryable) and slow calls count as failures.
+    """
+
+    def __init__(self, inner: LLM, registry: Optional[BreakerRegistry] = None, message_bus: Any = None,
+                 allow_fallback: bool = True) -> None:
+        super().__init__(inner)
+        self.registry = registry or get_breaker_registry()
+        self.message_bus = message_bus
+        self.allow_fallback = allow_fallback
+        self._fallbacks: Dict[str, LLM] = {}
+
+    def _publish(self, event: Optional[BreakerEvent]) -> None:
+        if event is not None and self.message_bus:
+            self.message_bus.publish(BREAKER_TOPIC, event)
+
+    def _fallback(self, breaker: CircuitBreaker) -> Optional[LLM]:
+        if not (self.allow_fallback and breaker.fallback) or breaker.fallback == breaker.key:
+            return None
+        fallback = self._fallbacks.get(breaker.fallback)
+        if fallback is None:
+            from t20.core.agents.rate_limit import RateLimitedLLM
+            fallback = CircuitBreakerLLM(RateLimitedLLM(LLM.provider(breaker.fallback)), self.registry,
+                                         self.message_bus, allow_fallback=False)
+            self._fallbacks[breaker.fallback] = fallback
+        logger.info(f"Circuit breaker '{breaker.key}' is open, using fallback '{breaker.fallback}'")
+        record = current_call.get()
+        if record is not None:
+            record.provider, record.model = fallback.provider_name, fallback.species
+        return fallback
+
+    def _is_failure(self, error: Exception) -> bool:
+        return get_retry_policy().is_retryable(error)
+
+    async def generate_content(self, model_name: str, contents: str, system_instruction: str = '',
+                               temperature: float = 0.7, response_mime_type: str = 'text/plain',
+                               response_schema: Any = None, **options: Any) -> Optional[Any]:
+        breaker = self.registry.get(self.provider_name, self.species)
+        try:
+            self._publish(breaker.before_call())
+        except CircuitOpenError:
+            fallback = self._fallback(breaker)
+            if fallback is None:
+                raise
+            return await fallback.generate_content(fallback.species, contents, system_instruction,
+                                                   temperature, response_mime_type, response_schema, **options)
+
+        started = time.monotonic()
+        try:
+            response = await self.inner.generate_content(model_name, contents, system_instruction,
+                                                         temperature, response_mime_type, response_schema, **options)
+        except asyncio.CancelledError:
+            breaker.release()
+            raise
+        except Exception as ex:
+            self._publish(breaker.after_call(None, ok=not self._is_failure(ex)))
+            raise
+        self._publish(breaker.after_call(time.monotonic() - started, ok=response is not None))
+        return response
+
+    async def generate_stream(self, model_name: str, contents: str, system_instruction: str = '',
+                              temperature: float = 0.7, response_mime_type: str = 'text/plain',
+                              response_schema: Any = None, **options: Any) -> AsyncIterator[str]:
+        breaker = self.registry.get(self.provider_name, self.species)
+        try:
+            self._publish(breaker.before_call())
+        except CircuitOpenError:
+            fallback = self._fallback(breaker)
+            if fallback is None:
+                raise
+            async for chunk in fallback.generate_stream(fallback.species, contents, system_instruction,
+                                                        temperature, response_mime_type, response_schema, **options):
+                yield chunk
+            return
+
+        started = time.monotonic()
+        try:
+            async for chunk in self.inner.generate_stream(model_name, contents, system_instruction,
+                                                          temperature, response_mime_type, response_schema, **options):
+                yield chunk
+        except Exception as ex:
+            self._publish(breaker.after_call(None, ok=not self._is_failure(ex)))
+            raise
+        except BaseException:
+            # Cancelled, or the consumer stopped reading.
+            breaker.release()
+            raise
+        self._publish(breaker.after_call(time.monotonic() - started, ok=True))
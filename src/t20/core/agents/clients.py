@@ -0,0 +1,153 @@
+"""This module provides the central registry of LLM provider clients.
+
+All provider SDK clients are built here on top of one shared, tuned HTTP
+connection pool (an httpx transport) per event loop, so that connections,
+keep-alive and HTTP/2 settings are shared and configured in one place. The
+registry can also warm up connections before the first task needs them.
+"""
+
+import asyncio
+import logging
+import weakref
+from typing import Any, Callable, Dict, Iterable, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+class HttpPoolConfig:
+    """
+    Settings of the shared HTTP pool (the `http_pool` section of the runtime configuration).
+    """
+
+    def __init__(self, max_connections: int = 100, max_keepalive_connections: int = 20,
+                 keepalive_expiry: float = 60.0, http2: bool = True, connect_timeout: float = 10.0,
+                 read_timeout: Optional[float] = 600.0):
+        """
+        Args:
+            max_connections (int): Maximum number of open connections across all providers.
+            max_keepalive_connections (int): Idle connections kept open for reuse.
+            keepalive_expiry (float): Seconds an idle connection is kept open.
+            http2 (bool): Use HTTP/2 where the server supports it (requires the `h2` package).
+            connect_timeout (float): Seconds to establish a connection.
+            read_timeout (float, optional): Seconds to wait for response data (long generations stream slowly).
+        """
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.keepalive_expiry = keepalive_expiry
+        self.http2 = http2 and self._h2_available()
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+
+    @staticmethod
+    def _h2_available() -> bool:
+        try:
+            import h2  # noqa: F401
+            return True
+        except ImportError:
+            logger.info("The 'h2' package is not installed; LLM clients use HTTP/1.1.")
+            return False
+
+    @property
+    def limits(self) -> httpx.Limits:
+        return httpx.Limits(max_connections=self.max_connections,
+                            max_keepalive_connections=self.max_keepalive_connections,
+                            keepalive_expiry=self.keepalive_expiry)
+
+    @property
+    def timeout(self) -> httpx.Timeout:
+        return httpx.Timeout(self.read_timeout, connect=self.connect_timeout)
+
+
+class ClientRegistry:
+    """
+    Builds and caches provider clients on a shared HTTP transport.
+
+    httpx connections belong to the event loop that opened them, so the
+    transport and the clients built on it are kept per event loop.
+    """
+
+    def __init__(self) -> None:
+        self.config = HttpPoolConfig(http2=False)
+        self._loop_state: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, Any]]" = weakref.WeakKeyDictionary()
+        self._overrides: Dict[str, Any] = {}
+
+    def configure(self, config: Optional[Dict[str, Any]]) -> None:
+        """Replaces the pool settings; clients built afterwards use them."""
+        self.config = HttpPoolConfig(**{k: v for k, v in (config or {}).items()
+                                        if k in ("max_connections", "max_keepalive_connections", "keepalive_expiry",
+                                                 "http2", "connect_timeout", "read_timeout")})
+        self._loop_state = weakref.WeakKeyDictionary()
+
+    def _state(self) -> Dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        state = self._loop_state.get(loop)
+        if state is None:
+            state = self._loop_state[loop] = {}
+        return state
+
+    def transport(self) -> httpx.AsyncHTTPTransport:
+        """Returns the shared connection pool of the running event loop."""
+        state = self._state()
+        transport = state.get("__transport__")
+        if transport is None:
+            transport = httpx.AsyncHTTPTransport(limits=self.config.limits, http2=self.config.http2)
+            state["__transport__"] = transport
+        return transport
+
+    def httpx_args(self) -> Dict[str, Any]:
+        """Keyword arguments for an httpx.AsyncClient that uses the shared pool."""
+        return {"transport": self.transport(), "timeout": self.config.timeout}
+
+    def http_client(self) -> httpx.AsyncClient:
+        """Returns a new httpx.AsyncClient on the shared pool (for SDKs that accept one)."""
+        return httpx.AsyncClient(**self.httpx_args())
+
+    def get(self, name: str, build: Callable[["ClientRegistry"], Any]) -> Any:
+        """
+        Returns the client cached under `name`, building it with `build(registry)` on first use.
+
+        Args:
+            name (str): The cache key, e.g. the provider name.
+            build (Callable): Creates the client; it should use `httpx_args()` or `http_client()`.
+        """
+        if name in self._overrides:
+            return self._overrides[name]
+        state = self._state()
+        client = state.get(name)
+        if client is None:
+            logger.info(f"Initializing {name} client")
+            client = state[name] = build(self)
+        return client
+
+    def override(self, name: str, client: Optional[Any]) -> None:
+        """Uses `client` for `name` on every event loop (None removes the override), e.g. for stand-ins."""
+        if client is None:
+            self._overrides.pop(name, None)
+        else:
+            self._overrides[name] = client
+
+    async def warm(self, llms: Iterable[Any]) -> None:
+        """Opens connections for all given LLMs concurrently; failures are logged, not raised."""
+        async def warm_one(llm: Any) -> None:
+            try:
+                await llm.warm()
+            except Exception as e:
+                logger.warning(f"Warm-up of {llm.provider_name}:{llm.species} failed: {e}")
+
+        await asyncio.gather(*(warm_one(llm) for llm in llms))
+
+    async def aclose(self) -> None:
+        """Closes the shared pool of the running event loop."""
+        state = self._loop_state.pop(asyncio.get_running_loop(), None)
+        if state and "__transport__" in state:
+            await state["__transport__"].aclose()
+
+
+_registry = ClientRegistry()
+
+
+def get_client_registry() -> ClientRegistry:
+    """Returns the process-wide client registry."""
+    return _registry
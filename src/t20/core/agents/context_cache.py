@@ -0,0 +1,124 @@
+"""This module manages provider-side caching of stable prompt prefixes.
+
+Every call sends the same large system texts (the KickLang specifications
+plus the agent's system prompt). Providers with a context-caching API can
+store such a prefix once and refer to it by a handle in later requests,
+which saves input tokens and latency. The ContextCache keeps one handle per
+model and prefix, renews it shortly before it expires and remembers failed
+uploads for a while, so that callers fall back to sending the prefix inline.
+"""
+
+import asyncio
+import hashlib
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class ContextCache:
+    """
+    Handles of uploaded prompt prefixes, keyed by model and prefix content.
+    """
+
+    def __init__(self, enabled: bool = False, ttl_seconds: float = 3600, min_tokens: int = 1024,
+                 refresh_margin: float = 60, failure_backoff: float = 600):
+        """
+        Args:
+            enabled (bool): Whether prefixes are uploaded at all.
+            ttl_seconds (float): Lifetime requested for each uploaded prefix.
+            min_tokens (int): Prefixes shorter than this (estimated) are sent inline; providers reject tiny caches.
+            refresh_margin (float): A handle is replaced this many seconds before it expires.
+            failure_backoff (float): After a failed upload, the prefix is sent inline for this many seconds.
+        """
+        self.enabled = enabled
+        self.ttl_seconds = ttl_seconds
+        self.min_tokens = min_tokens
+        self.refresh_margin = refresh_margin
+        self.failure_backoff = failure_backoff
+        self._entries: Dict[str, Tuple[str, float]] = {}
+        self._failures: Dict[str, float] = {}
+        self._pending: Dict[str, "asyncio.Future[Optional[str]]"] = {}
+        self.created = 0
+        self.reused = 0
+        self.fallbacks = 0
+
+    @staticmethod
+    def make_key(model: str, texts: Iterable[str]) -> str:
+        digest = hashlib.sha256()
+        for text in texts:
+            digest.update(text.encode("utf-8"))
+            digest.update(b"\0")
+        return f"{model}:{digest.hexdigest()}"
+
+    async def handle(self, model: str, texts: Iterable[str],
+                     create: Callable[[float], Awaitable[str]]) -> Optional[str]:
+        """
+        Returns the handle of the cached prefix, uploading it with `create(ttl_seconds)` when needed.
+
+        Returns:
+            Optional[str]: The handle, or None if the prefix should be sent inline.
+        """
+        from t20.core.agents.rate_limit import estimate_tokens
+
+        texts = tuple(texts)
+        if not self.enabled or estimate_tokens("".join(texts)) < self.min_tokens:
+            return None
+
+        key = self.make_key(model, texts)
+        now = time.monotonic()
+        entry = self._entries.get(key)
+        if entry and entry[1] - self.refresh_margin > now:
+            self.reused += 1
+            return entry[0]
+        if self._failures.get(key, 0) > now:
+            self.fallbacks += 1
+            return None
+
+        # Concurrent callers share one upload.
+        pending = self._pending.get(key)
+        if pending is None or pending.get_loop() is not asyncio.get_running_loop():
+            pending = asyncio.ensure_future(self._create(key, create))
+            self._pending[key] = pending
+        return await asyncio.shield(pending)
+
+    async def _create(self, key: str, create: Callable[[float], Awaitable[str]]) -> Optional[str]:
+        try:
+            name = await create(self.ttl_seconds)
+        except Exception as e:
+            logger.warning(f"Could not cache prompt prefix ({key[:40]}), sending it inline: {e}")
+            self._failures[key] = time.monotonic() + self.failure_backoff
+            self.fallbacks += 1
+            return None
+        finally:
+            self._pending.pop(key, None)
+
+        self._entries[key] = (name, time.monotonic() + self.ttl_seconds)
+        self.created += 1
+        logger.info(f"Cached prompt prefix as {name} for {self.ttl_seconds}s")
+        return name
+
+    def invalidate(self, name: str) -> None:
+        """Forgets a handle the provider no longer accepts."""
+        self._entries = {key: entry for key, entry in self._entries.items() if entry[0] != name}
+
+    def stats(self) -> Dict[str, Any]:
+        return {"entries": len(self._entries), "created": self.created,
+                "reused": self.reused, "fallbacks": self.fallbacks}
+
+
+_context_cache = ContextCache()
+
+
+def configure_context_cache(config: Optional[Dict[str, Any]]) -> ContextCache:
+    """Installs the process-wide context cache from the `llm_context_cache` section of the runtime configuration."""
+    global _context_cache
+    _context_cache = ContextCache(**{k: v for k, v in (config or {}).items()
+                                     if k in ("enabled", "ttl_seconds", "min_tokens", "refresh_margin", "failure_backoff")})
+    return _context_cache
+
+
+def get_context_cache() -> ContextCache:
+    """Returns the process-wide context cache."""
+    return _context_cache
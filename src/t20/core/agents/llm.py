@@ -204,13 +204,13 @@ system_texts = [
 
 
 import asyncio
+import contextvars
+import functools
+import importlib
 import json
-import os
-import re
-from google import genai
-from google.genai import types
-from ollama import AsyncClient as Ollama
-from typing import Optional, Any, Dict, Type
+from concurrent.futures import ThreadPoolExecutor
+from importlib.metadata import entry_points
+from typing import Optional, Any, AsyncIterator, Callable, Dict, Iterable, Type
 from abc import ABC, abstractmethod
 import logging
 from pydantic import BaseModel
@@ -219,17 +219,124 @@ logger = logging.getLogger(__name__)
 
 _provider_registry: Dict[str, Type["LLM"]] = {}
 
+# Built-in providers. Their modules (and SDKs) are imported on first use, so that
+# importing t20 does not load every provider SDK. Installed packages can add
+# providers through the `t20.llm_providers` entry point group (name = provider,
+# value = module or `module:Class`).
+_provider_modules: Dict[str, str] = {
+    "gemini": "t20.core.agents.providers.gemini",
+    "ollama": "t20.core.agents.providers.ollama",
+    "hf": "t20.core.agents.providers.hf",
+    "opi": "t20.core.agents.providers.opi",
+    "mistral": "t20.core.agents.providers.mistral",
+    "replay": "t20.core.agents.replay",
+}
+PROVIDER_ENTRY_POINT_GROUP = "t20.llm_providers"
+
+# Provider classes that used to be defined in this module, for `from t20.core.agents.llm import Gemini`.
+_provider_class_names = {"Gemini": "gemini", "Olli": "ollama", "HfInference": "hf", "Opi": "opi", "Mistral": "mistral"}
+
+
+class EmptyResponseError(Exception):
+    """Raised by a provider when the model returned no usable content."""
+
+
+class CircuitOpenError(Exception):
+    """Raised without calling the provider while its circuit breaker is open."""
+
+
+def response_text(response: Any) -> str:
+    """Returns the text form of a `generate_content` result (str, pydantic model or JSON value)."""
+    if isinstance(response, BaseModel):
+        return response.model_dump_json(indent=4)
+    if isinstance(response, str):
+        return response
+    return json.dumps(response)
+
+# The metrics record of the LLM call being executed (see t20.core.agents.metrics).
+current_call: contextvars.ContextVar[Optional[Any]] = contextvars.ContextVar("t20_current_call", default=None)
+
+def report_usage(input_tokens: Optional[int], output_tokens: Optional[int], cached_tokens: Optional[int] = None) -> None:
+    """
+    Reports provider-counted tokens for the LLM call being executed.
+    `cached_tokens` is the part of the input served from a provider-side context cache.
+    """
+    record = current_call.get()
+    if record is not None and (input_tokens or output_tokens):
+        record.add_usage(input_tokens or 0, output_tokens or 0, cached_tokens or 0)
+
+# Output cap of calls made without a token budget (see t20.core.agents.token_budget).
+DEFAULT_MAX_OUTPUT_TOKENS = 50000
+
+# The output token cap of the LLM call being executed.
+output_token_limit: contextvars.ContextVar[Optional[int]] = contextvars.ContextVar("t20_output_token_limit", default=None)
+
+def max_output_tokens() -> int:
+    """Returns the output token cap providers request for the LLM call being executed."""
+    return output_token_limit.get() or DEFAULT_MAX_OUTPUT_TOKENS
+
+# Worker pool for SDKs that only offer blocking clients. Keeps their network
+# I/O off the event loop that runs the workflow's parallel tasks.
+_blocking_executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix="t20-llm")
+
+async def run_blocking(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Runs a blocking SDK call on the LLM worker pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_blocking_executor, functools.partial(func, *args, **kwargs))
+
+async def iterate_blocking(iterable: Iterable[Any]) -> AsyncIterator[Any]:
+    """Consumes a blocking iterator (e.g. an SDK stream) on the LLM worker pool."""
+    iterator = iter(iterable)
+    done = object()
+    while True:
+        item = await run_blocking(next, iterator, done)
+        if item is done:
+            break
+        yield item
+
 def register_provider(name: str):
     def decorator(cls: Type["LLM"]) -> Type["LLM"]:
         _provider_registry[name] = cls
+        cls.provider_name = name
         return cls
     return decorator
 
+def register_provider_module(name: str, module_path: str) -> None:
+    """Registers a provider whose module is imported (and registers its class) on first use."""
+    _provider_modules[name] = module_path
+
+@functools.lru_cache(maxsize=1)
+def _provider_entry_points() -> Dict[str, Any]:
+    return {ep.name: ep for ep in entry_points(group=PROVIDER_ENTRY_POINT_GROUP)}
+
+def get_provider_class(name: str) -> Optional[Type["LLM"]]:
+    """
+    Returns the provider class registered under `name`, importing its module on first use.
+    Returns None for unknown providers.
+    """
+    cls = _provider_registry.get(name)
+    if cls is not None:
+        return cls
+    if name in _provider_modules:
+        importlib.import_module(_provider_modules[name])
+    elif name in _provider_entry_points():
+        loaded = _provider_entry_points()[name].load()
+        if isinstance(loaded, type) and issubclass(loaded, LLM) and name not in _provider_registry:
+            register_provider(name)(loaded)
+    return _provider_registry.get(name)
+
+def __getattr__(name: str) -> Any:
+    if name in _provider_class_names:
+        return get_provider_class(_provider_class_names[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 class LLM(ABC):
     """
     Abstract base class for Large Language Models.
     Provides a centralized place for LLM-related configurations and utilities.
     """
+    provider_name: str = ""
+
     def __init__(self, species: str) -> None:
         self.species = species
 
@@ -239,485 +346,91 @@ class LLM(ABC):
         """Generates content using an LLM."""
         pass
 
-    @staticmethod
-    def factory(species: str) -> 'LLM':
-        logger.debug(f"LLM Factory: Creating LLM instance for species '{species}'")
-        provider_name, _, model_name = species.partition(':')
-        if provider_name in _provider_registry:
-            return _provider_registry[provider_name](species=model_name or provider_name)
-        
-        # Fallback for old format
-        if species == 'Olli':
-            return Olli(species='Olli')
-        
-        return Gemini(species)
-
-
-@register_provider("gemini")
-class Gemini(LLM):
-    """
-    Provides a centralized place for LLM-related configurations and utilities.
-    """
-    _clients: Dict[str, genai.Client] = {} # Class-level cache for clients
-
-    def __init__(self, species: str) -> None:
-        super().__init__(species)
-
-
-    async def generate_content(self, model_name: str, contents: str, system_instruction: str = '',
-                         temperature: float = 0.7, response_mime_type: str = 'text/plain', response_schema: BaseModel = None) -> Optional[str]: # type: ignore
-        """
-        Generates content using the specified GenAI model.
-
-        Args:
-            model_name (str): The name of the model to use (e.g., "gemini-pro").
-            contents (str): The input content for the model.
-            system_instruction (str, optional): System-level instructions for the model.
-            temperature (float, optional): Controls the randomness of the output. Defaults to 0.7.
-            response_mime_type (str, optional): The desired MIME type for the response.
-            response_schema (Any, optional): The schema for the response.
-
-        Returns:
-            types.GenerateContentResponse: The response from the GenAI model.
+    async def generate_stream(self, model_name: str, contents: str, system_instruction: str = '',
+                         temperature: float = 0.7, response_mime_type: str = 'text/plain', response_schema: Any = None) -> AsyncIterator[str]: # type: ignore
         """
-        client = self._get_client()
-        if not client:
-            return None
-
-        config = types.GenerateContentConfig(
-            system_instruction=(types.Part.from_text(text=s) for s in (*system_texts, system_instruction)),
-            temperature=temperature,
-            response_mime_type=response_mime_type,
-            response_schema=response_schema,
-            max_output_tokens=50000,
-        )
-
-        # try three times
-        for _ in range(5):
-            try:
-                response = await client.aio.models.generate_content(
-                    model=model_name,
-                    contents=[
-                        types.Part.from_text(text=contents)
-                    ],
-                    config=config,
-                )
-                if not response.candidates or response.candidates[0].content is None or response.candidates[0].content.parts is None or not response.candidates[0].content.parts or response.candidates[0].content.parts[0].text is None:
-                    raise ValueError(f"Gemini: No content in response from model {model_name}. Retrying...")
-                break
-            except Exception as ex:
-                logger.error(f"Error generating content with model {model_name}: {ex}")
-                # If it's the last retry, return None
-                if _ == 4:
-                    return None
-                nsec = 10+30*_
-                logger.warning(f"Retrying content generation for model {model_name} in {nsec} seconds...")
-                await asyncio.sleep(nsec)
-                #return None
-
-        if isinstance(response.parsed, BaseModel):
-            return response.parsed
-
-        text = ''.join(p.text for p in response.candidates[0].content.parts).strip()
-
-        if response_mime_type == 'application/json':
-            if not text.startswith('{'):
-                # Attempt to extract JSON from a potentially malformed response
-                match = re.search(r"```json\n({.*})\n```", text, re.DOTALL)
-                if match:
-                    text = match.group(1)
-
-            try:
-                # Validate against schema if provided
-                if response_schema:
-                    return response_schema.model_validate_json(text)
-                return json.loads(text)
-            except Exception as ex:
-                logger.exception(f"Error parsing or validating JSON response: {ex}")
-
-        return text
-
-    def _get_client(self) -> genai.Client:
+        Streams generated text as it arrives.
+        Providers without native streaming yield the complete response as a single chunk.
         """
-        Returns a GenAI client instance.
-        """
-        try:
-            if self.species not in Gemini._clients:
-                logger.info(f"Initializing GenAI client for species {self.species}")
-                Gemini._clients[self.species] = genai.Client()
-                logger.info("\n--------------------------\n".join(system_texts))
-            return Gemini._clients[self.species]
-        except Exception as e:
-            logger.exception(f"Error initializing GenAI client: {e}")
-            raise
-
-
-@register_provider("ollama")
-class Olli(LLM):
-    """
-    Provides a centralized place for LLM-related configurations and utilities.
-    """
-    _clients = {} # Class-level cache for clients
-
-    def __init__(self, species: str = 'Olli'):
-        super().__init__(species)
-        self.client = None
+        response = await self.generate_content(model_name, contents, system_instruction,
+                                                temperature, response_mime_type, response_schema)
+        if response is not None:
+            yield response_text(response)
 
-    async def generate_content(self, model_name: str, contents: str, system_instruction: str = '',
-                         temperature: float = 0.7, response_mime_type: str = 'text/plain', response_schema: BaseModel = None) -> Optional[str]: # type: ignore
-        """
-        Generates content using the specified GenAI model.
-
-        Args:
-            model_name (str): The name of the model to use (e.g., "gemini-pro").
-            contents (str): The input content for the model.
-            system_instruction (str, optional): System-level instructions for the model.
-            temperature (float, optional): Controls the randomness of the output. Defaults to 0.7.
-            response_mime_type (str, optional): The desired MIME type for the response.
-            response_schema (Any, optional): The schema for the response.
-
-        Returns:
-            types.GenerateContentResponse: The response from the GenAI model.
-        """
-        print(f"Olli: Using model {model_name} with temperature {temperature}")
-        client = self._get_client(species=self.species)
-        if not client:
-            return None
-
-        try:
-            out = ""
-            fmt = response_schema.model_json_schema()
-            print(f"Olli: Using response format {fmt}")
-            response = await client.chat(
-                model=self.species,#model_name,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": system_instruction
-                    },
-                    {
-                        "role": "user",
-                        "content": contents
-                    }
-                ],
-                format=fmt,
-                options={"temperature": temperature},
-                stream=True
-            )
-            async for chunk in response:
-                print(chunk['message']['content'], end="")
-                out += chunk['message']['content']
-            return out
-        except Exception as e:
-            logger.error(f"Error generating content with model {model_name}: {e}")
-            #return None
-
-        try:
-            out = ""
-            fmt = response_schema.model_json_schema()
-            print(f"Olli: Using response format {fmt}")
-            response = await client.generate(
-                model=self.species,#model_name,
-                prompt=contents,
-                format=fmt,
-                options={"temperature": temperature, "system_instruction": system_instruction},
-                stream=True
-            )
-            async for chunk in response:
-                if hasattr(chunk, "response") and chunk.response:
-                    print(chunk.response, end="")
-                    out += chunk.response
-            return out
-        except Exception as e:
-            logger.error(f"Error generating content with model {model_name}: {e}")
-            return None
+    async def warm(self) -> None:
+        """Opens the provider connection ahead of the first request (see `System.setup(warm=True)`)."""
+        pass
 
     @staticmethod
-    def _get_client(species: str):
-        """
-        Returns a GenAI client instance.
-        """
-        try:
-            if (Olli._clients is None):
-                Olli._clients = {}
-            if species not in Olli._clients:
-                Olli._clients[species] = Ollama()#base_url='http://localhost:11434')
-            return Olli._clients[species]
-        except Exception as e:
-            logger.exception(f"Error initializing Ollama client: {e}")
-            return None
-
-
-
-
-
-from huggingface_hub import InferenceClient, ChatCompletionInputResponseFormatText, ChatCompletionInputResponseFormatJSONObject, ChatCompletionInputResponseFormatJSONSchema, ChatCompletionInputJSONSchema
-
-
-@register_provider("hf")
-class HfInference(LLM):
-    """
-    Provides a centralized place for LLM-related configurations and utilities.
-    """
-    _clients = {} # Class-level cache for clients
-
-    def __init__(self, species: str):
-        super().__init__(species)
-
-    async def generate_content(self, model_name: str, contents: str, system_instruction: str = '',
-                         temperature: float = 0.7, response_mime_type: str = 'text/plain', response_schema: BaseModel = None) -> Optional[str]: # type: ignore
-        """
-        Generates content using the specified GenAI model.
-
-        Args:
-            model_name (str): The name of the model to use (e.g., "gemini-pro").
-            contents (str): The input content for the model.
-            system_instruction (str, optional): System-level instructions for the model.
-            temperature (float, optional): Controls the randomness of the output. Defaults to 0.7.
-            response_mime_type (str, optional): The desired MIME type for the response.
-            response_schema (Any, optional): The schema for the response.
-
-        Returns:
-            types.GenerateContentResponse: The response from the GenAI model.
-        """
-        client = self._get_client()
-        if not client:
-            return None
-
-        try:
-            out = ""
-
-            stream = client.chat.completions.create(
-                messages=[
-                    {
-                        "role": "system",
-                        "content": system_instruction
-                    },
-                    {
-                        "role": "user",
-                        "content": contents
-                    },
-                ],
-                temperature=temperature,
-                max_tokens=50000,
-                top_p=1,
-                stream=True,
-                response_format=response_schema.model_json_schema(mode="serialization")
-#                response_schema=response_format_from_pydantic_model(response_schema) if response_schema else None,
-
-#                response_format=ChatCompletionInputResponseFormatText() if response_mime_type == 'text/plain' else ChatCompletionInputResponseFormatJSONObject() #if response_schema is None else ChatCompletionInputResponseFormatJSONSchema(json_schema=ChatCompletionInputJSONSchema(name=response_schema.model_json_schema()))
-            )
-
-            for chunk in stream:
-                if chunk.choices[0].delta.content is None:
-                    continue
-                print(chunk.choices[0].delta.content, end="")
-                out += chunk.choices[0].delta.content
-
-            return out
-        except Exception as e:
-            logger.error(f"Error generating content with model {model_name}: {e}")
-            return None
-
-    def _get_client(self):
-        """
-        Returns a inference client instance.
-        """
-        try:
-            if self.species not in HfInference._clients:
-                HfInference._clients[self.species] = InferenceClient(
-                    #provider="featherless-ai",
-                    api_key=os.environ.get("HF_TOKEN"),
-                    #model="moonshotai/Kimi-K2-Instruct"
-                    #model="Qwen/Qwen3-4B-Thinking-2507"
-                    model=self.species
-                )
-            return HfInference._clients[self.species]
-        except Exception as e:
-            logger.error(f"Error initializing inference client: {e}")
-            return None
-
-
-
-from openai import OpenAI
-from openai.types.chat.completion_create_params import ResponseFormat
+    def factory(species: str, message_bus: Any = None) -> 'LLM':
+        logger.debug(f"LLM Factory: Creating LLM instance for species '{species}'")
+        provider_name, _, model_name = species.partition(':')
+        if provider_name == 'router':
+            from t20.core.agents.router import RouterLLM
+            # Each backend is rate limited and circuit broken on its own key inside the router.
+            return LLM._wrap(RouterLLM.from_species(model_name, message_bus), message_bus, per_provider=False)
 
+        return LLM._wrap(LLM.provider(species), message_bus)
 
-@register_provider("opi")
-class Opi(LLM):
-    """
-    Provides a centralized place for LLM-related configurations and utilities.
-    """
-    _clients = {} # Class-level cache for clients
+    @staticmethod
+    def provider(species: str) -> 'LLM':
+        """Creates the bare provider for a species, without any call layers."""
+        provider_name, _, model_name = species.partition(':')
+        provider_class = get_provider_class(provider_name)
+        if provider_class is not None:
+            return provider_class(species=model_name or provider_name)
+        elif species == 'Olli':
+            # Fallback for old format
+            return get_provider_class("ollama")(species='Olli')
+        return get_provider_class("gemini")(species)
 
-    def __init__(self, species: str = 'Opi'):
-        super().__init__(species)
-    
-    async def generate_content(self, model_name: str, contents: str, system_instruction: str = '',
-                         temperature: float = 0.7, response_mime_type: str = 'text/plain', response_schema: BaseModel = None) -> Optional[str]: # type: ignore
-        """
-        Generates content using the specified GenAI model.
-
-        Args:
-            model_name (str): The name of the model to use (e.g., "gemini-pro").
-            contents (str): The input content for the model.
-            system_instruction (str, optional): System-level instructions for the model.
-            temperature (float, optional): Controls the randomness of the output. Defaults to 0.7.
-            response_mime_type (str, optional): The desired MIME type for the response.
-            response_schema (Any, optional): The schema for the response.
-
-        Returns:
-            types.GenerateContentResponse: The response from the GenAI model.
-        """
-        client = self._get_client()
-        if not client:
-            return None
-
-        try:
-            out = ""
-
-            response_format: ResponseFormat = {"type": "text"}
-
-            if response_mime_type == 'application/json':
-                response_format = {"type": "json_object"}
-
-            if response_schema:
-                response_format = {"type": "json_schema", "json_schema": response_schema.model_json_schema()}   # type: ignore
-
-            print(f"Opi: Using response format {response_format}")
-
-            stream = client.chat.completions.create(
-                model=model_name,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": system_instruction
-                    },
-                    {
-                        "role": "user",
-                        "content": contents
-                    },
-                ],
-                temperature=temperature,
-                max_tokens=50000,
-                top_p=1,
-                stream=True,
-                response_format=response_format
-            )
-
-            for chunk in stream:
-                if chunk.choices[0].delta.content is None:
-                    continue
-                print(chunk.choices[0].delta.content, end="")
-                out += chunk.choices[0].delta.content
-
-            return out
-        except Exception as e:
-            logger.error(f"Error generating content with model {model_name}: {e}")
-            return None
-
-    def _get_client(self):
+    @staticmethod
+    def _wrap(llm: 'LLM', message_bus: Any = None, per_provider: bool = True) -> 'LLM':
         """
-        Returns a OpenAI client instance.
+        Applies the process-wide call layers (caching, coalescing, retries, rate limiting, ...) around a provider.
+        With `per_provider=False` the rate limiting and circuit breaking layers are left to the caller.
         """
-        try:
-            if (self.client is None):
-                if self.species not in Opi._clients:
-                    Opi._clients[self.species] = OpenAI(api_key=os.environ.get("OPENAI_API_KEY",""), base_url=os.environ.get("OPENAI_API_BASE"))
-            return Opi._clients[self.species]
-        except Exception as e:
-            logger.error(f"Error initializing OpenAI client: {e}")
-            return None
-
-
-
-##
-
-
-from mistralai import Mistral as MistralClient
-from mistralai.extra.utils import response_format_from_pydantic_model
-
-@register_provider("mistral")
-class Mistral(LLM):
+        from t20.core.agents.circuit_breaker import CircuitBreakerLLM
+        from t20.core.agents.llm_cache import CachedLLM, get_response_cache
+        from t20.core.agents.metrics import MeteredLLM
+        from t20.core.agents.rate_limit import RateLimitedLLM
+        from t20.core.agents.repair import RepairingLLM
+        from t20.core.agents.replay import RecordingLLM
+        from t20.core.agents.retry import RetryingLLM
+        from t20.core.agents.single_flight import SingleFlightLLM
+        from t20.core.agents.token_budget import TokenBudgetLLM
+
+        if per_provider:
+            llm = CircuitBreakerLLM(RateLimitedLLM(llm), message_bus=message_bus)
+        llm = RetryingLLM(llm, message_bus=message_bus)
+        llm = RepairingLLM(llm)
+        llm = SingleFlightLLM(llm)
+
+        # Installed without a cache too: it consumes the per-call `use_cache` option.
+        llm = CachedLLM(llm, get_response_cache())
+        return MeteredLLM(RecordingLLM(TokenBudgetLLM(llm)))
+
+
+class LLMWrapper(LLM):
     """
-    Provides a centralized place for LLM-related configurations and utilities.
+    Base class for layers that add behaviour around another LLM.
+    Subclasses override `generate_content` and delegate to `self.inner`, passing on extra keyword options.
     """
-    _clients = {} # Class-level cache for clients
+    def __init__(self, inner: LLM) -> None:
+        super().__init__(inner.species)
+        self.inner = inner
+        self.provider_name = inner.provider_name
 
-    def __init__(self, species: str = 'Mistral'):
-        super().__init__(species)
-    
     async def generate_content(self, model_name: str, contents: str, system_instruction: str = '',
-                         temperature: float = 0.7, response_mime_type: str = 'text/plain', response_schema: BaseModel = None) -> Optional[str]: # type: ignore
-        """
-        Generates content using the specified Mistral model.
-
-        Args:
-            model_name (str): The name of the model to use (e.g., "mistral-large-latest").
-            contents (str): The input content for the model.
-            system_instruction (str, optional): System-level instructions for the model.
-            temperature (float, optional): Controls the randomness of the output. Defaults to 0.7.
-            response_mime_type (str, optional): The desired MIME type for the response.
-            response_schema (Any, optional): The schema for the response.
-
-        Returns:
-            str: The response from the Mistral model.
-        """
-        client = Mistral._get_client(species=self.species)
-        if not client:
-            return None
-        try:
-            messages = []
-            for s in system_texts:
-                messages.append({"role": "system", "content": s})
-            if system_instruction:
-                messages.append({"role": "system", "content": system_instruction})
-            messages.append({"role": "user", "content": contents})
-
-            print(f"Mistral: Using model {model_name} with temperature {temperature}")
-
-            response_format = {"type": "text"}
-
-            if response_mime_type == 'application/json':
-                response_format = {"type": "json_object"}
-
-            if response_schema:
-                response_format = response_format_from_pydantic_model(response_schema)  # type: ignore
-
-
-            out = ""
-            stream = client.chat.stream(
-                model=self.species,#model_name,
-                messages=messages,
-                temperature=temperature,
-                max_tokens=50000,
-                response_format=response_format # type: ignore
-            )
-            for chunk in stream:
-                if chunk.data.choices[0].delta.content is None:
-                    continue
-                print(chunk.data.choices[0].delta.content, end="")
-                out += str(chunk.data.choices[0].delta.content)
-
-            return out
-        except Exception as e:
-            print(f"Error generating content with model {model_name}: {e}")
-            return None
-
-    @staticmethod
-    def _get_client(species: str):
-        """
-        Returns a Mistral client instance.
-        """
-        try:
-            if Mistral._clients is None:
-                Mistral._clients = {}
-            if species not in Mistral._clients:
-                api_key = os.environ.get("MISTRAL_API_KEY")
-                if not api_key:
-                    raise ValueError("MISTRAL_API_KEY environment variable not set.")
-                Mistral._clients[species] = MistralClient(api_key=api_key)
-            return Mistral._clients[species]
-        except Exception as e:
-            logger.exception(f"Error initializing Mistral client: {e}")
-            return None
+                         temperature: float = 0.7, response_mime_type: str = 'text/plain', response_schema: Any = None, **options: Any) -> Optional[str]: # type: ignore
+        return await self.inner.generate_content(model_name, contents, system_instruction,
+                                                 temperature, response_mime_type, response_schema, **options)
+
+    async def generate_stream(self, model_name: str, contents: str, system_instruction: str = '',
+                         temperature: float = 0.7, response_mime_type: str = 'text/plain', response_schema: Any = None, **options: Any) -> AsyncIterator[str]: # type: ignore
+        async for chunk in self.inner.generate_stream(model_name, contents, system_instruction,
+                                                      temperature, response_mime_type, response_schema, **options):
+            yield chunk
+
+    async def warm(self) -> None:
+        await self.inner.warm()
@@ -0,0 +1,388 @@
+"""This module provides a content-addressed response cache for LLM calls.
+
+Responses are keyed by a stable hash of everything that determines a model's
+answer (provider, model, instructions, contents, temperature and response
+format), so identical requests made across runs or processes are answered
+locally instead of paying provider latency and cost again.
+
+The cache has two tiers: a small in-memory LRU and an optional SQLite file
+with TTLs and size-based eviction. The SQLite tier is read and written on a
+worker thread, off the event loop.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from threading import Lock
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+
+from pydantic import BaseModel
+
+from t20.core.agents.llm import LLM, LLMWrapper, current_call, response_text
+
+logger = logging.getLogger(__name__)
+
+# Bump when the key layout or the payload encoding changes.
+CACHE_KEY_VERSION = 2
+
+
+def _schema_fingerprint(response_schema: Any) -> Any:
+    """Returns a JSON-serializable description of a response schema."""
+    if response_schema is None:
+        return None
+    if isinstance(response_schema, type) and issubclass(response_schema, BaseModel):
+        return response_schema.model_json_schema()
+    if isinstance(response_schema, (dict, list, str)):
+        return response_schema
+    return repr(response_schema)
+
+
+def make_cache_key(provider: str, model_name: str, system_instruction: str, contents: str,
+                   temperature: float, response_mime_type: str, response_schema: Any = None,
+                   kind: str = "content") -> str:
+    """
+    Builds a cache key that stays the same across process restarts.
+    `kind` separates `generate_content` results ("content") from the text of streams ("stream").
+
+    Returns:
+        str: A hex SHA-256 digest of the canonical request description.
+    """
+    request = {
+        "v": CACHE_KEY_VERSION,
+        "kind": kind,
+        "provider": provider,
+        "model": model_name,
+        "system_instruction": system_instruction or "",
+        "contents": contents,
+        "temperature": float(temperature),
+        "response_mime_type": response_mime_type,
+        "response_schema": _schema_fingerprint(response_schema),
+    }
+    canonical = json.dumps(request, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def encode_response(value: Any) -> str:
+    """Serializes a `generate_content` result into a cache payload."""
+    if isinstance(value, BaseModel):
+        return json.dumps({"kind": "model", "value": value.model_dump(mode="json")})
+    if isinstance(value, str):
+        return json.dumps({"kind": "text", "value": value})
+    return json.dumps({"kind": "json", "value": value})
+
+
+def decode_response(payload: str, response_schema: Any = None) -> Any:
+    """Restores a cached payload into the shape `generate_content` returned."""
+    data = json.loads(payload)
+    if data["kind"] == "model" and isinstance(response_schema, type) and issubclass(response_schema, BaseModel):
+        return response_schema.model_validate(data["value"])
+    return data["value"]
+
+
+@dataclass
+class CacheStats:
+    """Hit/miss counters for a ResponseCache."""
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    stores: int = 0
+    evictions: int = 0
+
+    @property
+    def hits(self) -> int:
+        return self.memory_hits + self.disk_hits
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "hit_rate": self.hit_rate,
+        }
+
+
+class ResponseCache:
+    """
+    Two-tier (memory LRU + SQLite) store of LLM responses.
+    """
+
+    def __init__(self, memory_entries: int = 256, disk_path: Optional[str] = None,
+                 max_disk_bytes: int = 64 * 1024 * 1024, ttl_seconds: Optional[float] = None):
+        """
+        Args:
+            memory_entries (int): Maximum number of responses kept in memory.
+            disk_path (str, optional): Path of the SQLite file. Memory-only if omitted.
+            max_disk_bytes (int): Total payload size the disk tier may hold before evicting.
+            ttl_seconds (float, optional): Default time-to-live of an entry. Entries never expire if omitted.
+        """
+        self.memory_entries = memory_entries
+        self.disk_path = disk_path
+        self.max_disk_bytes = max_disk_bytes
+        self.ttl_seconds = ttl_seconds
+        self.stats = CacheStats()
+        self._memory: "OrderedDict[str, Tuple[Optional[float], str]]" = OrderedDict()
+        self._lock = Lock()
+        if self.disk_path:
+            self._init_db()
+
+    def _get_conn(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.disk_path, check_same_thread=False)
+
+    def _init_db(self) -> None:
+        directory = os.path.dirname(self.disk_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = self._get_conn()
+        try:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    payload TEXT,
+                    size INTEGER,
+                    expires_at REAL,
+                    accessed_at REAL
+                )
+            ''')
+            conn.commit()
+        finally:
+            conn.close()
+
+    def get(self, key: str) -> Optional[str]:
+        """Returns the cached payload for a key, or None on a miss."""
+        payload = self._get_memory(key)
+        return payload if payload is not None else self._get_disk(key)
+
+    async def aget(self, key: str) -> Optional[str]:
+        """Like `get`, reading the disk tier on a worker thread."""
+        payload = self._get_memory(key)
+        if payload is not None:
+            return payload
+        return await asyncio.to_thread(self._get_disk, key) if self.disk_path else self._get_disk(key)
+
+    def set(self, key: str, payload: str, ttl_seconds: Optional[float] = None) -> None:
+        """Stores a payload in both tiers."""
+        ttl = ttl_seconds if ttl_seconds is not None else self.ttl_seconds
+        expires_at = time.time() + ttl if ttl else None
+        with self._lock:
+            self._memory_set(key, expires_at, payload)
+            if self.disk_path:
+                self._disk_set(key, expires_at, payload)
+            self.stats.stores += 1
+
+    async def aset(self, key: str, payload: str, ttl_seconds: Optional[float] = None) -> None:
+        """Like `set`, writing the disk tier on a worker thread."""
+        if self.disk_path:
+            await asyncio.to_thread(self.set, key, payload, ttl_seconds)
+        else:
+            self.set(key, payload, ttl_seconds)
+
+    def _get_memory(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            expires_at, payload = entry
+            if expires_at is None or expires_at > time.time():
+                self._memory.move_to_end(key)
+                self.stats.memory_hits += 1
+                return payload
+            del self._memory[key]
+            return None
+
+    def _get_disk(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._disk_get(key, time.time()) if self.disk_path else None
+            if entry is None:
+                self.stats.misses += 1
+                return None
+            self.stats.disk_hits += 1
+            self._memory_set(key, *entry)
+            return entry[1]
+
+    def clear(self) -> None:
+        """Drops every entry from both tiers."""
+        with self._lock:
+            self._memory.clear()
+            if self.disk_path:
+                conn = self._get_conn()
+                try:
+                    conn.execute("DELETE FROM responses")
+                    conn.commit()
+                finally:
+                    conn.close()
+
+    def _memory_set(self, key: str, expires_at: Optional[float], payload: str) -> None:
+        self._memory[key] = (expires_at, payload)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _disk_get(self, key: str, now: float) -> Optional[Tuple[Optional[float], str]]:
+        conn = self._get_conn()
+        try:
+            row = conn.execute("SELECT payload, expires_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            payload, expires_at = row
+            if expires_at is not None and expires_at <= now:
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                conn.commit()
+                return None
+            conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            conn.commit()
+            return expires_at, payload
+        except sqlite3.Error as e:
+            logger.error(f"Error reading LLM cache entry {key}: {e}")
+            return None
+        finally:
+            conn.close()
+
+    def _disk_set(self, key: str, expires_at: Optional[float], payload: str) -> None:
+        now = time.time()
+        size = len(payload.encode("utf-8"))
+        conn = self._get_conn()
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, payload, size, expires_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, payload, size, expires_at, now)
+            )
+            conn.execute("DELETE FROM responses WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,))
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            if total > self.max_disk_bytes:
+                # Evict least recently used entries until the tier fits again.
+                for old_key, old_size in conn.execute(
+                        "SELECT key, size FROM responses ORDER BY accessed_at ASC, rowid ASC").fetchall():
+                    if total <= self.max_disk_bytes:
+                        break
+                    conn.execute("DELETE FROM responses WHERE key = ?", (old_key,))
+                    total -= old_size
+                    self.stats.evictions += 1
+            conn.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Error writing LLM cache entry {key}: {e}")
+        finally:
+            conn.close()
+
+
+class CachedLLM(LLMWrapper):
+    """
+    Answers repeated `generate_content` calls from a ResponseCache.
+    Without a cache it only consumes the `use_cache` option, so callers may pass it either way.
+    Other keyword options are passed on to the inner layer.
+    """
+
+    def __init__(self, inner: LLM, cache: Optional[ResponseCache]) -> None:
+        super().__init__(inner)
+        self.cache = cache
+
+    async def generate_content(self, model_name: str, contents: str, system_instruction: str = '',
+                               temperature: float = 0.7, response_mime_type: str = 'text/plain',
+                               response_schema: Any = None, use_cache: bool = True, **options: Any) -> Optional[Any]:
+        """
+        Generates content, serving it from the cache when an identical request was answered before.
+
+        Args:
+            use_cache (bool, optional): Set to False to bypass the cache for this call. Defaults to True.
+        """
+        if not use_cache or self.cache is None:
+            return await self.inner.generate_content(model_name, contents, system_instruction,
+                                                     temperature, response_mime_type, response_schema, **options)
+
+        key = make_cache_key(self.provider_name, model_name, system_instruction, contents,
+                             temperature, response_mime_type, response_schema)
+        payload = await self.cache.aget(key)
+        if payload is not None:
+            try:
+                logger.debug(f"LLM cache hit for model {model_name} ({key[:12]})")
+                response = decode_response(payload, response_schema)
+                self._mark_hit()
+                return response
+            except Exception as e:
+                logger.warning(f"Discarding unreadable LLM cache entry {key[:12]}: {e}")
+
+        response = await self.inner.generate_content(model_name, contents, system_instruction,
+                                                     temperature, response_mime_type, response_schema, **options)
+        if response is not None:
+            await self.cache.aset(key, encode_response(response))
+        return response
+
+    async def generate_stream(self, model_name: str, contents: str, system_instruction: str = '',
+                              temperature: float = 0.7, response_mime_type: str = 'text/plain',
+                              response_schema: Any = None, use_cache: bool = True, **options: Any) -> AsyncIterator[str]:
+        """
+        Streams content; a cached response is replayed as a single chunk.
+        Only completely consumed streams are stored, apart from `generate_content` results (kind "stream").
+        """
+        use_cache = use_cache and self.cache is not None
+        key = make_cache_key(self.provider_name, model_name, system_instruction, contents,
+                             temperature, response_mime_type, response_schema, kind="stream")
+        if use_cache:
+            payload = await self.cache.aget(key)
+            if payload is not None:
+                try:
+                    text = response_text(decode_response(payload, response_schema))
+                    self._mark_hit()
+                    yield text
+                    return
+                except Exception as e:
+                    logger.warning(f"Discarding unreadable LLM cache entry {key[:12]}: {e}")
+
+        chunks = []
+        async for chunk in self.inner.generate_stream(model_name, contents, system_instruction,
+                                                      temperature, response_mime_type, response_schema, **options):
+            chunks.append(chunk)
+            yield chunk
+        if use_cache and chunks:
+            await self.cache.aset(key, encode_response("".join(chunks)))
+
+    @staticmethod
+    def _mark_hit() -> None:
+        record = current_call.get()
+        if record is not None:
+            record.cache_hit = True
+
+
+_response_cache: Optional[ResponseCache] = None
+
+
+def configure_response_cache(config: Optional[Dict[str, Any]]) -> Optional[ResponseCache]:
+    """
+    Installs (or removes) the process-wide response cache used by `LLM.factory`.
+
+    Args:
+        config (dict, optional): The `llm_cache` section of the runtime configuration.
+
+    Returns:
+        Optional[ResponseCache]: The installed cache, or None if caching is disabled.
+    """
+    global _response_cache
+    config = config or {}
+    if not config.get("enabled", False):
+        _response_cache = None
+        return None
+    _response_cache = ResponseCache(
+        memory_entries=int(config.get("memory_entries", 256)),
+        disk_path=config.get("disk_path"),
+        max_disk_bytes=int(float(config.get("max_disk_mb", 64)) * 1024 * 1024),
+        ttl_seconds=config.get("ttl_seconds"),
+    )
+    logger.info(f"LLM response cache enabled (disk: {_response_cache.disk_path or 'none'})")
+    return _response_cache
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """Returns the process-wide response cache, if one is configured."""
+    return _response_cache
@@ -0,0 +1,264 @@
+"""This module records token, latency and cost metrics of LLM calls.
+
+Every call made through `LLM.factory` produces a CallRecord with the input and
+output token counts (as reported by the provider, or estimated), the time spent
+waiting for the rate limiter, the time to first token, the total latency and
+the estimated cost. Records are attributed to the agent and task that made the
+call (see `call_scope`) and collected in a MetricsLedger, which aggregates them
+per task, agent and model.
+"""
+
+import logging
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+
+from pydantic import BaseModel
+
+from t20.core.agents.llm import LLMWrapper, current_call, response_text
+from t20.core.agents.rate_limit import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+
+class CallRecord(BaseModel):
+    """Metrics of one LLM call."""
+    provider: str
+    model: str
+    agent: Optional[str] = None
+    task_id: Optional[str] = None
+    streamed: bool = False
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cached_input_tokens: int = 0
+    tokens_reported: bool = False
+    queue_wait: float = 0.0
+    time_to_first_token: Optional[float] = None
+    latency: float = 0.0
+    cost: float = 0.0
+    cache_hit: bool = False
+    coalesced: bool = False
+    repairs: List[str] = []
+    ok: bool = True
+
+    def add_usage(self, input_tokens: int, output_tokens: int, cached_input_tokens: int = 0) -> None:
+        """Adds provider-reported token counts (hedged or retried calls report several times)."""
+        if not self.tokens_reported:
+            self.input_tokens = self.output_tokens = self.cached_input_tokens = 0
+            self.tokens_reported = True
+        self.input_tokens += input_tokens
+        self.output_tokens += output_tokens
+        self.cached_input_tokens += cached_input_tokens
+
+
+class PricingTable:
+    """
+    Prices in currency units per million tokens, resolved like the rate limits:
+    `provider:model`, then `provider`, then `default`. Input tokens served from a
+    context cache cost `cached_input_per_mtok` (defaults to the input price).
+    """
+
+    def __init__(self, prices: Optional[Dict[str, Dict[str, float]]] = None) -> None:
+        self.prices = {key: dict(value or {}) for key, value in (prices or {}).items()}
+
+    def cost(self, provider: str, model: str, input_tokens: int, output_tokens: int,
+             cached_input_tokens: int = 0) -> float:
+        price: Dict[str, float] = {}
+        for source in ("default", provider, f"{provider}:{model}"):
+            price.update(self.prices.get(source, {}))
+        input_price = price.get("input_per_mtok", 0.0)
+        return ((input_tokens - cached_input_tokens) * input_price
+                + cached_input_tokens * price.get("cached_input_per_mtok", input_price)
+                + output_tokens * price.get("output_per_mtok", 0.0)) / 1_000_000
+
+
+_pricing = PricingTable()
+
+
+def configure_pricing(config: Optional[Dict[str, Dict[str, float]]]) -> PricingTable:
+    """Installs the process-wide prices from the `llm_pricing` section of the runtime configuration."""
+    global _pricing
+    _pricing = PricingTable(config)
+    return _pricing
+
+
+def get_pricing() -> PricingTable:
+    """Returns the process-wide prices."""
+    return _pricing
+
+
+def _aggregate(records: List[CallRecord]) -> Dict[str, Any]:
+    return {
+        "calls": len(records),
+        "failed_calls": sum(1 for r in records if not r.ok),
+        "cache_hits": sum(1 for r in records if r.cache_hit),
+        "coalesced_calls": sum(1 for r in records if r.coalesced),
+        "repaired_calls": sum(1 for r in records if r.repairs),
+        "repairs": dict(Counter(kind for r in records for kind in r.repairs)),
+        "input_tokens": sum(r.input_tokens for r in records),
+        "output_tokens": sum(r.output_tokens for r in records),
+        "cached_input_tokens": sum(r.cached_input_tokens for r in records),
+        "queue_wait_seconds": round(sum(r.queue_wait for r in records), 4),
+        "latency_seconds": round(sum(r.latency for r in records), 4),
+        "cost": round(sum(r.cost for r in records), 6),
+    }
+
+
+class MetricsLedger:
+    """
+    Collects the CallRecords of a session.
+    """
+
+    def __init__(self) -> None:
+        self.records: List[CallRecord] = []
+        self._lock = threading.Lock()
+
+    def add(self, record: CallRecord) -> None:
+        with self._lock:
+            self.records.append(record)
+
+    def for_task(self, task_id: str) -> List[CallRecord]:
+        with self._lock:
+            return [r for r in self.records if r.task_id == task_id]
+
+    def latest(self, agent: Optional[str], task_id: Optional[str]) -> Optional[CallRecord]:
+        """Returns the most recent record of `agent` for `task_id`."""
+        with self._lock:
+            return next((r for r in reversed(self.records) if r.agent == agent and r.task_id == task_id), None)
+
+    def summary(self) -> Dict[str, Any]:
+        """Returns the totals and the per-task, per-agent and per-model aggregates."""
+        with self._lock:
+            records = list(self.records)
+
+        def grouped(key) -> Dict[str, Any]:
+            groups: Dict[str, List[CallRecord]] = {}
+            for record in records:
+                groups.setdefault(key(record), []).append(record)
+            return {name: _aggregate(group) for name, group in groups.items()}
+
+        return {
+            "totals": _aggregate(records),
+            "by_task": grouped(lambda r: r.task_id or "-"),
+            "by_agent": grouped(lambda r: r.agent or "-"),
+            "by_model": grouped(lambda r: f"{r.provider}:{r.model}"),
+        }
+
+
+@dataclass
+class _Scope:
+    ledger: MetricsLedger
+    agent: Optional[str] = None
+    task_id: Optional[str] = None
+
+
+_scope: ContextVar[Optional[_Scope]] = ContextVar("t20_metrics_scope", default=None)
+
+
+@contextmanager
+def call_scope(ledger: MetricsLedger, agent: Optional[str] = None, task_id: Optional[str] = None) -> Iterator[None]:
+    """Attributes the LLM calls made inside the block to `agent` and `task_id` and records them in `ledger`."""
+    token = _scope.set(_Scope(ledger=ledger, agent=agent, task_id=task_id))
+    try:
+        yield
+    finally:
+        _scope.reset(token)
+
+
+def report_repair(repairs: List[str]) -> None:
+    """
+    Notes the kinds of local repairs applied to a response. Inside a call they go to
+    its record; after a call (e.g. once a stream was consumed) to the latest record
+    of the current scope.
+    """
+    record = current_call.get()
+    if record is None:
+        scope = _scope.get()
+        record = scope.ledger.latest(scope.agent, scope.task_id) if scope is not None else None
+    if record is not None:
+        record.repairs.extend(kind for kind in repairs if kind not in record.repairs)
+
+
+def scope_agent() -> Optional[str]:
+    """Returns the agent the current LLM calls are attributed to (see `call_scope`)."""
+    scope = _scope.get()
+    return scope.agent if scope is not None else None
+
+
+class MeteredLLM(LLMWrapper):
+    """
+    Records a CallRecord for each call. Inner layers and providers fill in queue wait,
+    token usage, cache hits and coalescing through `t20.core.agents.llm.current_call`.
+    Extra keyword options (e.g. `use_cache`) are passed on to the inner layer.
+    """
+
+    def _start(self, streamed: bool) -> CallRecord:
+        return CallRecord(provider=self.provider_name, model=self.species, streamed=streamed)
+
+    def _finish(self, record: CallRecord, started: float, system_instruction: str, contents: str,
+                output: Optional[str]) -> None:
+        record.latency = time.monotonic() - started
+        if output is None:
+            record.ok = False
+        if not record.tokens_reported:
+            record.input_tokens = estimate_tokens(system_instruction) + estimate_tokens(contents)
+            record.output_tokens = estimate_tokens(output)
+        if not (record.cache_hit or record.coalesced):
+            record.cost = get_pricing().cost(record.provider, record.model, record.input_tokens,
+                                             record.output_tokens, record.cached_input_tokens)
+
+        scope = _scope.get()
+        if scope is not None:
+            record.agent, record.task_id = scope.agent, scope.task_id
+            scope.ledger.add(record)
+        logger.debug(f"LLM call metrics: {record.model_dump_json()}")
+
+    async def generate_content(self, model_name: str, contents: str, system_instruction: str = '',
+                               temperature: float = 0.7, response_mime_type: str = 'text/plain',
+                               response_schema: Any = None, **options: Any) -> Optional[Any]:
+        record = self._start(streamed=False)
+        started = time.monotonic()
+        response = None
+        token = current_call.set(record)
+        try:
+            response = await self.inner.generate_content(model_name, contents, system_instruction, temperature,
+                                                         response_mime_type, response_schema, **options)
+        finally:
+            current_call.reset(token)
+            record.time_to_first_token = time.monotonic() - started if response is not None else None
+            self._finish(record, started, system_instruction, contents,
+                         response_text(response) if response is not None else None)
+        return response
+
+    async def generate_stream(self, model_name: str, contents: str, system_instruction: str = '',
+                              temperature: float = 0.7, response_mime_type: str = 'text/plain',
+                              response_schema: Any = None, **options: Any) -> AsyncIterator[str]:
+        record = self._start(streamed=True)
+        started = time.monotonic()
+        chunks: List[str] = []
+        stream = self.inner.generate_stream(model_name, contents, system_instruction, temperature,
+                                            response_mime_type, response_schema, **options)
+        try:
+            while True:
+                # The record is made current only while the inner stream runs, never across a yield.
+                token = current_call.set(record)
+                try:
+                    chunk = await stream.__anext__()
+                except StopAsyncIteration:
+                    break
+                finally:
+                    current_call.reset(token)
+                if record.time_to_first_token is None:
+                    record.time_to_first_token = time.monotonic() - started
+                chunks.append(chunk)
+                yield chunk
+        except Exception:
+            record.ok = False
+            raise
+        finally:
+            await stream.aclose()
+            self._finish(record, started, system_instruction, contents, "".join(chunks) if chunks else None)
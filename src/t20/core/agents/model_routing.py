@@ -0,0 +1,92 @@
+"""This module chooses the model of a task from its attributes.
+
+Routing rules (the `model_routing` section of the runtime configuration) are
+checked in order; the first rule whose conditions all hold for a task decides
+its model, overriding the model of the agent. A rule can match on the agent,
+the task role, the action verb (the first word of the task description, e.g.
+`summarize`) and the estimated prompt size in tokens:
+
+    model_routing:
+      - when: {action: "summari[sz]e|translate", max_prompt_tokens: 4000}
+        model: ollama:llama3
+      - when: {role: "coder|developer", min_prompt_tokens: 2000}
+        model: gemini-2.5-pro
+
+The model may also be a cascade (see `t20.core.agents.cascade`).
+"""
+
+import logging
+import re
+from typing import Any, Dict, List, Optional
+
+from t20.core.common.types import Task
+
+logger = logging.getLogger(__name__)
+
+
+def action_verb(task: Task) -> str:
+    """Returns the action verb of a task: its `action_verb` if set, else the first word of its description."""
+    verb = getattr(task, "action_verb", None) or next(iter(task.description.split()), "")
+    return re.sub(r"\W", "", verb).lower()
+
+
+class RoutingRule:
+    """
+    Routes the tasks matching all of its conditions to `model`.
+    """
+
+    def __init__(self, model: str, when: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Args:
+            model (str): The model (or cascade) of matching tasks.
+            when (Dict[str, Any]): The conditions: `agent`, `role` and `action` are regular
+                expressions matched case-insensitively against the whole value;
+                `min_prompt_tokens` and `max_prompt_tokens` bound the estimated prompt size.
+        """
+        when = dict(when or {})
+        self.model = model
+        self.patterns = {key: re.compile(str(when.pop(key)), re.IGNORECASE)
+                         for key in ("agent", "role", "action") if key in when}
+        self.min_prompt_tokens = when.pop("min_prompt_tokens", None)
+        self.max_prompt_tokens = when.pop("max_prompt_tokens", None)
+        if when:
+            raise ValueError(f"Unknown routing conditions for '{model}': {', '.join(when)}")
+
+    def matches(self, agent: str, task: Task, prompt_tokens: int) -> bool:
+        values = {"agent": agent, "role": task.role, "action": action_verb(task)}
+        if any(not pattern.fullmatch(values[key]) for key, pattern in self.patterns.items()):
+            return False
+        if self.min_prompt_tokens is not None and prompt_tokens < self.min_prompt_tokens:
+            return False
+        return self.max_prompt_tokens is None or prompt_tokens <= self.max_prompt_tokens
+
+
+class ModelRouting:
+    """
+    The ordered routing rules shared by all agents.
+    """
+
+    def __init__(self, rules: Optional[List[Dict[str, Any]]] = None) -> None:
+        self.rules = [RoutingRule(**rule) for rule in rules or []]
+
+    def model_for(self, agent: str, task: Task, prompt_tokens: int) -> Optional[str]:
+        """Returns the model of the first rule matching the task, or None to keep the agent's model."""
+        for rule in self.rules:
+            if rule.matches(agent, task, prompt_tokens):
+                return rule.model
+        return None
+
+
+_model_routing = ModelRouting()
+
+
+def configure_model_routing(rules: Optional[List[Dict[str, Any]]]) -> ModelRouting:
+    """Installs the process-wide routing rules from the `model_routing` section of the runtime configuration."""
+    global _model_routing
+    _model_routing = ModelRouting(rules)
+    return _model_routing
+
+
+def get_model_routing() -> ModelRouting:
+    """Returns the process-wide routing rules."""
+    return _model_routing
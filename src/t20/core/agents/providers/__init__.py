@@ -0,0 +1,5 @@
+"""LLM provider implementations.
+
+Each module registers its provider with `register_provider` when imported.
+They are imported lazily by `t20.core.agents.llm.get_provider_class`.
+"""
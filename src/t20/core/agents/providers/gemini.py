@@ -0,0 +1,175 @@
+"""This module provides the Google GenAI (Gemini) provider."""
+
+import functools
+import json
+import logging
+import re
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional, Tuple
+
+from google import genai
+from google.genai import types
+from pydantic import BaseModel
+
+from t20.core.agents.clients import ClientRegistry, get_client_registry
+from t20.core.agents.llm import LLM, EmptyResponseError, max_output_tokens, register_provider, report_usage, system_texts
+
+logger = logging.getLogger(__name__)
+
+
+@register_provider("gemini")
+class Gemini(LLM):
+    """
+    Provides a centralized place for LLM-related configurations and utilities.
+    """
+    def __init__(self, species: str) -> None:
+        super().__init__(species)
+
+
+    async def generate_content(self, model_name: str, contents: str, system_instruction: str = '',
+                         temperature: float = 0.7, response_mime_type: str = 'text/plain', response_schema: BaseModel = None) -> Optional[str]: # type: ignore
+        """
+        Generates content using the specified GenAI model.
+
+        Args:
+            model_name (str): The name of the model to use (e.g., "gemini-pro").
+            contents (str): The input content for the model.
+            system_instruction (str, optional): System-level instructions for the model.
+            temperature (float, optional): Controls the randomness of the output. Defaults to 0.7.
+            response_mime_type (str, optional): The desired MIME type for the response.
+            response_schema (Any, optional): The schema for the response.
+
+        Returns:
+            types.GenerateContentResponse: The response from the GenAI model.
+        """
+        client = self._get_client()
+        if not client:
+            return None
+
+        # Failures propagate to the retry layer (see t20.core.agents.retry).
+        response = await self._send(client, model_name, system_instruction, lambda cached: client.aio.models.generate_content(
+            model=model_name,
+            contents=[
+                types.Part.from_text(text=contents)
+            ],
+            config=self._make_config(system_instruction, temperature, response_mime_type, response_schema, cached),
+        ))
+        if not response.candidates or response.candidates[0].content is None or response.candidates[0].content.parts is None or not response.candidates[0].content.parts or response.candidates[0].content.parts[0].text is None:
+            raise EmptyResponseError(f"Gemini: No content in response from model {model_name}.")
+        if response.usage_metadata:
+            usage = response.usage_metadata
+            report_usage(usage.prompt_token_count, usage.candidates_token_count, usage.cached_content_token_count)
+
+        if isinstance(response.parsed, BaseModel):
+            return response.parsed
+
+        text = ''.join(p.text for p in response.candidates[0].content.parts).strip()
+
+        if response_mime_type == 'application/json':
+            if not text.startswith('{'):
+                # Attempt to extract JSON from a potentially malformed response
+                match = re.search(r"```json\n({.*})\n```", text, re.DOTALL)
+                if match:
+                    text = match.group(1)
+
+            try:
+                # Validate against schema if provided
+                if response_schema:
+                    return response_schema.model_validate_json(text)
+                return json.loads(text)
+            except Exception as ex:
+                logger.exception(f"Error parsing or validating JSON response: {ex}")
+
+        return text
+
+    async def generate_stream(self, model_name: str, contents: str, system_instruction: str = '',
+                         temperature: float = 0.7, response_mime_type: str = 'text/plain', response_schema: BaseModel = None) -> AsyncIterator[str]: # type: ignore
+        """
+        Streams content from the specified GenAI model.
+
+        Yields:
+            str: Chunks of generated text as they arrive.
+        """
+        client = self._get_client()
+        if not client:
+            return
+
+        stream = await self._send(client, model_name, system_instruction, lambda cached: client.aio.models.generate_content_stream(
+            model=model_name,
+            contents=[
+                types.Part.from_text(text=contents)
+            ],
+            config=self._make_config(system_instruction, temperature, response_mime_type, response_schema, cached),
+        ))
+        usage = None
+        async for chunk in stream:
+            usage = chunk.usage_metadata or usage
+            if chunk.text:
+                yield chunk.text
+        if usage:
+            report_usage(usage.prompt_token_count, usage.candidates_token_count, usage.cached_content_token_count)
+
+    async def _send(self, client: genai.Client, model_name: str, system_instruction: str,
+                    request: Callable[[Optional[str]], Awaitable[Any]]) -> Any:
+        """
+        Sends `request(cached_content)`, referring to the cached system prefix when context caching is enabled.
+        Falls back to an inline prefix when the provider rejects the cache handle.
+        """
+        from t20.core.agents.context_cache import get_context_cache
+        from t20.core.agents.retry import status_code_of
+
+        async def create(ttl_seconds: float) -> str:
+            cached_content = await client.aio.caches.create(model=model_name, config=types.CreateCachedContentConfig(
+                system_instruction=list(Gemini._system_parts(system_instruction)),
+                ttl=f"{int(ttl_seconds)}s",
+                display_name="t20-system-prefix",
+            ))
+            return cached_content.name
+
+        context_cache = get_context_cache()
+        cached = await context_cache.handle(f"gemini:{model_name}", (*system_texts, system_instruction), create)
+        if cached:
+            try:
+                return await request(cached)
+            except Exception as ex:
+                if status_code_of(ex) not in (400, 403, 404):
+                    raise
+                logger.warning(f"Gemini: cached prefix {cached} was rejected ({ex}), sending it inline")
+                context_cache.invalidate(cached)
+        return await request(None)
+
+    @staticmethod
+    @functools.lru_cache(maxsize=64)
+    def _system_parts(system_instruction: str) -> Tuple[types.Part, ...]:
+        """The system texts as Parts, built once per agent system prompt."""
+        return tuple(types.Part.from_text(text=s) for s in (*system_texts, system_instruction))
+
+    @staticmethod
+    def _make_config(system_instruction: str, temperature: float, response_mime_type: str,
+                     response_schema: Any, cached_content: Optional[str] = None) -> types.GenerateContentConfig:
+        # A cached prefix already carries the system instruction; the API rejects both at once.
+        return types.GenerateContentConfig(
+            system_instruction=None if cached_content else list(Gemini._system_parts(system_instruction)),
+            cached_content=cached_content,
+            temperature=temperature,
+            response_mime_type=response_mime_type,
+            response_schema=response_schema,
+            max_output_tokens=max_output_tokens(),
+        )
+
+    async def warm(self) -> None:
+        client = self._get_client()
+        await client.aio.models.get(model=self.species)
+
+    def _get_client(self) -> genai.Client:
+        """
+        Returns the shared GenAI client.
+        """
+        def build(registry: ClientRegistry) -> genai.Client:
+            logger.info("\n--------------------------\n".join(system_texts))
+            return genai.Client(http_options=types.HttpOptions(async_client_args=registry.httpx_args()))
+
+        try:
+            return get_client_registry().get("gemini", build)
+        except Exception as e:
+            logger.exception(f"Error initializing GenAI client: {e}")
+            raise
@@ -0,0 +1,103 @@
+"""This module provides the Hugging Face Inference provider."""
+
+import logging
+import os
+from typing import AsyncIterator, Optional
+
+from pydantic import BaseModel
+from huggingface_hub import InferenceClient, ChatCompletionInputResponseFormatText, ChatCompletionInputResponseFormatJSONObject, ChatCompletionInputResponseFormatJSONSchema, ChatCompletionInputJSONSchema
+
+from t20.core.agents.clients import get_client_registry
+from t20.core.agents.llm import LLM, iterate_blocking, max_output_tokens, register_provider, report_usage, run_blocking
+
+logger = logging.getLogger(__name__)
+
+
+@register_provider("hf")
+class HfInference(LLM):
+    """
+    Provides a centralized place for LLM-related configurations and utilities.
+    The blocking `InferenceClient` is driven from the LLM worker pool.
+    """
+
+    def __init__(self, species: str):
+        super().__init__(species)
+
+    async def generate_content(self, model_name: str, contents: str, system_instruction: str = '',
+                         temperature: float = 0.7, response_mime_type: str = 'text/plain', response_schema: BaseModel = None) -> Optional[str]: # type: ignore
+        """Generates content by collecting the chunks of `generate_stream`."""
+        return "".join([chunk async for chunk in self.generate_stream(
+            model_name, contents, system_instruction, temperature, response_mime_type, response_schema)])
+
+    async def generate_stream(self, model_name: str, contents: str, system_instruction: str = '',
+                         temperature: float = 0.7, response_mime_type: str = 'text/plain', response_schema: BaseModel = None) -> AsyncIterator[str]: # type: ignore
+        """
+        Streams content from the specified GenAI model.
+
+        Args:
+            model_name (str): The name of the model to use (e.g., "gemini-pro").
+            contents (str): The input content for the model.
+            system_instruction (str, optional): System-level instructions for the model.
+            temperature (float, optional): Controls the randomness of the output. Defaults to 0.7.
+            response_mime_type (str, optional): The desired MIME type for the response.
+            response_schema (Any, optional): The schema for the response.
+
+        Yields:
+            str: Chunks of generated text as they arrive.
+        """
+        client = self._get_client()
+        if not client:
+            return
+
+        try:
+            stream = await run_blocking(
+                client.chat.completions.create,
+                messages=[
+                    {
+                        "role": "system",
+                        "content": system_instruction
+                    },
+                    {
+                        "role": "user",
+                        "content": contents
+                    },
+                ],
+                temperature=temperature,
+                max_tokens=max_output_tokens(),
+                top_p=1,
+                stream=True,
+                response_format=response_schema.model_json_schema(mode="serialization")
+#                response_schema=response_format_from_pydantic_model(response_schema) if response_schema else None,
+
+#                response_format=ChatCompletionInputResponseFormatText() if response_mime_type == 'text/plain' else ChatCompletionInputResponseFormatJSONObject() #if response_schema is None else ChatCompletionInputResponseFormatJSONSchema(json_schema=ChatCompletionInputJSONSchema(name=response_schema.model_json_schema()))
+            )
+
+            async for chunk in iterate_blocking(stream):
+                if getattr(chunk, "usage", None):
+                    report_usage(chunk.usage.prompt_tokens, chunk.usage.completion_tokens)
+                if not chunk.choices or chunk.choices[0].delta.content is None:
+                    continue
+                print(chunk.choices[0].delta.content, end="")
+                yield chunk.choices[0].delta.content
+
+            return
+        except Exception as e:
+            logger.error(f"Error generating content with model {model_name}: {e}")
+            raise
+
+    def _get_client(self):
+        """
+        Returns a inference client instance.
+        """
+        try:
+            # InferenceClient is blocking and has its own session; it cannot use the shared async pool.
+            return get_client_registry().get(f"hf:{self.species}", lambda registry: InferenceClient(
+                #provider="featherless-ai",
+                api_key=os.environ.get("HF_TOKEN"),
+                #model="moonshotai/Kimi-K2-Instruct"
+                #model="Qwen/Qwen3-4B-Thinking-2507"
+                model=self.species
+            ))
+        except Exception as e:
+            logger.error(f"Error initializing inference client: {e}")
+            return None
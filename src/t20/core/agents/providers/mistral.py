@@ -0,0 +1,108 @@
+"""This module provides the Mistral provider."""
+
+import logging
+import os
+from typing import AsyncIterator, Optional
+
+from pydantic import BaseModel
+from mistralai import Mistral as MistralClient
+from mistralai.extra.utils import response_format_from_pydantic_model
+
+from t20.core.agents.clients import ClientRegistry, get_client_registry
+from t20.core.agents.llm import LLM, max_output_tokens, register_provider, report_usage, system_texts
+
+logger = logging.getLogger(__name__)
+
+
+@register_provider("mistral")
+class Mistral(LLM):
+    """
+    Provides a centralized place for LLM-related configurations and utilities.
+    """
+    def __init__(self, species: str = 'Mistral'):
+        super().__init__(species)
+    
+    async def generate_content(self, model_name: str, contents: str, system_instruction: str = '',
+                         temperature: float = 0.7, response_mime_type: str = 'text/plain', response_schema: BaseModel = None) -> Optional[str]: # type: ignore
+        """Generates content by collecting the chunks of `generate_stream`."""
+        return "".join([chunk async for chunk in self.generate_stream(
+            model_name, contents, system_instruction, temperature, response_mime_type, response_schema)])
+
+    async def generate_stream(self, model_name: str, contents: str, system_instruction: str = '',
+                         temperature: float = 0.7, response_mime_type: str = 'text/plain', response_schema: BaseModel = None) -> AsyncIterator[str]: # type: ignore
+        """
+        Streams content from the specified Mistral model.
+
+        Args:
+            model_name (str): The name of the model to use (e.g., "mistral-large-latest").
+            contents (str): The input content for the model.
+            system_instruction (str, optional): System-level instructions for the model.
+            temperature (float, optional): Controls the randomness of the output. Defaults to 0.7.
+            response_mime_type (str, optional): The desired MIME type for the response.
+            response_schema (Any, optional): The schema for the response.
+
+        Yields:
+            str: Chunks of generated text as they arrive.
+        """
+        client = Mistral._get_client(species=self.species)
+        if not client:
+            return
+        try:
+            messages = []
+            for s in system_texts:
+                messages.append({"role": "system", "content": s})
+            if system_instruction:
+                messages.append({"role": "system", "content": system_instruction})
+            messages.append({"role": "user", "content": contents})
+
+            print(f"Mistral: Using model {model_name} with temperature {temperature}")
+
+            response_format = {"type": "text"}
+
+            if response_mime_type == 'application/json':
+                response_format = {"type": "json_object"}
+
+            if response_schema:
+                response_format = response_format_from_pydantic_model(response_schema)  # type: ignore
+
+            stream = await client.chat.stream_async(
+                model=self.species,#model_name,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_output_tokens(),
+                response_format=response_format # type: ignore
+            )
+            async for chunk in stream:
+                if chunk.data.usage:
+                    report_usage(chunk.data.usage.prompt_tokens, chunk.data.usage.completion_tokens)
+                if not chunk.data.choices or chunk.data.choices[0].delta.content is None:
+                    continue
+                print(chunk.data.choices[0].delta.content, end="")
+                yield str(chunk.data.choices[0].delta.content)
+
+            return
+        except Exception as e:
+            logger.error(f"Error generating content with model {model_name}: {e}")
+            raise
+
+    async def warm(self) -> None:
+        client = Mistral._get_client(species=self.species)
+        if client:
+            await client.models.list_async()
+
+    @staticmethod
+    def _get_client(species: str):
+        """
+        Returns the shared Mistral client.
+        """
+        def build(registry: ClientRegistry) -> MistralClient:
+            api_key = os.environ.get("MISTRAL_API_KEY")
+            if not api_key:
+                raise ValueError("MISTRAL_API_KEY environment variable not set.")
+            return MistralClient(api_key=api_key, async_client=registry.http_client())
+
+        try:
+            return get_client_registry().get("mistral", build)
+        except Exception as e:
+            logger.exception(f"Error initializing Mistral client: {e}")
+            return None
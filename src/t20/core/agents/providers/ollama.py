@@ -0,0 +1,139 @@
+"""This module provides the Ollama provider."""
+
+import functools
+import logging
+from typing import Any, AsyncIterator, Dict, Optional, Union
+
+from ollama import AsyncClient as Ollama
+from pydantic import BaseModel
+
+from t20.core.agents.clients import get_client_registry
+from t20.core.agents.llm import LLM, max_output_tokens, register_provider, report_usage
+from t20.core.agents.providers.ollama_config import get_ollama_config
+
+logger = logging.getLogger(__name__)
+
+
+@register_provider("ollama")
+class Olli(LLM):
+    """
+    Provides a centralized place for LLM-related configurations and utilities.
+    """
+    def __init__(self, species: str = 'Olli'):
+        super().__init__(species)
+        self.client = None
+
+    async def generate_content(self, model_name: str, contents: str, system_instruction: str = '',
+                         temperature: float = 0.7, response_mime_type: str = 'text/plain', response_schema: BaseModel = None) -> Optional[str]: # type: ignore
+        """Generates content by collecting the chunks of `generate_stream`."""
+        return "".join([chunk async for chunk in self.generate_stream(
+            model_name, contents, system_instruction, temperature, response_mime_type, response_schema)])
+
+    async def generate_stream(self, model_name: str, contents: str, system_instruction: str = '',
+                         temperature: float = 0.7, response_mime_type: str = 'text/plain', response_schema: BaseModel = None) -> AsyncIterator[str]: # type: ignore
+        """
+        Streams content from the specified GenAI model.
+
+        Args:
+            model_name (str): The name of the model to use (e.g., "gemini-pro").
+            contents (str): The input content for the model.
+            system_instruction (str, optional): System-level instructions for the model.
+            temperature (float, optional): Controls the randomness of the output. Defaults to 0.7.
+            response_mime_type (str, optional): The desired MIME type for the response.
+            response_schema (Any, optional): The schema for the response.
+
+        Yields:
+            str: Chunks of generated text as they arrive.
+        """
+        print(f"Olli: Using model {model_name} with temperature {temperature}")
+        client = self._get_client(species=self.species)
+        if not client:
+            return
+
+        config = get_ollama_config()
+        fmt = self._format(response_mime_type, response_schema)
+        options = config.options(temperature=temperature, num_predict=max_output_tokens())
+        started = False
+        try:
+            response = await client.chat(
+                model=self.species,#model_name,
+                messages=[
+                    {
+                        "role": "system",
+                        "content": system_instruction
+                    },
+                    {
+                        "role": "user",
+                        "content": contents
+                    }
+                ],
+                format=fmt,
+                options=options,
+                keep_alive=config.keep_alive,
+                stream=True
+            )
+            async for chunk in response:
+                print(chunk['message']['content'], end="")
+                started = True
+                if chunk.get('done'):
+                    report_usage(chunk.get('prompt_eval_count'), chunk.get('eval_count'))
+                yield chunk['message']['content']
+            return
+        except Exception as e:
+            logger.error(f"Error generating content with model {model_name}: {e}")
+            if started:
+                raise
+
+        try:
+            response = await client.generate(
+                model=self.species,#model_name,
+                prompt=contents,
+                system=system_instruction,
+                format=fmt,
+                options=options,
+                keep_alive=config.keep_alive,
+                stream=True
+            )
+            async for chunk in response:
+                if chunk.get('done'):
+                    report_usage(chunk.get('prompt_eval_count'), chunk.get('eval_count'))
+                if hasattr(chunk, "response") and chunk.response:
+                    print(chunk.response, end="")
+                    yield chunk.response
+            return
+        except Exception as e:
+            logger.error(f"Error generating content with model {model_name}: {e}")
+            raise
+
+    @staticmethod
+    @functools.lru_cache(maxsize=64)
+    def _format(response_mime_type: str, response_schema: Any) -> Union[str, Dict[str, Any], None]:
+        """The `format` of a request: the JSON schema of the response model, built once per model."""
+        if response_schema is not None:
+            return response_schema.model_json_schema()
+        return "json" if response_mime_type == 'application/json' else None
+
+    async def warm(self) -> None:
+        client = self._get_client(species=self.species)
+        if not client:
+            return
+        config = get_ollama_config()
+        if config.preload:
+            # A request without a prompt loads the model and keeps it loaded for keep_alive.
+            logger.info(f"Olli: Preloading model {self.species} (keep_alive={config.keep_alive})")
+            await client.generate(model=self.species, keep_alive=config.keep_alive, options=config.options() or None)
+        else:
+            await client.ps()
+
+    @staticmethod
+    def _get_client(species: str):
+        """
+        Returns the shared Ollama client of the configured host (by default OLLAMA_HOST).
+        """
+        host = get_ollama_config().host
+        try:
+            return get_client_registry().get(f"ollama:{host}" if host else "ollama",
+                                             lambda registry: Ollama(host=host, **registry.httpx_args()))
+        except Exception as e:
+            logger.exception(f"Error initializing Ollama client: {e}")
+            return None
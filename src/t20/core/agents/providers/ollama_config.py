@@ -0,0 +1,63 @@
+"""This module holds the settings of the Ollama provider.
+
+They are kept apart from the provider so that the runtime configuration can be
+applied without importing the Ollama SDK.
+"""
+
+import os
+from typing import Any, Dict, Optional, Union
+
+from t20.core.agents.rate_limit import get_limiter_registry
+
+
+class OllamaConfig:
+    """
+    Settings of the Ollama server (the `ollama` section of the runtime configuration).
+    """
+
+    def __init__(self, host: Optional[str] = None, keep_alive: Union[str, float, None] = "30m", preload: bool = True,
+                 parallel: Optional[int] = None, num_ctx: Optional[int] = None):
+        """
+        Args:
+            host (str, optional): The server URL; defaults to OLLAMA_HOST.
+            keep_alive (str | float, optional): How long the server keeps a model loaded after a request,
+                e.g. "30m", or -1 to keep it loaded. None uses the server's default (5 minutes).
+            preload (bool): Load the agents' models into memory when the system warms up.
+            parallel (int, optional): Requests the server processes concurrently per model (its
+                OLLAMA_NUM_PARALLEL); defaults to that variable when set. Calls beyond it are queued
+                by the rate limiter instead of by the server.
+            num_ctx (int, optional): The context window to load models with; None uses the model's default.
+        """
+        self.host = host
+        self.keep_alive = keep_alive
+        self.preload = preload
+        env_parallel = os.environ.get("OLLAMA_NUM_PARALLEL")
+        self.parallel = parallel or (int(env_parallel) if env_parallel and env_parallel.isdigit() else None)
+        self.num_ctx = num_ctx
+
+    def options(self, **options: Any) -> Dict[str, Any]:
+        """Returns the request options, including the configured context window."""
+        if self.num_ctx:
+            options["num_ctx"] = self.num_ctx
+        return options
+
+
+_ollama_config = OllamaConfig()
+
+
+def configure_ollama(config: Optional[Dict[str, Any]]) -> OllamaConfig:
+    """
+    Installs the Ollama settings from the `ollama` section of the runtime configuration,
+    and limits concurrent calls per Ollama model to the server's parallel slots.
+    """
+    global _ollama_config
+    _ollama_config = OllamaConfig(**{k: v for k, v in (config or {}).items()
+                                     if k in ("host", "keep_alive", "preload", "parallel", "num_ctx")})
+    if _ollama_config.parallel:
+        get_limiter_registry().set_limits("ollama", {"max_concurrent": _ollama_config.parallel})
+    return _ollama_config
+
+
+def get_ollama_config() -> OllamaConfig:
+    """Returns the Ollama settings."""
+    return _ollama_config
@@ -0,0 +1,112 @@
+"""This module provides the OpenAI-compatible provider (`OPENAI_API_BASE`)."""
+
+import logging
+import os
+from typing import AsyncIterator, Optional
+
+from pydantic import BaseModel
+from openai import AsyncOpenAI
+from openai.types.chat.completion_create_params import ResponseFormat
+
+from t20.core.agents.clients import get_client_registry
+from t20.core.agents.llm import LLM, max_output_tokens, register_provider, report_usage
+
+logger = logging.getLogger(__name__)
+
+
+@register_provider("opi")
+class Opi(LLM):
+    """
+    Provides a centralized place for LLM-related configurations and utilities.
+    """
+    def __init__(self, species: str = 'Opi'):
+        super().__init__(species)
+    
+    async def generate_content(self, model_name: str, contents: str, system_instruction: str = '',
+                         temperature: float = 0.7, response_mime_type: str = 'text/plain', response_schema: BaseModel = None) -> Optional[str]: # type: ignore
+        """Generates content by collecting the chunks of `generate_stream`."""
+        return "".join([chunk async for chunk in self.generate_stream(
+            model_name, contents, system_instruction, temperature, response_mime_type, response_schema)])
+
+    async def generate_stream(self, model_name: str, contents: str, system_instruction: str = '',
+                         temperature: float = 0.7, response_mime_type: str = 'text/plain', response_schema: BaseModel = None) -> AsyncIterator[str]: # type: ignore
+        """
+        Streams content from the specified GenAI model.
+
+        Args:
+            model_name (str): The name of the model to use (e.g., "gemini-pro").
+            contents (str): The input content for the model.
+            system_instruction (str, optional): System-level instructions for the model.
+            temperature (float, optional): Controls the randomness of the output. Defaults to 0.7.
+            response_mime_type (str, optional): The desired MIME type for the response.
+            response_schema (Any, optional): The schema for the response.
+
+        Yields:
+            str: Chunks of generated text as they arrive.
+        """
+        client = self._get_client()
+        if not client:
+            return
+
+        try:
+            response_format: ResponseFormat = {"type": "text"}
+
+            if response_mime_type == 'application/json':
+                response_format = {"type": "json_object"}
+
+            if response_schema:
+                response_format = {"type": "json_schema", "json_schema": response_schema.model_json_schema()}   # type: ignore
+
+            print(f"Opi: Using response format {response_format}")
+
+            stream = await client.chat.completions.create(
+                model=model_name,
+                messages=[
+                    {
+                        "role": "system",
+                        "content": system_instruction
+                    },
+                    {
+                        "role": "user",
+                        "content": contents
+                    },
+                ],
+                temperature=temperature,
+                max_tokens=max_output_tokens(),
+                top_p=1,
+                stream=True,
+                stream_options={"include_usage": True},
+                response_format=response_format
+            )
+
+            async for chunk in stream:
+                if chunk.usage:
+                    report_usage(chunk.usage.prompt_tokens, chunk.usage.completion_tokens)
+                if not chunk.choices or chunk.choices[0].delta.content is None:
+                    continue
+                print(chunk.choices[0].delta.content, end="")
+                yield chunk.choices[0].delta.content
+
+            return
+        except Exception as e:
+            logger.error(f"Error generating content with model {model_name}: {e}")
+            raise
+
+    async def warm(self) -> None:
+        client = self._get_client()
+        if client:
+            await client.models.retrieve(self.species)
+
+    def _get_client(self):
+        """
+        Returns the shared async OpenAI client.
+        """
+        try:
+            return get_client_registry().get("opi", lambda registry: AsyncOpenAI(
+                api_key=os.environ.get("OPENAI_API_KEY",""),
+                base_url=os.environ.get("OPENAI_API_BASE"),
+                http_client=registry.http_client(),
+            ))
+        except Exception as e:
+            logger.error(f"Error initializing OpenAI client: {e}")
+            return None
@@ -0,0 +1,251 @@
+"""This module provides per-provider concurrency and rate limiting for LLM calls.
+
+Limits are looked up per `provider:model` key and enforced before a request
+reaches the provider SDK: a cap on concurrent requests, a requests-per-minute
+token bucket and a tokens-per-minute token bucket. Each limiter keeps queue
+depth and wait-time metrics.
+"""
+
+import asyncio
+import logging
+import time
+import weakref
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, Optional
+
+from t20.core.agents.llm import LLM, LLMWrapper, current_call
+
+logger = logging.getLogger(__name__)
+
+
+def estimate_tokens(text: Any) -> int:
+    """Roughly estimates the token count of a text (about four characters per token)."""
+    if not text:
+        return 0
+    return max(1, len(str(text)) // 4)
+
+
+class TokenBucket:
+    """
+    A token bucket refilled continuously at a per-minute rate.
+    The level may go negative when usage is reported after the fact.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        self.rate_per_second = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self.level = self.capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated_at) * self.rate_per_second)
+        self.updated_at = now
+
+    def delay_for(self, amount: float) -> float:
+        """Returns how long to wait until `amount` can be taken (0 if available now)."""
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.rate_per_second
+
+    def take(self, amount: float) -> None:
+        self._refill()
+        self.level -= amount
+
+
+@dataclass
+class LimiterMetrics:
+    """Queue and wait-time counters of a ProviderLimiter."""
+    queue_depth: int = 0
+    in_flight: int = 0
+    requests: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "queue_depth": self.queue_depth,
+            "in_flight": self.in_flight,
+            "requests": self.requests,
+            "total_wait_seconds": round(self.total_wait, 4),
+            "max_wait_seconds": round(self.max_wait, 4),
+            "avg_wait_seconds": round(self.total_wait / self.requests, 4) if self.requests else 0.0,
+        }
+
+
+class ProviderLimiter:
+    """
+    Enforces the limits of one `provider:model` key.
+    """
+
+    def __init__(self, key: str, max_concurrent: Optional[int] = None, rpm: Optional[float] = None,
+                 tpm: Optional[float] = None, burst: Optional[float] = None):
+        """
+        Args:
+            key (str): The `provider:model` key this limiter guards.
+            max_concurrent (int, optional): Maximum number of requests in flight.
+            rpm (float, optional): Requests per minute.
+            tpm (float, optional): Tokens per minute (prompt and output tokens).
+            burst (float, optional): Number of requests that may start back to back. Defaults to `rpm`.
+        """
+        self.key = key
+        self.max_concurrent = max_concurrent
+        self.requests_bucket = TokenBucket(rpm, burst) if rpm else None
+        self.tokens_bucket = TokenBucket(tpm) if tpm else None
+        self.metrics = LimiterMetrics()
+        # asyncio primitives are bound to the loop that first waits on them.
+        self._loop_state: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]" = weakref.WeakKeyDictionary()
+
+    def _primitives(self):
+        loop = asyncio.get_running_loop()
+        state = self._loop_state.get(loop)
+        if state is None:
+            semaphore = asyncio.Semaphore(self.max_concurrent) if self.max_concurrent else None
+            state = (semaphore, asyncio.Lock())
+            self._loop_state[loop] = state
+        return state
+
+    @asynccontextmanager
+    async def acquire(self, tokens: int = 0) -> AsyncIterator[float]:
+        """
+        Waits until a request of `tokens` prompt tokens may be sent.
+
+        Yields:
+            float: The time spent waiting, in seconds.
+        """
+        semaphore, bucket_lock = self._primitives()
+        started = time.monotonic()
+        self.metrics.queue_depth += 1
+        acquired = False
+        try:
+            if semaphore:
+                await semaphore.acquire()
+                acquired = True
+            async with bucket_lock:
+                while True:
+                    delay = max(
+                        self.requests_bucket.delay_for(1) if self.requests_bucket else 0.0,
+                        self.tokens_bucket.delay_for(tokens) if self.tokens_bucket else 0.0,
+                    )
+                    if delay <= 0:
+                        break
+                    await asyncio.sleep(delay)
+                if self.requests_bucket:
+                    self.requests_bucket.take(1)
+                if self.tokens_bucket:
+                    self.tokens_bucket.take(tokens)
+        except BaseException:
+            if acquired:
+                semaphore.release()
+            raise
+        finally:
+            self.metrics.queue_depth -= 1
+
+        waited = time.monotonic() - started
+        self.metrics.requests += 1
+        self.metrics.total_wait += waited
+        self.metrics.max_wait = max(self.metrics.max_wait, waited)
+        record = current_call.get()
+        if record is not None:
+            record.queue_wait += waited
+        if waited > 1.0:
+            logger.info(f"Rate limiter '{self.key}' delayed a request by {waited:.2f}s")
+
+        self.metrics.in_flight += 1
+        try:
+            yield waited
+        finally:
+            self.metrics.in_flight -= 1
+            if semaphore:
+                semaphore.release()
+
+    def record_output(self, tokens: int) -> None:
+        """Charges output tokens against the tokens-per-minute budget."""
+        if self.tokens_bucket and tokens:
+            self.tokens_bucket.take(tokens)
+
+
+class LimiterRegistry:
+    """
+    Shared registry of ProviderLimiters.
+
+    Limits are resolved from the most specific configured key:
+    `provider:model`, then `provider`, then `default`.
+    """
+
+    LIMIT_KEYS = ("max_concurrent", "rpm", "tpm", "burst")
+
+    def __init__(self) -> None:
+        self._limits: Dict[str, Dict[str, Any]] = {}
+        self._limiters: Dict[str, ProviderLimiter] = {}
+
+    def configure(self, limits: Optional[Dict[str, Dict[str, Any]]]) -> None:
+        """Replaces the configured limits (the `llm_limits` section of the runtime configuration)."""
+        self._limits = {key: dict(value or {}) for key, value in (limits or {}).items()}
+        self._limiters.clear()
+
+    def set_limits(self, key: str, limits: Dict[str, Any]) -> None:
+        """Sets the limits of a `provider` or `provider:model` key, e.g. from an agent YAML."""
+        self._limits[key] = {**self._limits.get(key, {}), **limits}
+        self._limiters = {k: v for k, v in self._limiters.items() if not (k == key or k.startswith(f"{key}:"))}
+
+    def get(self, provider: str, model: str) -> ProviderLimiter:
+        """Returns the limiter of a `provider:model` key."""
+        key = f"{provider}:{model}"
+        limiter = self._limiters.get(key)
+        if limiter is None:
+            limits: Dict[str, Any] = {}
+            for source in ("default", provider, key):
+                limits.update(self._limits.get(source, {}))
+            limiter = ProviderLimiter(key, **{k: v for k, v in limits.items() if k in self.LIMIT_KEYS})
+            self._limiters[key] = limiter
+        return limiter
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Returns queue depth and wait-time metrics per `provider:model` key."""
+        return {key: limiter.metrics.as_dict() for key, limiter in self._limiters.items()}
+
+
+_registry = LimiterRegistry()
+
+
+def get_limiter_registry() -> LimiterRegistry:
+    """Returns the process-wide limiter registry."""
+    return _registry
+
+
+class RateLimitedLLM(LLMWrapper):
+    """
+    Waits for the provider's limiter before each `generate_content` call.
+    """
+
+    def __init__(self, inner: LLM, registry: Optional[LimiterRegistry] = None) -> None:
+        super().__init__(inner)
+        self.registry = registry or get_limiter_registry()
+
+    async def generate_content(self, model_name: str, contents: str, system_instruction: str = '',
+                               temperature: float = 0.7, response_mime_type: str = 'text/plain',
+                               response_schema: Any = None, **options: Any) -> Optional[Any]:
+        limiter = self.registry.get(self.provider_name, self.species)
+        async with limiter.acquire(estimate_tokens(system_instruction) + estimate_tokens(contents)):
+            response = await self.inner.generate_content(model_name, contents, system_instruction,
+                                                         temperature, response_mime_type, response_schema, **options)
+        if response is not None:
+            output = response.model_dump_json() if hasattr(response, "model_dump_json") else response
+            limiter.record_output(estimate_tokens(output))
+        return response
+
+    async def generate_stream(self, model_name: str, contents: str, system_instruction: str = '',
+                              temperature: float = 0.7, response_mime_type: str = 'text/plain',
+                              response_schema: Any = None, **options: Any) -> AsyncIterator[str]:
+        limiter = self.registry.get(self.provider_name, self.species)
+        output_chars = 0
+        async with limiter.acquire(estimate_tokens(system_instruction) + estimate_tokens(contents)):
+            async for chunk in self.inner.generate_stream(model_name, contents, system_instruction,
+                                                          temperature, response_mime_type, response_schema, **options):
+                output_chars += len(chunk)
+                yield chunk
+        limiter.record_output(output_chars // 4)
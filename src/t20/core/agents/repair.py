@@ -0,0 +1,49 @@
+"""This module repairs malformed structured output before it reaches the caller.
+
+Providers return JSON responses as text when they cannot parse or validate
+them. RepairingLLM runs such responses through `repair_json` (code fences,
+prose, trailing commas, quotes, truncation and schema coercion) so that a
+slightly malformed answer is used instead of being rejected or requested
+again. The applied repairs are reported on the call's metrics record.
+"""
+
+import logging
+from typing import Any, AsyncIterator, Optional
+
+from t20.core.agents.llm import LLMWrapper
+from t20.core.agents.metrics import report_repair
+from t20.core.parsing.json_repair import JSONRepairError, repair_json
+
+logger = logging.getLogger(__name__)
+
+
+class RepairingLLM(LLMWrapper):
+    """
+    Repairs JSON responses that the provider returned as unparsed text.
+    Streams are passed through; their consumer repairs the complete text.
+    Extra keyword options (e.g. `use_cache`) are passed on to the inner layer.
+    """
+
+    async def generate_content(self, model_name: str, contents: str, system_instruction: str = '',
+                               temperature: float = 0.7, response_mime_type: str = 'text/plain',
+                               response_schema: Any = None, **options: Any) -> Optional[Any]:
+        response = await self.inner.generate_content(model_name, contents, system_instruction, temperature,
+                                                     response_mime_type, response_schema, **options)
+        if response_mime_type != 'application/json' or not isinstance(response, str):
+            return response
+        try:
+            result = repair_json(response, response_schema)
+        except JSONRepairError as e:
+            logger.warning(f"Could not repair the JSON response of model {model_name}: {e}")
+            return response
+        if result.repairs:
+            logger.info(f"Repaired the JSON response of model {model_name} locally: {', '.join(result.repairs)}")
+            report_repair(result.repairs)
+        return result.value
+
+    async def generate_stream(self, model_name: str, contents: str, system_instruction: str = '',
+                              temperature: float = 0.7, response_mime_type: str = 'text/plain',
+                              response_schema: Any = None, **options: Any) -> AsyncIterator[str]:
+        async for chunk in self.inner.generate_stream(model_name, contents, system_instruction, temperature,
+                                                      response_mime_type, response_schema, **options):
+            yield chunk
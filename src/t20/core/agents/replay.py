@@ -0,0 +1,213 @@
+"""This module provides recording and replay of LLM calls.
+
+While a Recorder is active, every response an agent receives is stored in the
+session database, keyed by a stable hash of the request (the same key layout
+as the response cache) as the agent made it, i.e. before inner layers such as
+prompt compaction changed it. The `replay:` provider answers from the
+recordings of a previous session instead of calling a model, looking them up
+by that same key, so a run can be re-executed
+deterministically and without network access, e.g. for regression tests or
+to benchmark the scheduler, storage and API on their own.
+"""
+
+import logging
+from contextvars import ContextVar
+from threading import Lock
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from t20.core.agents.llm import LLM, LLMWrapper, register_provider, response_text
+from t20.core.agents.llm_cache import decode_response, encode_response, make_cache_key
+
+logger = logging.getLogger(__name__)
+
+
+class ReplayMissError(LookupError):
+    """Raised by the replay provider for a request that was not recorded."""
+
+
+# The recording key of the request in flight, set by RecordingLLM for the layers below it.
+current_request_key: ContextVar[Optional[str]] = ContextVar("t20_current_request_key", default=None)
+
+
+def request_key(model_name: str, contents: str, system_instruction: str, temperature: float,
+                response_mime_type: str, response_schema: Any) -> str:
+    """
+    Returns the recording key of a request. It is keyed by the model the agent
+    asked for, so a recording replays regardless of the provider behind it.
+    """
+    return make_cache_key("recording", model_name, system_instruction, contents,
+                          temperature, response_mime_type, response_schema)
+
+
+class Recorder:
+    """
+    Stores the responses of a session's LLM calls in the session database.
+    """
+
+    def __init__(self, db: Any, session_id: str) -> None:
+        self.db = db
+        self.session_id = session_id
+        # A resumed session appends to the responses it already recorded.
+        self._seq: Dict[str, int] = {key: len(responses) for key, responses in db.get_recordings(session_id).items()}
+        self._lock = Lock()
+
+    def record(self, key: str, response: Any) -> None:
+        with self._lock:
+            seq = self._seq.get(key, 0)
+            self._seq[key] = seq + 1
+        self.db.save_recording(self.session_id, key, seq, encode_response(response))
+
+
+class ReplayStore:
+    """
+    The recorded responses of one session. Repeated identical requests get the
+    responses in recording order; once they are used up the last one repeats.
+    """
+
+    def __init__(self, session_id: str, recordings: Dict[str, List[str]]) -> None:
+        self.session_id = session_id
+        self.recordings = recordings
+        self._next: Dict[str, int] = {}
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_session(cls, db: Any, session_id: str) -> "ReplayStore":
+        recordings = db.get_recordings(session_id)
+        if not recordings:
+            raise ValueError(f"Session '{session_id}' has no recorded LLM responses.")
+        return cls(session_id, recordings)
+
+    def next(self, key: str) -> Optional[str]:
+        with self._lock:
+            responses = self.recordings.get(key)
+            if not responses:
+                self.misses += 1
+                return None
+            index = self._next.get(key, 0)
+            self._next[key] = index + 1
+            self.hits += 1
+            return responses[min(index, len(responses) - 1)]
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"session_id": self.session_id, "requests": len(self.recordings), "hits": self.hits, "misses": self.misses}
+
+
+_recorder: Optional[Recorder] = None
+_replay_store: Optional[ReplayStore] = None
+
+
+def start_recording(session: Any) -> Recorder:
+    """Records the LLM responses of the process into `session` from now on."""
+    global _recorder
+    _recorder = Recorder(session._db, session.session_id)
+    return _recorder
+
+
+def stop_recording() -> None:
+    global _recorder
+    _recorder = None
+
+
+def get_recorder() -> Optional[Recorder]:
+    """Returns the active recorder, if any."""
+    return _recorder
+
+
+def start_replay(store: Optional[ReplayStore]) -> None:
+    """Installs the recordings the `replay:` provider answers from (None removes them)."""
+    global _replay_store
+    _replay_store = store
+
+
+def get_replay_store() -> Optional[ReplayStore]:
+    return _replay_store
+
+
+class RecordingLLM(LLMWrapper):
+    """
+    Records every response that reaches the agent while a Recorder is active.
+    Streams are recorded once they were consumed completely. The request key is
+    published in `current_request_key`, so the replay provider below finds the
+    recording even if an inner layer compacted the prompt. Extra keyword
+    options (e.g. `use_cache`) are passed on to the inner layer.
+    """
+
+    async def generate_content(self, model_name: str, contents: str, system_instruction: str = '',
+                               temperature: float = 0.7, response_mime_type: str = 'text/plain',
+                               response_schema: Any = None, **options: Any) -> Optional[Any]:
+        key = request_key(model_name, contents, system_instruction, temperature, response_mime_type, response_schema)
+        token = current_request_key.set(key)
+        try:
+            response = await self.inner.generate_content(model_name, contents, system_instruction, temperature,
+                                                         response_mime_type, response_schema, **options)
+        finally:
+            current_request_key.reset(token)
+        recorder = _recorder
+        if recorder is not None and response is not None:
+            recorder.record(key, response)
+        return response
+
+    async def generate_stream(self, model_name: str, contents: str, system_instruction: str = '',
+                              temperature: float = 0.7, response_mime_type: str = 'text/plain',
+                              response_schema: Any = None, **options: Any) -> AsyncIterator[str]:
+        key = request_key(model_name, contents, system_instruction, temperature, response_mime_type, response_schema)
+        chunks = []
+        stream = self.inner.generate_stream(model_name, contents, system_instruction, temperature,
+                                            response_mime_type, response_schema, **options)
+        try:
+            while True:
+                # The key is set only while the inner stream runs, never across a yield.
+                token = current_request_key.set(key)
+                try:
+                    chunk = await stream.__anext__()
+                except StopAsyncIteration:
+                    break
+                finally:
+                    current_request_key.reset(token)
+                chunks.append(chunk)
+                yield chunk
+        finally:
+            await stream.aclose()
+        recorder = _recorder
+        if recorder is not None and chunks:
+            recorder.record(key, "".join(chunks))
+
+
+@register_provider("replay")
+class ReplayLLM(LLM):
+    """
+    Answers from the installed ReplayStore without calling a model.
+    The species is the one of the recorded run, e.g. `replay:gemini:gemini-2.5-flash`.
+    """
+
+    def __init__(self, species: str, store: Optional[ReplayStore] = None) -> None:
+        super().__init__(species)
+        self.store = store
+
+    def _lookup(self, model_name: str, contents: str, system_instruction: str, temperature: float,
+                response_mime_type: str, response_schema: Any) -> str:
+        store = self.store or _replay_store
+        if store is None:
+            raise ReplayMissError("No recordings installed; call start_replay() first.")
+        # Looked up by the request the agent made, which the recording is keyed on too.
+        key = current_request_key.get() or request_key(model_name, contents, system_instruction, temperature,
+                                                       response_mime_type, response_schema)
+        payload = store.next(key)
+        if payload is None:
+            raise ReplayMissError(f"No recorded response for request {key[:12]} to '{model_name}' "
+                                  f"in session '{store.session_id}'.")
+        return payload
+
+    async def generate_content(self, model_name: str, contents: str, system_instruction: str = '',
+                               temperature: float = 0.7, response_mime_type: str = 'text/plain',
+                               response_schema: Any = None) -> Optional[Any]:
+        payload = self._lookup(model_name, contents, system_instruction, temperature, response_mime_type, response_schema)
+        return decode_response(payload, response_schema)
+
+    async def generate_stream(self, model_name: str, contents: str, system_instruction: str = '',
+                              temperature: float = 0.7, response_mime_type: str = 'text/plain',
+                              response_schema: Any = None) -> AsyncIterator[str]:
+        payload = self._lookup(model_name, contents, system_instruction, temperature, response_mime_type, response_schema)
+        yield response_text(decode_response(payload, response_schema))
@@ -0,0 +1,241 @@
+"""This module provides the retry policy shared by all LLM providers.
+
+Provider errors are classified as retryable (rate limits, server errors,
+timeouts, empty responses) or fatal (validation and client errors). Retryable
+errors are retried with decorrelated-jitter exponential backoff, honoring any
+`Retry-After` hint from the server, until the attempt budget or the overall
+deadline runs out; an attempt still running at the deadline is cancelled.
+Every retry is published on the MessageBus.
+"""
+
+import asyncio
+import email.utils
+import logging
+import random
+import re
+import sys
+import time
+from typing import Any, AsyncIterator, Dict, Optional
+
+from pydantic import BaseModel, ValidationError
+
+from t20.core.agents.llm import LLM, LLMWrapper, CircuitOpenError, EmptyResponseError
+
+logger = logging.getLogger(__name__)
+
+RETRY_TOPIC = "llm_retry"
+
+RETRYABLE_STATUS_CODES = {408, 409, 425, 429, 500, 502, 503, 504}
+
+
+class RetryEvent(BaseModel):
+    """Published on the MessageBus before each retry of an LLM call."""
+    provider: str
+    model: str
+    attempt: int
+    delay: float
+    error: str
+
+
+def status_code_of(exc: BaseException) -> Optional[int]:
+    """Extracts an HTTP status code from the various provider SDK exceptions."""
+    for attr in ("status_code", "code", "status"):
+        value = getattr(exc, attr, None)
+        if isinstance(value, int):
+            return value
+    response = getattr(exc, "response", None)
+    value = getattr(response, "status_code", None)
+    return value if isinstance(value, int) else None
+
+
+def retry_after_of(exc: BaseException) -> Optional[float]:
+    """Returns the server's requested delay in seconds, if the error carries one."""
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None) or getattr(exc, "headers", None)
+    if headers:
+        try:
+            value = headers.get("retry-after-ms")
+            if value is not None:
+                return float(value) / 1000.0
+            value = headers.get("retry-after")
+            if value is not None:
+                try:
+                    return max(0.0, float(value))
+                except ValueError:
+                    date = email.utils.parsedate_to_datetime(value)
+                    return max(0.0, date.timestamp() - time.time())
+        except (TypeError, ValueError, AttributeError):
+            pass
+    # Gemini reports the delay inside the error details as RetryInfo.retryDelay ("30s").
+    match = re.search(r"retryDelay'?\"?\s*:\s*'?\"?(\d+(?:\.\d+)?)s", str(getattr(exc, "details", "")))
+    return float(match.group(1)) if match else None
+
+
+class RetryPolicy:
+    """
+    Decides whether and when a failed LLM call is retried.
+    """
+
+    def __init__(self, max_attempts: int = 5, base_delay: float = 1.0, max_delay: float = 60.0,
+                 deadline: Optional[float] = 300.0):
+        """
+        Args:
+            max_attempts (int): Total number of attempts, including the first one.
+            base_delay (float): Smallest delay between attempts, in seconds.
+            max_delay (float): Largest backoff delay, in seconds (server hints may exceed it).
+            deadline (float, optional): Overall time budget of a call across all attempts, in seconds.
+        """
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+
+    def is_retryable(self, exc: BaseException) -> bool:
+        """Classifies an error as retryable (True) or fatal (False)."""
+        if isinstance(exc, CircuitOpenError):
+            # Retrying cannot help until the breaker lets a probe through.
+            return False
+        if isinstance(exc, EmptyResponseError):
+            return True
+        if isinstance(exc, (ValidationError, ValueError, TypeError, KeyError, NotImplementedError)):
+            return False
+        if isinstance(exc, (asyncio.TimeoutError, TimeoutError, ConnectionError)):
+            return True
+        # Connection, protocol and timeout errors of httpx (used by most provider SDKs).
+        # If httpx was never imported, the error cannot be one of them.
+        httpx = sys.modules.get("httpx")
+        if httpx is not None and isinstance(exc, (httpx.TransportError, httpx.TimeoutException)):
+            return True
+        status = status_code_of(exc)
+        if status is not None:
+            return status in RETRYABLE_STATUS_CODES
+        name = type(exc).__name__
+        return "Timeout" in name or "Connection" in name
+
+    def next_delay(self, previous_delay: float, exc: BaseException) -> float:
+        """Returns the delay before the next attempt (decorrelated jitter, or the server's hint)."""
+        hint = retry_after_of(exc)
+        if hint is not None:
+            return hint
+        return min(self.max_delay, random.uniform(self.base_delay, max(self.base_delay, previous_delay * 3)))
+
+
+_retry_policy = RetryPolicy()
+
+
+def configure_retry_policy(config: Optional[Dict[str, Any]]) -> RetryPolicy:
+    """Installs the process-wide retry policy from the `llm_retry` section of the runtime configuration."""
+    global _retry_policy
+    _retry_policy = RetryPolicy(**{k: v for k, v in (config or {}).items()
+                                   if k in ("max_attempts", "base_delay", "max_delay", "deadline")})
+    return _retry_policy
+
+
+def get_retry_policy() -> RetryPolicy:
+    """Returns the process-wide retry policy."""
+    return _retry_policy
+
+
+async def _first_chunk(stream: AsyncIterator[str]) -> Optional[str]:
+    """Returns the first chunk of `stream`, or None if it is empty."""
+    async for chunk in stream:
+        return chunk
+    return None
+
+
+class RetryingLLM(LLMWrapper):
+    """
+    Retries failed `generate_content` calls according to a RetryPolicy.
+    Each attempt is limited to the time left before the policy's deadline.
+    Returns None once the call has definitively failed.
+    """
+
+    def __init__(self, inner: LLM, policy: Optional[RetryPolicy] = None, message_bus: Any = None) -> None:
+        super().__init__(inner)
+        self._policy = policy
+        self.message_bus = message_bus
+
+    @property
+    def policy(self) -> RetryPolicy:
+        return self._policy or get_retry_policy()
+
+    async def generate_content(self, model_name: str, contents: str, system_instruction: str = '',
+                               temperature: float = 0.7, response_mime_type: str = 'text/plain',
+                               response_schema: Any = None, **options: Any) -> Optional[Any]:
+        started = time.monotonic()
+        delay = self.policy.base_delay
+        attempt = 1
+        while True:
+            try:
+                return await asyncio.wait_for(
+                    self.inner.generate_content(model_name, contents, system_instruction, temperature,
+                                                response_mime_type, response_schema, **options),
+                    self._time_left(started))
+            except Exception as ex:
+                delay = self._backoff(model_name, attempt, delay, started, ex)
+                if delay is None:
+                    return None
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def generate_stream(self, model_name: str, contents: str, system_instruction: str = '',
+                              temperature: float = 0.7, response_mime_type: str = 'text/plain',
+                              response_schema: Any = None, **options: Any) -> AsyncIterator[str]:
+        """
+        Streams content, retrying only failures that happen before the first chunk.
+        The deadline limits the wait for the first chunk. The stream ends empty
+        once the call has definitively failed.
+        """
+        started = time.monotonic()
+        delay = self.policy.base_delay
+        attempt = 1
+        while True:
+            streaming = False
+            stream = self.inner.generate_stream(model_name, contents, system_instruction, temperature,
+                                                response_mime_type, response_schema, **options)
+            try:
+                chunk = await asyncio.wait_for(_first_chunk(stream), self._time_left(started))
+                if chunk is None:
+                    return
+                streaming = True
+                yield chunk
+                async for chunk in stream:
+                    yield chunk
+                return
+            except Exception as ex:
+                if streaming:
+                    raise
+                delay = self._backoff(model_name, attempt, delay, started, ex)
+                if delay is None:
+                    return
+            finally:
+                await stream.aclose()
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def _time_left(self, started: float) -> Optional[float]:
+        """Returns the time left before the policy's deadline (None without a deadline)."""
+        deadline = self.policy.deadline
+        return None if deadline is None else max(0.0, deadline - (time.monotonic() - started))
+
+    def _backoff(self, model_name: str, attempt: int, delay: float, started: float,
+                 error: Exception) -> Optional[float]:
+        """Returns the delay before the next attempt, or None to give up."""
+        policy = self.policy
+        if not policy.is_retryable(error):
+            logger.error(f"Fatal error generating content with model {model_name}: {error}")
+            return None
+        if attempt >= policy.max_attempts:
+            logger.error(f"Giving up on model {model_name} after {attempt} attempts: {error}")
+            return None
+        delay = policy.next_delay(delay, error)
+        if policy.deadline is not None and time.monotonic() - started + delay > policy.deadline:
+            logger.error(f"Giving up on model {model_name}: retry deadline of {policy.deadline}s exceeded ({error})")
+            return None
+
+        logger.warning(f"Retrying content generation for model {model_name} in {delay:.2f} seconds (attempt {attempt + 1}/{policy.max_attempts})...")
+        if self.message_bus:
+            self.message_bus.publish(RETRY_TOPIC, RetryEvent(
+                provider=self.provider_name, model=self.species, attempt=attempt + 1,
+                delay=delay, error=str(error)[:500]))
+        return delay
@@ -0,0 +1,300 @@
+"""This module provides a latency-aware router over several LLM providers.
+
+A `router:` species lists the backends to route between, separated by commas,
+for example `router:gemini:gemini-2.5-flash,ollama:llama3,opi:gpt-4o-mini`.
+Every call goes to the fastest healthy backend according to rolling p50
+latency and error rate. If the call is still running after the backend's p95
+latency, a hedged duplicate is sent to the next backend and whichever result
+arrives first is kept. Until a backend has `min_samples` latencies, the
+conservative `hedge_cold_delay` is used instead, so that cold starts do not
+send every call twice. Failed calls fail over to the next backend.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional
+
+from t20.core.agents.llm import LLM, EmptyResponseError, current_call
+
+logger = logging.getLogger(__name__)
+
+
+class BackendStats:
+    """
+    Rolling latency and error statistics of one router backend.
+    """
+
+    def __init__(self, window: int = 50) -> None:
+        self.latencies: Deque[float] = deque(maxlen=window)
+        self.outcomes: Deque[bool] = deque(maxlen=window)
+
+    def record(self, latency: Optional[float], ok: bool) -> None:
+        if ok and latency is not None:
+            self.latencies.append(latency)
+        self.outcomes.append(ok)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Returns the q-th percentile (0-100) of recent successful latencies, or None without samples."""
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(round(q / 100.0 * (len(ordered) - 1))))]
+
+    @property
+    def p50(self) -> Optional[float]:
+        return self.percentile(50)
+
+    @property
+    def p95(self) -> Optional[float]:
+        return self.percentile(95)
+
+    @property
+    def error_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return self.outcomes.count(False) / len(self.outcomes)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "samples": len(self.outcomes),
+            "p50_seconds": round(self.p50, 4) if self.p50 is not None else None,
+            "p95_seconds": round(self.p95, 4) if self.p95 is not None else None,
+            "error_rate": round(self.error_rate, 4),
+        }
+
+
+class RouterConfig:
+    """
+    Routing options shared by all routers (the `llm_router` section of the runtime configuration).
+    """
+
+    def __init__(self, hedge: bool = True, hedge_min_delay: float = 0.5, window: int = 50,
+                 max_error_rate: float = 0.5, min_samples: int = 5, hedge_cold_delay: float = 10.0):
+        """
+        Args:
+            hedge (bool): Whether to send a hedged duplicate to a second backend when a call is slow.
+            hedge_min_delay (float): Lower bound of the hedge delay, in seconds.
+            window (int): Number of recent calls per backend the statistics are computed over.
+            max_error_rate (float): A backend at or above this error rate is considered unhealthy.
+            min_samples (int): Number of calls before a backend can be considered unhealthy, and
+                               number of latencies before its p95 sets the hedge delay.
+            hedge_cold_delay (float): Hedge delay of a backend with fewer latencies, in seconds.
+        """
+        self.hedge = hedge
+        self.hedge_min_delay = hedge_min_delay
+        self.window = window
+        self.max_error_rate = max_error_rate
+        self.min_samples = min_samples
+        self.hedge_cold_delay = hedge_cold_delay
+
+
+_router_config = RouterConfig()
+# Statistics are shared by every router that uses the same backend.
+_backend_stats: Dict[str, BackendStats] = {}
+
+
+def configure_router(config: Optional[Dict[str, Any]]) -> RouterConfig:
+    """Installs the process-wide routing options from the `llm_router` section of the runtime configuration."""
+    global _router_config
+    _router_config = RouterConfig(**{k: v for k, v in (config or {}).items()
+                                     if k in ("hedge", "hedge_min_delay", "window", "max_error_rate", "min_samples",
+                                              "hedge_cold_delay")})
+    _backend_stats.clear()
+    return _router_config
+
+
+def get_router_config() -> RouterConfig:
+    """Returns the process-wide routing options."""
+    return _router_config
+
+
+def get_backend_stats() -> Dict[str, Dict[str, Any]]:
+    """Returns latency and error statistics per `provider:model` backend."""
+    return {key: stats.as_dict() for key, stats in _backend_stats.items()}
+
+
+class RouterLLM(LLM):
+    """
+    Routes each call to the fastest healthy backend, with hedging and failover.
+    """
+    provider_name = "router"
+
+    def __init__(self, species: str, backends: List[LLM], config: Optional[RouterConfig] = None) -> None:
+        """
+        Args:
+            species (str): The comma-separated backend species.
+            backends (List[LLM]): The backends, in order of preference for ties.
+            config (RouterConfig, optional): Routing options. Defaults to the process-wide options.
+        """
+        super().__init__(species)
+        if not backends:
+            raise ValueError("A router needs at least one backend.")
+        self.backends = backends
+        self._config = config
+
+    @classmethod
+    def from_species(cls, species: str, message_bus: Any = None) -> "RouterLLM":
+        """
+        Builds a router from `provider:model,provider:model,...`.
+        Each backend is rate limited and circuit broken on its own key.
+        """
+        from t20.core.agents.circuit_breaker import CircuitBreakerLLM
+        from t20.core.agents.rate_limit import RateLimitedLLM
+
+        backends: List[LLM] = []
+        for backend_species in (part.strip() for part in species.split(",")):
+            if not backend_species:
+                continue
+            if backend_species.startswith("router:"):
+                raise ValueError(f"Routers cannot be nested: '{backend_species}'")
+            backends.append(CircuitBreakerLLM(RateLimitedLLM(LLM.provider(backend_species)), message_bus=message_bus,
+                                              allow_fallback=False))
+        return cls(species, backends)
+
+    @property
+    def config(self) -> RouterConfig:
+        return self._config or get_router_config()
+
+    def _key(self, backend: LLM) -> str:
+        return f"{backend.provider_name}:{backend.species}"
+
+    def stats(self, backend: LLM) -> BackendStats:
+        key = self._key(backend)
+        stats = _backend_stats.get(key)
+        if stats is None:
+            stats = _backend_stats[key] = BackendStats(self.config.window)
+        return stats
+
+    def is_healthy(self, backend: LLM) -> bool:
+        stats = self.stats(backend)
+        return len(stats.outcomes) < self.config.min_samples or stats.error_rate < self.config.max_error_rate
+
+    def ranked(self) -> List[LLM]:
+        """
+        Returns the backends in the order they should be tried: healthy ones by p50 latency
+        (backends without samples first, so that they get measured), then unhealthy ones by error rate.
+        """
+        def latency(backend: LLM) -> float:
+            p50 = self.stats(backend).p50
+            return 0.0 if p50 is None else p50
+
+        healthy = [b for b in self.backends if self.is_healthy(b)]
+        unhealthy = [b for b in self.backends if not self.is_healthy(b)]
+        return sorted(healthy, key=latency) + sorted(unhealthy, key=lambda b: self.stats(b).error_rate)
+
+    def _attribute(self, backend: LLM) -> None:
+        """Attributes the call's metrics to the backend that answered it."""
+        record = current_call.get()
+        if record is not None:
+            record.provider, record.model = backend.provider_name, backend.species
+
+    async def warm(self) -> None:
+        await asyncio.gather(*(backend.warm() for backend in self.backends))
+
+    def hedge_delay(self, backend: LLM) -> float:
+        stats = self.stats(backend)
+        if len(stats.latencies) < self.config.min_samples:
+            return max(self.config.hedge_min_delay, self.config.hedge_cold_delay)
+        return max(self.config.hedge_min_delay, stats.p95)
+
+    async def _call(self, backend: LLM, contents: str, system_instruction: str, temperature: float,
+                    response_mime_type: str, response_schema: Any, **options: Any) -> Any:
+        started = time.monotonic()
+        try:
+            response = await backend.generate_content(backend.species, contents, system_instruction,
+                                                      temperature, response_mime_type, response_schema, **options)
+            if response is None:
+                raise EmptyResponseError(f"Router: backend {self._key(backend)} returned no content.")
+        except asyncio.CancelledError:
+            # The call lost a hedge race; its latency says nothing about the backend.
+            raise
+        except Exception:
+            self.stats(backend).record(None, ok=False)
+            raise
+        self.stats(backend).record(time.monotonic() - started, ok=True)
+        return response
+
+    async def generate_content(self, model_name: str, contents: str, system_instruction: str = '',
+                               temperature: float = 0.7, response_mime_type: str = 'text/plain',
+                               response_schema: Any = None, **options: Any) -> Optional[Any]:
+        """
+        Generates content with the fastest healthy backend.
+
+        Raises:
+            Exception: The last backend error, once every backend has failed.
+        """
+        queue = self.ranked()
+        pending: Dict["asyncio.Future[Any]", LLM] = {}
+        errors: List[Exception] = []
+        hedged = False
+
+        def launch() -> None:
+            backend = queue.pop(0)
+            task = asyncio.ensure_future(self._call(backend, contents, system_instruction, temperature,
+                                                    response_mime_type, response_schema, **options))
+            pending[task] = backend
+
+        launch()
+        try:
+            while pending:
+                timeout = None
+                if self.config.hedge and not hedged and queue and len(pending) == 1:
+                    timeout = self.hedge_delay(next(iter(pending.values())))
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    hedged = True
+                    logger.info(f"Router: hedging slow call to {self._key(next(iter(pending.values())))} "
+                                f"with {self._key(queue[0])}")
+                    launch()
+                    continue
+                for task in done:
+                    backend = pending.pop(task)
+                    try:
+                        result = task.result()
+                    except Exception as ex:
+                        logger.warning(f"Router: backend {self._key(backend)} failed: {ex}")
+                        errors.append(ex)
+                        continue
+                    self._attribute(backend)
+                    return result
+                if not pending and queue:
+                    launch()
+        finally:
+            for task in pending:
+                task.cancel()
+        raise errors[-1]
+
+    async def generate_stream(self, model_name: str, contents: str, system_instruction: str = '',
+                              temperature: float = 0.7, response_mime_type: str = 'text/plain',
+                              response_schema: Any = None, **options: Any) -> AsyncIterator[str]:
+        """
+        Streams content from the fastest healthy backend.
+        Streams are not hedged; a backend that fails before its first chunk fails over to the next one.
+        """
+        error: Optional[Exception] = None
+        for backend in self.ranked():
+            started = time.monotonic()
+            streaming = False
+            try:
+                async for chunk in backend.generate_stream(backend.species, contents, system_instruction,
+                                                           temperature, response_mime_type, response_schema, **options):
+                    if not streaming:
+                        streaming = True
+                        self.stats(backend).record(time.monotonic() - started, ok=True)
+                        self._attribute(backend)
+                    yield chunk
+            except Exception as ex:
+                if streaming:
+                    raise
+                self.stats(backend).record(None, ok=False)
+                logger.warning(f"Router: backend {self._key(backend)} failed: {ex}")
+                error = ex
+                continue
+            if streaming:
+                return
+            self.stats(backend).record(None, ok=False)
+            error = EmptyResponseError(f"Router: backend {self._key(backend)} returned no content.")
+        if error is not None:
+            raise error
@@ -0,0 +1,88 @@
+"""This module coalesces identical in-flight LLM calls.
+
+When several callers send the same request at the same time, only the first
+one reaches the provider; the others wait for its result. Requests are
+identified by the same key as the response cache (see `make_cache_key`).
+"""
+
+import asyncio
+import json
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from pydantic import BaseModel
+
+from t20.core.agents.llm import LLM, LLMWrapper, current_call
+from t20.core.agents.llm_cache import make_cache_key
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """
+    Runs at most one call per key at a time and shares its outcome with every waiter.
+    """
+
+    def __init__(self) -> None:
+        self._calls: Dict[str, "asyncio.Task[Any]"] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, call: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Returns the result of `call()`, sharing it with concurrent callers of the same key.
+        Cancelling one waiter does not cancel the shared call.
+        """
+        task = self._calls.get(key)
+        if task is None or task.get_loop() is not asyncio.get_running_loop():
+            task = asyncio.ensure_future(call())
+            self._calls[key] = task
+            task.add_done_callback(lambda t, k=key: self._forget(k, t))
+            self.leaders += 1
+            return await asyncio.shield(task)
+
+        self.coalesced += 1
+        record = current_call.get()
+        if record is not None:
+            record.coalesced = True
+        logger.debug(f"Coalescing identical in-flight LLM call ({key[:12]})")
+        result = await asyncio.shield(task)
+        # Followers get their own copy so that no caller can mutate another's result.
+        return result.model_copy(deep=True) if isinstance(result, BaseModel) else result
+
+    def _forget(self, key: str, task: "asyncio.Task[Any]") -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+
+_single_flight = SingleFlight()
+
+
+def get_single_flight() -> SingleFlight:
+    """Returns the process-wide single-flight group."""
+    return _single_flight
+
+
+class SingleFlightLLM(LLMWrapper):
+    """
+    Shares one provider call between concurrent identical `generate_content` calls.
+    Streams are passed through unshared. Extra keyword options are part of the request.
+    """
+
+    def __init__(self, inner: LLM, group: Optional[SingleFlight] = None) -> None:
+        super().__init__(inner)
+        self.group = group or get_single_flight()
+
+    async def generate_content(self, model_name: str, contents: str, system_instruction: str = '',
+                               temperature: float = 0.7, response_mime_type: str = 'text/plain',
+                               response_schema: Any = None, **options: Any) -> Optional[Any]:
+        key = make_cache_key(self.provider_name, model_name, system_instruction, contents,
+                             temperature, response_mime_type, response_schema)
+        if options:
+            # Extra options are passed on to the provider and may change its answer.
+            key += ":" + json.dumps(options, sort_keys=True, default=repr)
+        return await self.group.do(key, lambda: self.inner.generate_content(
+            model_name, contents, system_instruction, temperature, response_mime_type, response_schema, **options))
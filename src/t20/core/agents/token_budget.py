@@ -0,0 +1,218 @@
+"""This module budgets the tokens of LLM calls before they are sent.
+
+Prompt sizes are predicted locally with a tokenizer approximation for each
+provider family, so prompts that would not fit the model's context window are
+compacted (or rejected) without a round trip. The output cap requested from the
+provider (`max_output_tokens`) is derived per agent from the output sizes of
+its previous calls, instead of a fixed 50k tokens: large caps make several
+providers reserve capacity for the whole cap, which slows down scheduling.
+"""
+
+import logging
+import math
+import re
+import threading
+from collections import deque
+from typing import Any, AsyncIterator, Deque, Dict, Optional, Tuple
+
+from t20.core.agents.llm import (DEFAULT_MAX_OUTPUT_TOKENS, LLMWrapper, current_call, output_token_limit,
+                                 response_text)
+from t20.core.agents.metrics import scope_agent
+
+logger = logging.getLogger(__name__)
+
+_PIECES = re.compile(r"(?P<word>[A-Za-z]+)|(?P<number>[0-9]+)|(?P<space>\s{2,})|(?P<other>[^\sA-Za-z0-9])")
+# Average letters per token of English words for each provider family's tokenizer.
+_WORD_CHARS = {"gemini": 4.4, "opi": 4.6, "mistral": 3.9, "ollama": 4.1, "hf": 4.1}
+
+
+def count_tokens(text: str, provider: Optional[str] = None) -> int:
+    """
+    Approximates the token count of `text` for a provider family's tokenizer: words by
+    length, numbers in groups of three digits, runs of whitespace and every other symbol
+    (punctuation, non-Latin characters) as one token.
+    """
+    if not text:
+        return 0
+    word_chars = _WORD_CHARS.get(provider or "", 4.2)
+    tokens = 0.0
+    for match in _PIECES.finditer(text):
+        kind, length = match.lastgroup, match.end() - match.start()
+        if kind == "word":
+            tokens += max(1.0, length / word_chars)
+        elif kind == "number":
+            tokens += math.ceil(length / 3)
+        elif kind == "space":
+            tokens += math.ceil(length / 8)
+        else:
+            tokens += 1
+    return max(1, round(tokens))
+
+
+class PromptTooLargeError(ValueError):
+    """Raised when a prompt does not fit the model's context window and compaction is disabled."""
+
+
+class TokenBudget:
+    """
+    Context windows, prompt compaction and adaptive output caps (the `llm_budget` section of the runtime configuration).
+    """
+
+    def __init__(self, context_windows: Optional[Dict[str, int]] = None, on_oversize: str = "compact",
+                 min_output_tokens: int = 1024, max_output_tokens: int = DEFAULT_MAX_OUTPUT_TOKENS,
+                 headroom: float = 1.5, history: int = 20, min_samples: int = 3) -> None:
+        """
+        Args:
+            context_windows (Dict[str, int]): Context window sizes by `default`, provider or `provider:model`.
+            on_oversize (str): "compact" cuts the middle of oversized prompts, "reject" raises PromptTooLargeError.
+            min_output_tokens (int): Lower bound of the output cap; also kept free in the context window.
+            max_output_tokens (int): Upper bound of the output cap, and the cap without history.
+            headroom (float): The cap is this factor times the largest recent output of the agent.
+            history (int): Number of recent outputs per agent the cap is derived from.
+            min_samples (int): Number of outputs before the cap adapts.
+        """
+        if on_oversize not in ("compact", "reject"):
+            raise ValueError(f"Unknown on_oversize '{on_oversize}', expected 'compact' or 'reject'.")
+        self.context_windows = dict(context_windows or {})
+        self.on_oversize = on_oversize
+        self.min_output_tokens = min_output_tokens
+        self.max_output_tokens = max_output_tokens
+        self.headroom = headroom
+        self.min_samples = min_samples
+        self._outputs: Dict[str, Deque[int]] = {}
+        self._history = history
+        self._lock = threading.Lock()
+
+    def context_window(self, provider: str, model: str) -> Optional[int]:
+        for source in (f"{provider}:{model}", provider, "default"):
+            if source in self.context_windows:
+                return self.context_windows[source]
+        return None
+
+    def output_limit(self, key: str) -> int:
+        """Returns the output cap for the next call of `key` (an agent, or a model outside of agents)."""
+        with self._lock:
+            outputs = list(self._outputs.get(key, ()))
+        if len(outputs) < self.min_samples:
+            return self.max_output_tokens
+        return max(self.min_output_tokens, min(self.max_output_tokens, int(max(outputs) * self.headroom)))
+
+    def record_output(self, key: str, tokens: int, limit: int) -> None:
+        """Adds an output size to the history of `key`. An output that hit its cap counts twice as large."""
+        if tokens >= limit * 0.95:
+            logger.warning(f"Output of {key} reached its cap of {limit} tokens; raising the cap.")
+            tokens = limit * 2
+        with self._lock:
+            self._outputs.setdefault(key, deque(maxlen=self._history)).append(tokens)
+
+    def plan(self, provider: str, model: str, key: str, system_instruction: str, contents: str) -> Tuple[str, int]:
+        """
+        Fits a request into the model's context window.
+
+        Returns:
+            Tuple[str, int]: The (possibly compacted) contents and the output cap.
+
+        Raises:
+            PromptTooLargeError: If the prompt does not fit and cannot be compacted.
+        """
+        limit = self.output_limit(key)
+        window = self.context_window(provider, model)
+        if window is None:
+            return contents, limit
+        system_tokens = count_tokens(system_instruction, provider)
+        prompt_tokens = system_tokens + count_tokens(contents, provider)
+        available = window - prompt_tokens
+        if available >= self.min_output_tokens:
+            return contents, min(limit, available)
+
+        allowed = window - system_tokens - self.min_output_tokens
+        message = (f"Prompt of ~{prompt_tokens} tokens for {provider}:{model} leaves less than "
+                   f"{self.min_output_tokens} output tokens in its {window}-token context window")
+        if self.on_oversize == "reject" or allowed <= 0:
+            raise PromptTooLargeError(message + ".")
+        logger.warning(message + f"; compacting it to ~{allowed} tokens.")
+        return compact(contents, allowed, provider), self.min_output_tokens
+
+
+def compact(text: str, max_tokens: int, provider: Optional[str] = None) -> str:
+    """Cuts the middle of `text` so that it fits `max_tokens`, keeping its beginning (the goal) and end (the instructions)."""
+    tokens = count_tokens(text, provider)
+    keep = len(text)
+    while tokens > max_tokens and keep > 0:
+        keep = int(keep * max_tokens / tokens * 0.95)
+        compacted = (text[:keep // 2] + "\n\n[... part of the prompt was omitted to fit the context window ...]\n\n"
+                     + text[len(text) - keep // 2:])
+        tokens = count_tokens(compacted, provider)
+    return text if keep == len(text) else compacted
+
+
+_token_budget = TokenBudget()
+
+
+def configure_token_budget(config: Optional[Dict[str, Any]]) -> TokenBudget:
+    """Installs the process-wide token budget from the `llm_budget` section of the runtime configuration."""
+    global _token_budget
+    _token_budget = TokenBudget(**{k: v for k, v in (config or {}).items()
+                                   if k in ("context_windows", "on_oversize", "min_output_tokens",
+                                            "max_output_tokens", "headroom", "history", "min_samples")})
+    return _token_budget
+
+
+def get_token_budget() -> TokenBudget:
+    """Returns the process-wide token budget."""
+    return _token_budget
+
+
+class TokenBudgetLLM(LLMWrapper):
+    """
+    Fits each request into the model's context window and sets its output cap (see `max_output_tokens`).
+    Extra keyword options (e.g. `use_cache`) are passed on to the inner layer.
+    """
+
+    def _plan(self, system_instruction: str, contents: str) -> Tuple[str, str, int]:
+        key = scope_agent() or f"{self.provider_name}:{self.species}"
+        contents, limit = get_token_budget().plan(self.provider_name, self.species, key, system_instruction, contents)
+        return key, contents, limit
+
+    def _record(self, key: str, output: str, limit: int) -> None:
+        record = current_call.get()
+        tokens = record.output_tokens if record is not None and record.tokens_reported else count_tokens(output, self.provider_name)
+        get_token_budget().record_output(key, tokens, limit)
+
+    async def generate_content(self, model_name: str, contents: str, system_instruction: str = '',
+                               temperature: float = 0.7, response_mime_type: str = 'text/plain',
+                               response_schema: Any = None, **options: Any) -> Optional[Any]:
+        key, contents, limit = self._plan(system_instruction, contents)
+        token = output_token_limit.set(limit)
+        try:
+            response = await self.inner.generate_content(model_name, contents, system_instruction, temperature,
+                                                         response_mime_type, response_schema, **options)
+        finally:
+            output_token_limit.reset(token)
+        if response is not None:
+            self._record(key, response_text(response), limit)
+        return response
+
+    async def generate_stream(self, model_name: str, contents: str, system_instruction: str = '',
+                              temperature: float = 0.7, response_mime_type: str = 'text/plain',
+                              response_schema: Any = None, **options: Any) -> AsyncIterator[str]:
+        key, contents, limit = self._plan(system_instruction, contents)
+        chunks = []
+        stream = self.inner.generate_stream(model_name, contents, system_instruction, temperature,
+                                            response_mime_type, response_schema, **options)
+        try:
+            while True:
+                # The cap is set only while the inner stream runs, never across a yield.
+                token = output_token_limit.set(limit)
+                try:
+                    chunk = await stream.__anext__()
+                except StopAsyncIteration:
+                    break
+                finally:
+                    output_token_limit.reset(token)
+                chunks.append(chunk)
+                yield chunk
+        finally:
+            await stream.aclose()
+        if chunks:
+            self._record(key, "".join(chunks), limit)
@@ -15,6 +15,8 @@ class Task(BaseModel):
     agent: str = Field(..., description="The agent assigned to this task.")
     deps: List[str] = Field(..., description="List of requirements (task IDs, e.g. ['T-00.4', 'P-B01']).")
     subtasks: Optional[List['Task']] = Field(default=None, description="Sub-tasks breaking down this task further.")
+    priority: Optional[int] = Field(default=None, description="Optional dispatch priority; among ready tasks, higher priorities start first.")
+    optional: bool = Field(default=False, description="If true, the parent task can complete even if this task fails.")
 
 class TaskAction(BaseModel):
     """Action-Verb concept of a task."""
@@ -64,7 +66,7 @@ class Team(BaseModel):
 class Plan(BaseModel):
     """Overall strategy with reasoning, roles, and tasks."""
     high_level_goal: str = Field(..., description="The main goal this plan is designed to achieve.")
-    reasoning: str = Field(..., description="A brief explanation of the plan's structure and strategy.")
+    reasoning: str = Field(..., description="The reasoning behind the plan: how the goal is broken down, the structure and the strategy.")
     roles: List[Role] = Field(..., description="List of all roles required to execute the plan.")
     tasks: List[Task] = Field(..., description="A step-by-step sequence of tasks to be executed in order.")
     team: Optional[Team] = Field(default=None, description="Updates to team configuration or system prompts.")
@@ -82,6 +84,23 @@ class AgentOutput(BaseModel):
     reasoning: Optional[str] = Field(default=None, description="Explanation of how the agent arrived at this output.")
 
 
+class TokenDelta(BaseModel):
+    """A chunk of an agent's output, emitted while the model is still generating."""
+    task_id: str = Field(..., description="The ID of the task being executed.")
+    agent: str = Field(..., description="The name of the agent executing the task.")
+    index: int = Field(..., description="Position of this chunk in the task's output stream.")
+    text: str = Field(..., description="The generated text of this chunk.")
+    tier: int = Field(default=0, description="The model cascade tier that generated this chunk. An escalation restarts the output at index 0.")
+
+
+class OutputField(BaseModel):
+    """A complete field of an agent's structured output, emitted while the model is still generating the rest."""
+    task_id: str = Field(..., description="The ID of the task being executed.")
+    agent: str = Field(..., description="The name of the agent executing the task.")
+    path: str = Field(..., description="Path of the field in the AgentOutput (e.g. 'output', 'artifact.files[0]', 'team.prompts[1]').")
+    value: Any = Field(..., description="The parsed value of the field.")
+
+
 class Feedback(BaseModel):
     """Represents feedback on an agent's performance for a given task."""
     task_id: str = Field(..., description="The ID of the task for which feedback is provided.")
@@ -6,7 +6,7 @@ import sqlite3
 import logging
 import json
 import os
-from typing import Any, Optional, Dict, List
+from typing import Any, Optional, Dict, List, Tuple
 from threading import Lock
 
 logger = logging.getLogger(__name__)
@@ -71,6 +71,43 @@ class SessionDB:
                     FOREIGN KEY(session_id) REFERENCES sessions(id)
                 )
             ''')
+            # Recorded LLM responses (see t20.core.agents.replay).
+            # `seq` orders repeated identical requests within a session.
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS llm_recordings (
+                    session_id TEXT,
+                    request_hash TEXT,
+                    seq INTEGER,
+                    response TEXT,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (session_id, request_hash, seq),
+                    FOREIGN KEY(session_id) REFERENCES sessions(id)
+                )
+            ''')
+            # Workflow checkpoints (see System.resume): the latest state and result of each task,
+            # and the items of the ExecutionContext. `step` is the JSON of the task that produced an item.
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS task_states (
+                    session_id TEXT,
+                    task_id TEXT,
+                    state TEXT,
+                    result TEXT,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (session_id, task_id),
+                    FOREIGN KEY(session_id) REFERENCES sessions(id)
+                )
+            ''')
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS context_items (
+                    session_id TEXT,
+                    name TEXT,
+                    content TEXT,
+                    step TEXT,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (session_id, name),
+                    FOREIGN KEY(session_id) REFERENCES sessions(id)
+                )
+            ''')
             conn.commit()
         except sqlite3.Error as e:
             logger.error(f"Database initialization error: {e}")
@@ -165,3 +202,94 @@ class SessionDB:
             return []
         finally:
             conn.close()
+
+    def save_recording(self, session_id: str, request_hash: str, seq: int, response: str) -> None:
+        """Saves the `seq`-th recorded response to a request."""
+        conn = self._get_conn()
+        try:
+            cursor = conn.cursor()
+            cursor.execute('''
+                INSERT OR REPLACE INTO llm_recordings (session_id, request_hash, seq, response)
+                VALUES (?, ?, ?, ?)
+            ''', (session_id, request_hash, seq, response))
+            conn.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Error saving LLM recording {request_hash[:12]} in session {session_id}: {e}")
+        finally:
+            conn.close()
+
+    def get_recordings(self, session_id: str) -> Dict[str, List[str]]:
+        """Returns the recorded responses of a session by request hash, in recording order."""
+        conn = self._get_conn()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT request_hash, response FROM llm_recordings WHERE session_id = ? ORDER BY request_hash, seq",
+                (session_id,)
+            )
+            recordings: Dict[str, List[str]] = {}
+            for request_hash, response in cursor.fetchall():
+                recordings.setdefault(request_hash, []).append(response)
+            return recordings
+        except sqlite3.Error as e:
+            logger.error(f"Error retrieving LLM recordings for session {session_id}: {e}")
+            return {}
+        finally:
+            conn.close()
+
+    def save_checkpoint(self, session_id: str, tasks: Dict[str, Tuple[str, Optional[str]]],
+                        items: List[Tuple[str, Any, str]]) -> None:
+        """
+        Saves task states and context items in one transaction.
+
+        Args:
+            tasks: (state, result) by task ID.
+            items: (name, content, step JSON) of new context items; the content is stored as JSON.
+        """
+        conn = self._get_conn()
+        try:
+            with conn:
+                conn.executemany('''
+                    INSERT OR REPLACE INTO task_states (session_id, task_id, state, result)
+                    VALUES (?, ?, ?, ?)
+                ''', [(session_id, task_id, state, result) for task_id, (state, result) in tasks.items()])
+                conn.executemany('''
+                    INSERT OR REPLACE INTO context_items (session_id, name, content, step)
+                    VALUES (?, ?, ?, ?)
+                ''', [(session_id, name, json.dumps(content, default=str), step) for name, content, step in items])
+        except sqlite3.Error as e:
+            logger.error(f"Error saving checkpoint of session {session_id}: {e}")
+        finally:
+            conn.close()
+
+    def get_task_states(self, session_id: str) -> Dict[str, Tuple[str, Optional[str]]]:
+        """Returns the checkpointed (state, result) of each task of a session."""
+        conn = self._get_conn()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT task_id, state, result FROM task_states WHERE session_id = ?",
+                (session_id,)
+            )
+            return {task_id: (state, result) for task_id, state, result in cursor.fetchall()}
+        except sqlite3.Error as e:
+            logger.error(f"Error retrieving task states for session {session_id}: {e}")
+            return {}
+        finally:
+            conn.close()
+
+    def get_context_items(self, session_id: str) -> List[Tuple[str, Any, str]]:
+        """Returns the checkpointed (name, content, step JSON) context items of a session, oldest first."""
+        conn = self._get_conn()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT name, content, step FROM context_items WHERE session_id = ? ORDER BY rowid",
+                (session_id,)
+            )
+            return [(name, json.loads(content), step) for name, content, step in cursor.fetchall()]
+        except sqlite3.Error as e:
+            logger.error(f"Error retrieving context items for session {session_id}: {e}")
+            return []
+        finally:
+            conn.close()
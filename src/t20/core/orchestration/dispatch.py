@@ -0,0 +1,286 @@
+"""This module decides in which order READY tasks are started.
+
+When fewer tasks can run than are ready (rate limits, concurrency caps), the
+start order decides the makespan of the workflow. A DispatchPolicy sorts the
+ready tasks of each scheduler tick:
+
+- `fifo`: plan order.
+- `critical_path`: the task with the longest remaining path to the end of the
+  plan first, with task durations estimated from each agent's history.
+- `sjf`: shortest estimated job first.
+
+An explicit `Task.priority` comes before the policy: tasks with a higher
+priority start first, and the policy orders tasks of equal priority.
+
+ConcurrencyLimits caps the running tasks overall, per agent and per model; the
+DispatchQueue holds the tasks that wait for a slot (QUEUED) in policy order.
+"""
+
+import heapq
+import itertools
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
+
+from t20.core.common.types import Task
+from t20.core.orchestration.task_manager import TaskManager
+
+
+class TaskLatencies:
+    """
+    Exponentially weighted durations of the tasks of each agent, used to estimate the next ones.
+    """
+
+    def __init__(self, default: float = 30.0, alpha: float = 0.3) -> None:
+        """
+        Args:
+            default (float): The estimate in seconds before any task has finished.
+            alpha (float): The weight of the latest duration.
+        """
+        self.default = default
+        self.alpha = alpha
+        self._seconds: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, agent: str, seconds: float) -> None:
+        """Adds the duration of a finished task of `agent`."""
+        key = agent.lower()
+        with self._lock:
+            previous = self._seconds.get(key)
+            self._seconds[key] = seconds if previous is None else previous + self.alpha * (seconds - previous)
+
+    def estimate(self, agent: str) -> float:
+        """Returns the expected duration of a task of `agent`; agents without history get the average of all agents."""
+        with self._lock:
+            seconds = self._seconds.get(agent.lower())
+            if seconds is None:
+                return sum(self._seconds.values()) / len(self._seconds) if self._seconds else self.default
+        return seconds
+
+
+class DispatchPolicy:
+    """
+    Orders READY tasks by explicit priority, then by `key`. The base policy keeps plan order.
+    """
+    name = "fifo"
+
+    def __init__(self, latencies: Optional[TaskLatencies] = None) -> None:
+        self.latencies = latencies or TaskLatencies()
+        self._position: Dict[str, int] = {}
+
+    def prepare(self, manager: TaskManager) -> None:
+        """Computes what the policy needs about the plan; called once before the workflow starts."""
+        self._position = {task_id: i for i, task_id in enumerate(manager.tasks)}
+
+    def key(self, task: Task) -> Tuple:
+        return (self._position.get(task.id, 0),)
+
+    def sort_key(self, task: Task) -> Tuple:
+        """The key tasks start by, lowest first."""
+        return (-(task.priority or 0),) + self.key(task)
+
+    def order(self, tasks: List[Task]) -> List[Task]:
+        """Returns `tasks` in the order in which they should start."""
+        return sorted(tasks, key=self.sort_key)
+
+
+class ShortestJobFirstPolicy(DispatchPolicy):
+    """Starts the tasks of the fastest agents first, maximizing the number of finished tasks early on."""
+    name = "sjf"
+
+    def key(self, task: Task) -> Tuple:
+        return (self.latencies.estimate(task.agent), self._position.get(task.id, 0))
+
+
+class CriticalPathPolicy(DispatchPolicy):
+    """
+    Starts the task with the longest remaining path to the end of the plan first.
+
+    The rank of a task is its estimated duration plus the largest rank among the tasks
+    that wait for it: its dependents, and for a subtask whatever waits for its parent.
+    """
+    name = "critical_path"
+
+    def __init__(self, latencies: Optional[TaskLatencies] = None) -> None:
+        super().__init__(latencies)
+        self.ranks: Dict[str, float] = {}
+
+    def prepare(self, manager: TaskManager) -> None:
+        super().prepare(manager)
+
+        # Containers are split into a start node (before their children) and an end node (after them).
+        def entry(task_id: str) -> Tuple[str, str]:
+            return ("start", task_id) if task_id in manager.children_map else ("task", task_id)
+
+        def successors(node: Tuple[str, str]) -> List[Tuple[str, str]]:
+            kind, task_id = node
+            if kind == "start":
+                return [entry(child) for child in manager.children_map[task_id]]
+            nodes = [entry(dependent) for dependent in manager.dependents.get(task_id, []) if dependent in manager.tasks]
+            parent_id = manager.parent_map.get(task_id)
+            if parent_id:
+                nodes.append(("end", parent_id))
+            return nodes
+
+        ranks: Dict[Tuple[str, str], float] = {}
+        visiting = set()
+        for root in [entry(task_id) for task_id in manager.tasks]:
+            # Iterative post-order, so long chains do not hit the recursion limit.
+            stack = [(root, False)]
+            while stack:
+                node, expanded = stack.pop()
+                if node in ranks:
+                    continue
+                if expanded:
+                    visiting.discard(node)
+                    weight = self.latencies.estimate(manager.tasks[node[1]].agent) if node[0] == "task" else 0.0
+                    # Successors still being visited close a dependency cycle; those tasks never start anyway.
+                    ranks[node] = weight + max((ranks.get(s, 0.0) for s in successors(node)), default=0.0)
+                    continue
+                visiting.add(node)
+                stack.append((node, True))
+                stack.extend((s, False) for s in successors(node) if s not in ranks and s not in visiting)
+        self.ranks = {task_id: rank for (kind, task_id), rank in ranks.items() if kind == "task"}
+
+    def key(self, task: Task) -> Tuple:
+        return (-self.ranks.get(task.id, 0.0), self._position.get(task.id, 0))
+
+
+DISPATCH_POLICIES: Dict[str, Type[DispatchPolicy]] = {
+    policy.name: policy for policy in (DispatchPolicy, CriticalPathPolicy, ShortestJobFirstPolicy)}
+
+
+def make_dispatch_policy(name: str, latencies: Optional[TaskLatencies] = None) -> DispatchPolicy:
+    """
+    Creates the dispatch policy registered under `name`.
+
+    Raises:
+        ValueError: If no policy has that name.
+    """
+    policy = DISPATCH_POLICIES.get(name)
+    if policy is None:
+        raise ValueError(f"Unknown dispatch policy '{name}'; expected one of {sorted(DISPATCH_POLICIES)}.")
+    return policy(latencies)
+
+
+class ConcurrencyLimits:
+    """
+    Caps on the number of running tasks: overall, per agent and per model (None means no cap).
+    They can be changed while a workflow runs; the dispatch loops are notified.
+    """
+
+    def __init__(self, max_parallel_tasks: Optional[int] = None, agents: Optional[Dict[str, int]] = None,
+                 models: Optional[Dict[str, int]] = None) -> None:
+        self.max_parallel_tasks: Optional[int] = None
+        self.agents: Dict[str, int] = {}
+        self.models: Dict[str, int] = {}
+        self._listeners: List[Callable[[], None]] = []
+        self.update(max_parallel_tasks, agents, models)
+
+    @staticmethod
+    def _check(name: str, cap: Any) -> None:
+        if cap is not None and (not isinstance(cap, int) or isinstance(cap, bool) or cap < 1):
+            raise ValueError(f"The cap of {name} must be a positive integer or null, got {cap!r}.")
+
+    def update(self, max_parallel_tasks: Any = ..., agents: Optional[Dict[str, Optional[int]]] = None,
+               models: Optional[Dict[str, Optional[int]]] = None) -> None:
+        """
+        Changes the caps. Arguments that are not given keep their caps; agent and model caps are
+        merged into the current ones, and a null cap removes one.
+
+        Raises:
+            ValueError: If a cap is not a positive integer or null.
+        """
+        for name, cap in [("max_parallel_tasks", None if max_parallel_tasks is ... else max_parallel_tasks),
+                          *(agents or {}).items(), *(models or {}).items()]:
+            self._check(name, cap)
+        if max_parallel_tasks is not ...:
+            self.max_parallel_tasks = max_parallel_tasks
+        for caps, changes in ((self.agents, agents), (self.models, models)):
+            for name, cap in (changes or {}).items():
+                key = name.lower() if caps is self.agents else name
+                if cap is None:
+                    caps.pop(key, None)
+                else:
+                    caps[key] = cap
+        for listener in list(self._listeners):
+            listener()
+
+    def agent_cap(self, agent: str) -> Optional[int]:
+        return self.agents.get(agent.lower())
+
+    def model_cap(self, model: Optional[str]) -> Optional[int]:
+        return self.models.get(model) if model else None
+
+    def subscribe(self, listener: Callable[[], None]) -> None:
+        """Calls `listener` after every change."""
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener: Callable[[], None]) -> None:
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"max_parallel_tasks": self.max_parallel_tasks, "agents": dict(self.agents), "models": dict(self.models)}
+
+
+class DispatchQueue:
+    """
+    The tasks that wait for a slot under ConcurrencyLimits, in policy order.
+
+    Tasks are kept in one heap per (agent, model), so a task whose agent or model is at
+    its cap does not hold back the tasks behind it, and picking the next task only
+    compares the heads of the groups.
+    """
+
+    def __init__(self, policy: DispatchPolicy, limits: ConcurrencyLimits) -> None:
+        self.policy = policy
+        self.limits = limits
+        self._groups: Dict[Tuple[str, Optional[str]], List[Tuple[Tuple, int, Task]]] = {}
+        self._sequence = itertools.count()
+        self._size = 0
+        self.running = 0
+        self.running_by_agent: Dict[str, int] = {}
+        self.running_by_model: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return self._size
+
+    def push(self, task: Task, agent: str, model: Optional[str]) -> None:
+        """Adds a task whose dependencies are met; `agent` and `model` are the agent that will execute it."""
+        group = self._groups.setdefault((agent, model), [])
+        heapq.heappush(group, (self.policy.sort_key(task), next(self._sequence), task))
+        self._size += 1
+
+    def _allows(self, agent: str, model: Optional[str]) -> bool:
+        agent_cap, model_cap = self.limits.agent_cap(agent), self.limits.model_cap(model)
+        return ((agent_cap is None or self.running_by_agent.get(agent, 0) < agent_cap)
+                and (model_cap is None or self.running_by_model.get(model or "", 0) < model_cap))
+
+    def pop(self) -> Optional[Tuple[Task, str, Optional[str]]]:
+        """
+        Removes the first task in policy order that fits under the caps and counts it as running.
+
+        Returns:
+            The task with its agent and model, or None if no waiting task may start now.
+        """
+        if self.limits.max_parallel_tasks is not None and self.running >= self.limits.max_parallel_tasks:
+            return None
+        best = None
+        for (agent, model), group in self._groups.items():
+            if group and (best is None or group[0] < best[1][0]) and self._allows(agent, model):
+                best = ((agent, model), group)
+        if best is None:
+            return None
+        (agent, model), group = best
+        task = heapq.heappop(group)[2]
+        self._size -= 1
+        self.running += 1
+        self.running_by_agent[agent] = self.running_by_agent.get(agent, 0) + 1
+        self.running_by_model[model or ""] = self.running_by_model.get(model or "", 0) + 1
+        return task, agent, model
+
+    def release(self, agent: str, model: Optional[str]) -> None:
+        """Frees the slot of a task returned by `pop` once it has finished (or did not start)."""
+        self.running -= 1
+        self.running_by_agent[agent] -= 1
+        self.running_by_model[model or ""] -= 1
@@ -57,9 +57,15 @@ class PlanningPrompt(BaseModel):
         return "\n\n\n".join(planning_prompt_parts)
 
 
+PLANNING_MODES = ("single", "verbose")
+
+
 class Orchestrator(Agent):
     """An agent responsible for creating and managing a plan for multi-agent workflows."""
     team: Dict[str,Agent] = {}
+    # "single": one structured call, the model's reasoning is kept in Plan.reasoning.
+    # "verbose": an additional free-text call first, stored as planning_response.txt.
+    planning_mode: str = "single"
 
     async def generate_plan(self, session: Session, high_level_goal: str, files: List[File] = []) -> Optional[Plan]:
         """
@@ -92,16 +98,17 @@ class Orchestrator(Agent):
         session.add_artifact("planning_prompt.txt", planning_prompt)
 
         try:
-            response = await self.llm.generate_content(
-                model_name=self.model,
-                contents=planning_prompt,
-                system_instruction=self.system_instructions,
-                temperature=0.0
-            )
+            if self.planning_mode == "verbose":
+                response = await self.llm.generate_content(
+                    model_name=self.model,
+                    contents=planning_prompt,
+                    system_instruction=self.system_instructions,
+                    temperature=0.0
+                )
 
-            print(f"\n{Fore.CYAN}Orchestrator '{self.profile.name}' Planning Response:{Style.RESET_ALL}\n{response}")
+                print(f"\n{Fore.CYAN}Orchestrator '{self.profile.name}' Planning Response:{Style.RESET_ALL}\n{response}")
 
-            session.add_artifact("planning_response.txt", response)
+                session.add_artifact("planning_response.txt", response)
 
             response = await self.llm.generate_content(
                 model_name=self.model,
@@ -117,6 +124,9 @@ class Orchestrator(Agent):
 
             if isinstance(result, str):
                 result = Plan.model_validate_json(result)
+
+            if self.planning_mode != "verbose":
+                session.add_artifact("planning_response.txt", result.reasoning)
         except (ValidationError, json.JSONDecodeError) as e:
             logger.exception(f"Error generating or validating plan for {self.profile.name}: {e}")
             return None
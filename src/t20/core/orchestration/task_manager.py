@@ -1,7 +1,7 @@
 import logging
-from typing import List, Dict, Set, Optional
+from collections import Counter, deque
+from typing import Deque, List, Dict, Optional, Set
 from enum import Enum
-import asyncio
 
 from t20.core.common.types import Task, Plan
 
@@ -10,37 +10,80 @@ logger = logging.getLogger(__name__)
 class TaskStatus(str, Enum):
     PENDING = "PENDING"
     READY = "READY"
+    QUEUED = "QUEUED" # ready, waiting for a concurrency slot
     RUNNING = "RUNNING"
     COMPLETED = "COMPLETED"
     FAILED = "FAILED"
-    BLOCKED = "BLOCKED"
+    BLOCKED = "BLOCKED" # cannot run because a task it waits for failed
+
+# States of tasks that may still run or finish.
+ACTIVE_STATES = (TaskStatus.PENDING, TaskStatus.READY, TaskStatus.QUEUED, TaskStatus.RUNNING)
+
+# What a task failure does to the rest of the plan (see TaskManager.mark_failed).
+FAILURE_POLICIES = ("continue", "skip_subtree", "fail_fast")
 
 class TaskManager:
     """
     Manages the lifecycle of tasks, including state transitions and dependency resolution.
     Supports Hierarchical Task Networks (HTN) by flattening subtasks and managing parent states.
+
+    Dependency resolution is event-driven: each task keeps a counter of unmet dependencies
+    and each parent a counter of unfinished children, so a transition only touches the tasks
+    that depend on it, and tasks that become READY are queued for `get_ready_tasks`.
+
+    When a task fails, every task that waits for it, directly or transitively, is marked
+    BLOCKED at once. A container fails when a required (non-`optional`) subtask fails or
+    is blocked. The failure policy decides what else stops:
+
+    - "continue": only the tasks that wait for the failed task. Its container lets the
+      other subtasks finish, then fails; the container's dependents are blocked at once.
+    - "skip_subtree": the container of the failed task fails at once, and its unfinished
+      subtasks (running ones included) are blocked.
+    - "fail_fast": every unfinished task is blocked, running ones included.
+
+    Args:
+        plan (Plan): The plan to execute.
+        failure_policy (str): One of FAILURE_POLICIES.
+        completed (Dict[str, Optional[str]], optional): Results of tasks that already completed,
+            e.g. in the checkpoint of an interrupted run; they are not executed again.
     """
-    def __init__(self, plan: Plan):
+    def __init__(self, plan: Plan, failure_policy: str = "continue", completed: Optional[Dict[str, Optional[str]]] = None):
+        if failure_policy not in FAILURE_POLICIES:
+            raise ValueError(f"Unknown failure policy '{failure_policy}'; expected one of {FAILURE_POLICIES}.")
         self.plan = plan
+        self.failure_policy = failure_policy
         self.tasks: Dict[str, Task] = {}
         self.task_states: Dict[str, TaskStatus] = {}
         self.dependencies: Dict[str, List[str]] = {}
+        self.dependents: Dict[str, List[str]] = {} # dep_id -> [task_ids that depend on it]
         self.parent_map: Dict[str, str] = {} # child_id -> parent_id
         self.children_map: Dict[str, List[str]] = {} # parent_id -> [child_ids]
         self.results: Dict[str, str] = {}
 
+        self._unmet_deps: Dict[str, int] = {}
+        self._open_children: Dict[str, int] = {}
+        self._doomed: Set[str] = set() # containers that will fail once their running subtasks finish
+        self._ready: Deque[str] = deque()
+        self._state_counts: Counter = Counter()
+        self.changed: Set[str] = set() # tasks whose state changed since the owner last cleared it
+
         self._flatten_tasks(plan.tasks)
+        for task_id, result in (completed or {}).items():
+            if task_id in self.tasks:
+                self.task_states[task_id] = TaskStatus.COMPLETED
+                self.results[task_id] = result
+        self._index()
 
     def _flatten_tasks(self, tasks: List[Task], parent_id: Optional[str] = None):
         """Recursively registers tasks and their relationships."""
         for task in tasks:
             if task.id in self.tasks:
                 logger.warning(f"Duplicate task ID detected: {task.id}. This may cause issues.")
-            
+
             self.tasks[task.id] = task
             self.task_states[task.id] = TaskStatus.PENDING
             self.dependencies[task.id] = task.deps
-            
+
             if parent_id:
                 self.parent_map[task.id] = parent_id
                 if parent_id not in self.children_map:
@@ -50,36 +93,30 @@ class TaskManager:
             if task.subtasks:
                 self._flatten_tasks(task.subtasks, task.id)
 
+    def _index(self):
+        """Builds the reverse dependencies and counters, and queues the tasks that can start right away."""
+        for task_id, deps in self.dependencies.items():
+            for dep in deps:
+                if dep not in self.tasks:
+                    logger.warning(f"Task {task_id} depends on unknown task {dep}; it will never start.")
+                self.dependents.setdefault(dep, []).append(task_id)
+        self._state_counts = Counter(self.task_states.values())
+        self._unmet_deps = {task_id: sum(1 for dep in deps if self.task_states.get(dep) != TaskStatus.COMPLETED)
+                            for task_id, deps in self.dependencies.items()}
+        self._open_children = {parent_id: sum(1 for child in set(children)
+                                              if self.task_states[child] != TaskStatus.COMPLETED)
+                               for parent_id, children in self.children_map.items()}
+        self._ready = deque(task_id for task_id, state in self.task_states.items() if state == TaskStatus.READY)
+        for task_id in list(self.tasks):
+            if task_id not in self.parent_map:
+                self._try_start(task_id)
+
     def get_ready_tasks(self) -> List[Task]:
         """Returns a list of tasks that are READY to be executed."""
-        ready_tasks = []
-        
-        # Check PENDING tasks to see if they can transition
-        # We copy items to avoid issues if we modify states inside the loop (though we try not to modify iterables being looped)
-        pending_ids = [tid for tid, state in self.task_states.items() if state == TaskStatus.PENDING]
-        
-        for task_id in pending_ids:
-            if self._can_start(task_id):
-                task = self.tasks[task_id]
-                if task.subtasks:
-                    # Parent tasks with subtasks are "containers". 
-                    # If they are ready, we auto-start them to unlock their children.
-                    logger.info(f"Auto-expanding parent task {task_id} to RUNNING.")
-                    self.mark_running(task_id)
-                    # We do NOT return parent tasks for execution by agents.
-                else:
-                    self.transition_state(task_id, TaskStatus.READY)
-                    ready_tasks.append(task)
-        
-        # Also gather tasks that are already in READY state (from previous ticks)
-        for task_id, state in self.task_states.items():
-            if state == TaskStatus.READY:
-                task = self.tasks[task_id]
-                # Avoid duplicates if it was just added effectively
-                if task not in ready_tasks:
-                    ready_tasks.append(task)
-                    
-        return ready_tasks
+        # Tasks leave READY without being dequeued (mark_running, mark_failed), so entries are checked here.
+        ready_ids = [task_id for task_id in dict.fromkeys(self._ready) if self.task_states[task_id] == TaskStatus.READY]
+        self._ready = deque(ready_ids)
+        return [self.tasks[task_id] for task_id in ready_ids]
 
     def _can_start(self, task_id: str) -> bool:
         """
@@ -91,46 +128,154 @@ class TaskManager:
         # 1. Check dependencies
         if not self._are_dependencies_met(task_id):
             return False
-            
+
         # 2. Check parent state
         parent_id = self.parent_map.get(task_id)
         if parent_id:
             if self.task_states[parent_id] != TaskStatus.RUNNING:
                 return False
-                
+
         return True
 
     def _are_dependencies_met(self, task_id: str) -> bool:
         """Checks if all dependencies for a task are COMPLETED."""
-        deps = self.dependencies.get(task_id, [])
-        return all(self.task_states.get(dep) == TaskStatus.COMPLETED for dep in deps)
+        return self._unmet_deps.get(task_id, 0) == 0
+
+    def _try_start(self, task_id: str):
+        """Moves a PENDING task that can start to READY, or to RUNNING if it is a container."""
+        if self.task_states[task_id] != TaskStatus.PENDING or not self._can_start(task_id):
+            return
+        if self.tasks[task_id].subtasks:
+            # Parent tasks with subtasks are "containers".
+            # If they are ready, we auto-start them to unlock their children.
+            logger.info(f"Auto-expanding parent task {task_id} to RUNNING.")
+            self.mark_running(task_id)
+            # We do NOT return parent tasks for execution by agents.
+        else:
+            self.transition_state(task_id, TaskStatus.READY)
+            self._ready.append(task_id)
 
     def transition_state(self, task_id: str, new_state: TaskStatus):
         """Transitions a task to a new state."""
         old_state = self.task_states.get(task_id)
         if old_state != new_state:
-            logger.info(f"Task {task_id} transition: {old_state} -> {new_state}")
+            if logger.isEnabledFor(logging.INFO):  # on the hot path of large plans
+                logger.info(f"Task {task_id} transition: {old_state} -> {new_state}")
             self.task_states[task_id] = new_state
+            self.changed.add(task_id)
+            self._state_counts[old_state] -= 1
+            self._state_counts[new_state] += 1
+
+    def mark_pending(self, task_id: str):
+        """Moves a task back to PENDING, e.g. while it waits for a retry."""
+        self.transition_state(task_id, TaskStatus.PENDING)
+
+    def retry(self, task_id: str):
+        """Makes a PENDING task READY again if it can still start."""
+        self._try_start(task_id)
+
+    def mark_queued(self, task_id: str):
+        self.transition_state(task_id, TaskStatus.QUEUED)
 
     def mark_running(self, task_id: str):
         self.transition_state(task_id, TaskStatus.RUNNING)
+        for child_id in self.children_map.get(task_id, []):
+            self._try_start(child_id)
 
     def mark_completed(self, task_id: str, result: str):
         self.results[task_id] = result
+        if self.task_states.get(task_id) == TaskStatus.COMPLETED:
+            return
         self.transition_state(task_id, TaskStatus.COMPLETED)
-        
+
+        for dependent_id in self.dependents.get(task_id, []):
+            self._unmet_deps[dependent_id] -= 1
+            if self._unmet_deps[dependent_id] == 0:
+                self._try_start(dependent_id)
+
         # Check if this completion finishes a parent task
         parent_id = self.parent_map.get(task_id)
-        if parent_id:
-            siblings = self.children_map.get(parent_id, [])
-            if all(self.task_states.get(sib) == TaskStatus.COMPLETED for sib in siblings):
-                logger.info(f"All subtasks of {parent_id} completed. Completing parent.")
-                self.mark_completed(parent_id, "All subtasks completed.")
+        if parent_id and self.task_states[parent_id] == TaskStatus.RUNNING:
+            self._open_children[parent_id] -= 1
+            if self._open_children[parent_id] == 0:
+                if parent_id in self._doomed:
+                    self._fail(parent_id, "Required subtasks failed.")
+                else:
+                    logger.info(f"All subtasks of {parent_id} completed. Completing parent.")
+                    self.mark_completed(parent_id, "All subtasks completed.")
 
     def mark_failed(self, task_id: str, error: str):
+        """Marks a task as FAILED and blocks what can no longer run, according to the failure policy."""
+        if self.task_states.get(task_id) not in ACTIVE_STATES:
+            return
+        if self.failure_policy == "fail_fast" and not self.tasks[task_id].optional:
+            self.results[task_id] = error
+            self.transition_state(task_id, TaskStatus.FAILED)
+            logger.warning(f"Task {task_id} failed; blocking all unfinished tasks (fail_fast).")
+            for other_id, state in list(self.task_states.items()):
+                if state in ACTIVE_STATES:
+                    self.results[other_id] = f"Blocked: task {task_id} failed."
+                    self.transition_state(other_id, TaskStatus.BLOCKED)
+            return
+        self._fail(task_id, error)
+
+    def _fail(self, task_id: str, error: str):
         self.results[task_id] = error
         self.transition_state(task_id, TaskStatus.FAILED)
-        # Failure propagation could be complex (fail parent?), but for now we leave it local.
+        self._propagate_failure(task_id)
+
+    def _block(self, task_id: str, cause: str):
+        self.results[task_id] = f"Blocked: task {cause} did not complete."
+        self.transition_state(task_id, TaskStatus.BLOCKED)
+
+    def _propagate_failure(self, task_id: str):
+        """Blocks the tasks that wait for a failed or blocked task, transitively, and settles their containers."""
+        stack = [task_id]
+        while stack:
+            current = stack.pop()
+            # Its dependents, and the unfinished subtasks of a failed container, can no longer complete.
+            for other_id in self.dependents.get(current, []) + self.children_map.get(current, []):
+                if self.task_states.get(other_id) in ACTIVE_STATES:
+                    self._block(other_id, current)
+                    stack.append(other_id)
+
+            parent_id = self.parent_map.get(current)
+            if not parent_id or self.task_states[parent_id] != TaskStatus.RUNNING:
+                continue
+            self._open_children[parent_id] -= 1
+            if not self.tasks[current].optional:
+                if self.failure_policy == "skip_subtree":
+                    self.results[parent_id] = f"Required subtask {current} did not complete."
+                    self.transition_state(parent_id, TaskStatus.FAILED)
+                    stack.append(parent_id)
+                    continue
+                self._doom(parent_id)
+            if self._open_children[parent_id] == 0:
+                if parent_id in self._doomed:
+                    self.results[parent_id] = "Required subtasks failed."
+                    self.transition_state(parent_id, TaskStatus.FAILED)
+                    stack.append(parent_id)
+                else:
+                    self.mark_completed(parent_id, "All required subtasks completed.")
+
+    def _doom(self, parent_id: str):
+        """
+        Records that a container will fail, and blocks the tasks that wait for it (and for the
+        containers it is a required part of) right away instead of when its last subtask finishes.
+        """
+        while parent_id and parent_id not in self._doomed:
+            self._doomed.add(parent_id)
+            for dependent_id in self.dependents.get(parent_id, []):
+                if self.task_states.get(dependent_id) in ACTIVE_STATES:
+                    self._block(dependent_id, parent_id)
+                    self._propagate_failure(dependent_id)
+            if self.tasks[parent_id].optional:
+                break
+            parent_id = self.parent_map.get(parent_id)
 
     def is_all_completed(self) -> bool:
-        return all(state == TaskStatus.COMPLETED for state in self.task_states.values())
+        return self._state_counts[TaskStatus.COMPLETED] == len(self.task_states)
+
+    def is_finished(self) -> bool:
+        """True when no task can run anymore: every task is COMPLETED, FAILED or BLOCKED."""
+        return not any(self._state_counts[state] for state in ACTIVE_STATES)
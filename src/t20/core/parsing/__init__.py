@@ -1,3 +1,5 @@
+from .json_repair import JSONRepairError, RepairResult, repair_json
+from .json_stream import JSONStreamError, StreamingJSONParser
 from .kicklang import KickLangParser
 
-__all__ = ["KickLangParser"]
+__all__ = ["JSONRepairError", "JSONStreamError", "KickLangParser", "RepairResult", "StreamingJSONParser", "repair_json"]
@@ -0,0 +1,317 @@
+"""This module repairs malformed JSON produced by LLMs.
+
+Structured output that fails to parse or validate is usually only slightly
+off: wrapped in a code fence or prose, a trailing comma, Python-style quotes
+and literals, or cut off at the output token limit. `repair_json` fixes these
+locally, and coerces the result towards a pydantic schema, so that the model
+does not have to be called again. Every fix is reported by kind.
+"""
+
+import json
+import re
+import types
+import typing
+from dataclasses import dataclass, field
+from typing import Any, List, Optional, Tuple, Type
+
+from pydantic import BaseModel, ValidationError
+
+# Repair kinds, as reported in RepairResult.repairs.
+FENCE = "fence"
+PROSE = "prose"
+TRAILING_COMMA = "trailing_comma"
+MISSING_COMMA = "missing_comma"
+QUOTES = "quotes"
+UNQUOTED = "unquoted"
+LITERAL = "literal"
+TRUNCATED = "truncated"
+SCHEMA = "schema"
+
+_PYTHON_LITERALS = {"True": "true", "False": "false", "None": "null", "NaN": "null", "Infinity": "null"}
+_TERMINATED = {'"': re.compile(r'"(?:[^"\\]|\\.)*"', re.DOTALL), "'": re.compile(r"'(?:[^'\\]|\\.)*'", re.DOTALL)}
+# An escape sequence; group 1 is empty for invalid ones (e.g. Windows paths such as C:\users).
+_ESCAPE = re.compile(r'\\(["\\/bfnrt]|u[0-9a-fA-F]{4})?')
+_UNESCAPED_QUOTE = re.compile(r'(?<!\\)"')
+_TOKEN = re.compile(r'''
+    (?P<space>\s+)
+  | (?P<comment>//[^\n]*|/\*.*?(?:\*/|\Z))
+  | (?P<string>"(?:[^"\\]|\\.)*(?:"|\\?\Z)|'(?:[^'\\]|\\.)*(?:'|\\?\Z))
+  | (?P<number>-?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)
+  | (?P<word>[A-Za-z_$][\w$-]*)
+  | (?P<punct>[{}\[\]:,])
+  | (?P<other>.)
+''', re.VERBOSE | re.DOTALL)
+
+
+class JSONRepairError(ValueError):
+    """Raised when a response cannot be repaired into (schema-valid) JSON."""
+
+
+@dataclass
+class RepairResult:
+    """The repaired value (a model instance if a schema was given) and the kinds of fixes applied."""
+    value: Any
+    repairs: List[str] = field(default_factory=list)
+
+
+def _decode_string(raw: str) -> Tuple[str, bool]:
+    """Decodes a (possibly single-quoted or unterminated) string token. Returns the text and whether it was terminated."""
+    quote = raw[0]
+    terminated = _TERMINATED[quote].fullmatch(raw) is not None
+    inner = raw[1:-1] if terminated else raw[1:].rstrip("\\")
+    if quote == "'":
+        inner = _UNESCAPED_QUOTE.sub(r'\\"', inner.replace("\\'", "'"))
+    try:
+        return json.loads('"' + inner + '"', strict=False), terminated
+    except json.JSONDecodeError:
+        pass
+    escaped = _ESCAPE.sub(lambda m: m.group(0) if m.group(1) else "\\\\", inner)
+    try:
+        return json.loads('"' + escaped + '"', strict=False), terminated
+    except json.JSONDecodeError as e:
+        raise JSONRepairError(f"Cannot decode string {raw[:40]!r}: {e}") from e
+
+
+def _number(token: str) -> str:
+    try:
+        return json.dumps(json.loads(token))
+    except json.JSONDecodeError:
+        return json.dumps(float(token))  # e.g. "1." or ".5"
+
+
+class _Builder:
+    """Rebuilds a token stream as valid JSON, recording the fixes it needed."""
+
+    def __init__(self) -> None:
+        self.out: List[str] = []
+        self.stack: List[List[Any]] = []  # [kind, element count, pending key]
+        self.repairs: List[str] = []
+        self.done = False
+        self.comma_seen = False
+
+    def fix(self, kind: str) -> None:
+        if kind not in self.repairs:
+            self.repairs.append(kind)
+
+    def _begin_element(self) -> bool:
+        """Emits the separator and pending key before a value. Returns False if the value must be dropped."""
+        if not self.stack:
+            return not self.done
+        frame = self.stack[-1]
+        if frame[0] == "object":
+            if frame[2] is None:
+                return False
+            key, frame[2] = frame[2], None
+            self.out.append(("," if frame[1] else "") + json.dumps(key) + ":")
+        elif frame[1]:
+            self.out.append(",")
+        if frame[1] and not self.comma_seen:
+            self.fix(MISSING_COMMA)
+        frame[1] += 1
+        self.comma_seen = False
+        return True
+
+    def _end_value(self) -> None:
+        if not self.stack:
+            self.done = True
+
+    def value(self, text: str) -> None:
+        if self._begin_element():
+            self.out.append(text)
+            self._end_value()
+
+    def key_or_value(self, text: str) -> None:
+        """A string or bare word: the key of an object member, or a value."""
+        frame = self.stack[-1] if self.stack else None
+        if frame and frame[0] == "object" and frame[2] is None:
+            frame[2] = text
+        else:
+            self.value(json.dumps(text))
+
+    def open(self, kind: str, bracket: str) -> None:
+        if self._begin_element():
+            self.out.append(bracket)
+            self.stack.append([kind, 0, None])
+            self.comma_seen = False
+
+    def close(self) -> None:
+        kind, count, pending = self.stack.pop()
+        if pending is not None:
+            self.fix(TRUNCATED)
+        elif self.comma_seen:
+            self.fix(TRAILING_COMMA)
+            self.comma_seen = False
+        self.out.append("}" if kind == "object" else "]")
+        self._end_value()
+
+
+def _rebuild(text: str) -> Tuple[str, List[str]]:
+    """Tokenizes lenient, possibly truncated JSON and rebuilds it as strict JSON."""
+    builder = _Builder()
+    started = False
+    for match in _TOKEN.finditer(text):
+        kind, token = match.lastgroup, match.group()
+        if kind in ("space", "comment"):
+            continue
+        if builder.done:
+            break
+        if not started and token not in "{[":
+            continue  # prose before the document
+        started = True
+        if kind == "punct":
+            if token in "{[":
+                builder.open("object" if token == "{" else "array", token)
+            elif token in "}]":
+                if builder.stack:
+                    builder.close()
+            elif token == ",":
+                builder.comma_seen = True
+            # ':' is implied by the key
+        elif kind == "string":
+            value, terminated = _decode_string(token)
+            if token[0] == "'":
+                builder.fix(QUOTES)
+            if not terminated:
+                builder.fix(TRUNCATED)
+            builder.key_or_value(value)
+        elif kind == "number":
+            builder.value(_number(token))
+        elif kind == "word":
+            frame = builder.stack[-1] if builder.stack else None
+            if frame and frame[0] == "object" and frame[2] is None:
+                builder.fix(UNQUOTED)
+                builder.key_or_value(token)
+            elif token in ("true", "false", "null"):
+                builder.value(token)
+            elif token in _PYTHON_LITERALS:
+                builder.fix(LITERAL)
+                builder.value(_PYTHON_LITERALS[token])
+            else:
+                builder.fix(UNQUOTED)
+                builder.value(json.dumps(token))
+    if not started:
+        raise JSONRepairError("The response contains no JSON object or array.")
+    if builder.stack:
+        builder.fix(TRUNCATED)
+        while builder.stack:
+            builder.close()
+    return "".join(builder.out), builder.repairs
+
+
+def _strip_wrapping(text: str) -> Tuple[str, List[str]]:
+    """Removes a Markdown code fence or surrounding prose from a JSON document."""
+    stripped = text.strip()
+    fence = re.search(r"```[\w-]*[ \t]*\n(.*?)(?:\n\s*```|\Z)", stripped, re.DOTALL)
+    if fence:
+        return fence.group(1).strip(), [FENCE]
+    return stripped, []
+
+
+def _unwrap_optional(annotation: Any) -> Any:
+    args = [a for a in typing.get_args(annotation) if a is not type(None)]
+    if typing.get_origin(annotation) in (typing.Union, types.UnionType) and len(args) == 1:
+        return args[0]
+    return annotation
+
+
+def _coerce(value: Any, annotation: Any) -> Any:
+    """Coerces a JSON value towards a field annotation (str, numbers, lists and nested models)."""
+    annotation = _unwrap_optional(annotation)
+    origin, args = typing.get_origin(annotation), typing.get_args(annotation)
+    if value is None:
+        return [] if origin is list else None
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        if isinstance(value, str):
+            try:
+                value = json.loads(value)
+            except json.JSONDecodeError:
+                return value
+        if isinstance(value, list) and len(value) == 1 and isinstance(value[0], dict):
+            value = value[0]
+        return coerce_to_schema(value, annotation) if isinstance(value, dict) else value
+    if origin is list:
+        items = value if isinstance(value, list) else [value]
+        return [_coerce(item, args[0]) for item in items] if args else items
+    if annotation is str and not isinstance(value, str):
+        return json.dumps(value) if isinstance(value, (dict, list, bool)) else str(value)
+    if annotation in (int, float) and isinstance(value, str):
+        try:
+            return annotation(float(value)) if annotation is int else float(value)
+        except ValueError:
+            return value
+    if annotation is bool and isinstance(value, str) and value.lower() in ("true", "false"):
+        return value.lower() == "true"
+    return value
+
+
+def coerce_to_schema(value: Any, schema: Type[BaseModel]) -> Any:
+    """
+    Coerces a parsed document towards `schema`: matches keys case-insensitively,
+    converts scalars, wraps single items in lists and unwraps one-element lists.
+    """
+    if isinstance(value, list) and len(value) == 1 and isinstance(value[0], dict):
+        value = value[0]
+    if not isinstance(value, dict):
+        return value
+    by_name = {name.lower(): name for name in schema.model_fields}
+    coerced = {}
+    for key, item in value.items():
+        name = key if key in schema.model_fields else by_name.get(str(key).lower(), key)
+        field_info = schema.model_fields.get(name)
+        coerced[name] = _coerce(item, field_info.annotation) if field_info else item
+    return coerced
+
+
+def _drop_tail(value: Any) -> bool:
+    """Removes the innermost last member of a truncated document. Returns False if there is none."""
+    parent, key = None, None
+    while isinstance(value, (dict, list)) and value:
+        parent, key = value, (next(reversed(value)) if isinstance(value, dict) else len(value) - 1)
+        value = value[key]
+    if parent is None:
+        return False
+    del parent[key]
+    return True
+
+
+def repair_json(text: str, schema: Optional[Type[BaseModel]] = None) -> RepairResult:
+    """
+    Parses `text` as JSON, repairing it if needed, and validates it against `schema`.
+
+    Args:
+        text (str): The model's response.
+        schema (Type[BaseModel], optional): The expected response model.
+
+    Returns:
+        RepairResult: The value (a `schema` instance if given) and the repairs applied (empty if none were needed).
+
+    Raises:
+        JSONRepairError: If the text cannot be repaired into a (schema-valid) document.
+    """
+    repairs: List[str] = []
+    try:
+        value = json.loads(text)
+    except json.JSONDecodeError:
+        body, repairs = _strip_wrapping(text)
+        try:
+            value = json.loads(body)
+        except json.JSONDecodeError:
+            rebuilt, fixes = _rebuild(body)
+            if body.lstrip()[:1] not in ("{", "["):
+                fixes.insert(0, PROSE)
+            repairs.extend(fixes)
+            value = json.loads(rebuilt)
+
+    if schema is None:
+        return RepairResult(value, repairs)
+    try:
+        return RepairResult(schema.model_validate(value), repairs)
+    except ValidationError:
+        pass
+    while True:
+        try:
+            return RepairResult(schema.model_validate(coerce_to_schema(value, schema)), repairs + [SCHEMA])
+        except ValidationError as e:
+            # The last member of a truncated document may be incomplete; drop it and try again.
+            if TRUNCATED not in repairs or not _drop_tail(value):
+                raise JSONRepairError(f"The response does not match {schema.__name__}: {e}") from e
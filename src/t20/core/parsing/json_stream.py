@@ -0,0 +1,271 @@
+"""This module provides an incremental parser for JSON documents streamed by LLMs.
+
+The parser consumes the text of a stream chunk by chunk and reports values at
+watched paths (e.g. `("artifact", "files", "*")`) as soon as they are complete,
+so consumers can act on them while the model is still generating the rest of
+the document. Syntax errors are raised at the first offending character rather
+than after the stream has ended.
+"""
+
+import json
+import re
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Any, Iterable, List, Optional, Tuple
+
+Path = Tuple[Any, ...]
+
+_STRING_SPECIAL = re.compile(r'["\\]')
+_SCALAR_START = frozenset("-0123456789tfn")
+_SCALAR_CHARS = frozenset("+-.0123456789eEtrufalsn")
+_WHITESPACE = frozenset(" \t\r\n")
+_FENCE = "```"
+
+
+class JSONStreamError(ValueError):
+    """Raised as soon as a streamed document can no longer become valid JSON."""
+
+
+def format_path(path: Path) -> str:
+    """Formats a path like `("artifact", "files", 0)` as `artifact.files[0]`."""
+    text = ""
+    for part in path:
+        text += f"[{part}]" if isinstance(part, int) else (f".{part}" if text else str(part))
+    return text
+
+
+@dataclass
+class _Frame:
+    """An open object or array."""
+    kind: str
+    path: Path
+    start: int
+    expect: str
+    key: Optional[str] = None
+    index: int = -1
+
+
+class StreamingJSONParser:
+    """
+    Push parser for a single JSON document, optionally wrapped in a Markdown code fence.
+    """
+
+    def __init__(self, watch: Iterable[Path] = ()) -> None:
+        """
+        Args:
+            watch (Iterable[Path]): Paths whose values are reported by `feed`. A `"*"`
+                element matches any array index.
+        """
+        self.watch = [tuple(path) for path in watch]
+        # The document is kept as its chunks (joined only to decode a finished value),
+        # so that buffering a long stream stays linear in its length.
+        self._chunks: List[str] = []
+        self._starts: List[int] = []
+        self._length = 0
+        self._window = ""  # the text `feed` scans, starting at offset `_base`
+        self._base = 0
+        self._pos = 0
+        self._stack: List[_Frame] = []
+        self._root: Optional[Tuple[int, int]] = None
+        self._string: Optional[Tuple[int, Path, bool]] = None  # start, path, is_key
+        self._scalar: Optional[Tuple[int, Path]] = None
+
+    @property
+    def text(self) -> str:
+        """The text consumed so far."""
+        if len(self._chunks) > 1:
+            self._chunks, self._starts = ["".join(self._chunks)], [0]
+        return self._chunks[0] if self._chunks else ""
+
+    def _slice(self, start: int, end: int) -> str:
+        """Returns `text[start:end]`, joining only the chunks it spans."""
+        start, end = max(0, start), min(end, self._length)
+        if start >= end:
+            return ""
+        first = bisect_right(self._starts, start) - 1
+        last = bisect_right(self._starts, end - 1)
+        offset = self._starts[first]
+        return "".join(self._chunks[first:last])[start - offset:end - offset]
+
+    def feed(self, chunk: str) -> List[Tuple[Path, Any]]:
+        """
+        Consumes the next chunk of the document.
+
+        Returns:
+            List[Tuple[Path, Any]]: The watched values completed by this chunk, in document order.
+
+        Raises:
+            JSONStreamError: If the document is malformed.
+        """
+        if chunk:
+            self._chunks.append(chunk)
+            self._starts.append(self._length)
+            self._length += len(chunk)
+        # Offsets are absolute; only the text after the last consumed character is scanned.
+        base = self._pos
+        self._window, self._base = self._slice(base, self._length), base
+        text, i, n = self._window, 0, self._length - base
+        events: List[Tuple[Path, Any]] = []
+        while i < n:
+            if self._string is not None:
+                match = _STRING_SPECIAL.search(text, i)
+                if match is None:
+                    i = n
+                elif text[match.start()] == "\\":
+                    if match.start() + 1 >= n:
+                        i = match.start()  # wait for the escaped character
+                        break
+                    i = match.start() + 2
+                else:
+                    i = match.start() + 1
+                    self._end_string(base + i, events)
+                continue
+            if self._scalar is not None:
+                if text[i] in _SCALAR_CHARS:
+                    i += 1
+                    continue
+                self._end_scalar(base + i, events)
+            c = text[i]
+            if c in _WHITESPACE:
+                i += 1
+            elif not self._stack:
+                following = self._outside(c, base + i)
+                if following < 0:
+                    break
+                i = following - base
+            else:
+                i = self._token(c, base + i, events) - base
+        self._pos = base + i
+        self._window = ""
+        return events
+
+    def close(self) -> Any:
+        """
+        Ends the document.
+
+        Returns:
+            Any: The complete document.
+
+        Raises:
+            JSONStreamError: If the document is missing, truncated or cannot be decoded.
+        """
+        events: List[Tuple[Path, Any]] = []
+        if self._scalar is not None:
+            self._end_scalar(self._length, events)
+        if self._root is None:
+            if self._string is None and not self._stack:
+                raise JSONStreamError("The stream contained no JSON document.")
+            path = self._string[1] if self._string is not None else self._stack[-1].path
+            raise JSONStreamError(f"Truncated JSON: the stream ended inside '{format_path(path) or 'document'}'.")
+        start, end = self._root
+        try:
+            # Control characters in strings are accepted, as for the watched values.
+            return json.loads(self._slice(start, end), strict=False)
+        except json.JSONDecodeError as e:
+            raise self._error(start, f"Invalid JSON document: {e}") from None
+
+    def _error(self, i: int, message: str) -> JSONStreamError:
+        snippet = self._slice(i - 20, i + 20).replace("\n", "\\n")
+        return JSONStreamError(f"{message} at offset {i}: ...{snippet}...")
+
+    def _outside(self, c: str, i: int) -> int:
+        """Handles text before and after the root value. Returns -1 to wait for more text."""
+        if c == "`":
+            if self._root is not None:
+                return i + 1  # closing fence
+            # Skip an opening fence with its language tag, e.g. "```json".
+            newline = self._window.find("\n", i - self._base)
+            if newline < 0:
+                return -1
+            if not self._window.startswith(_FENCE, i - self._base):
+                raise self._error(i, "Unexpected '`' before the JSON document")
+            return self._base + newline + 1
+        if self._root is not None:
+            raise self._error(i, "Unexpected data after the JSON document")
+        return self._begin_value(c, i, ())
+
+    def _token(self, c: str, i: int, events: List[Tuple[Path, Any]]) -> int:
+        frame = self._stack[-1]
+        expect = frame.expect
+        if frame.kind == "object":
+            if c == '"' and expect in ("key_or_close", "key"):
+                self._string = (i, frame.path, True)
+                return i + 1
+            if c == "}" and expect in ("key_or_close", "comma_or_close"):
+                return self._close(i, events)
+            if c == ":" and expect == "colon":
+                frame.expect = "value"
+                return i + 1
+            if c == "," and expect == "comma_or_close":
+                frame.expect = "key"
+                return i + 1
+            if expect == "value":
+                return self._begin_value(c, i, frame.path + (frame.key,))
+            raise self._error(i, f"Unexpected {c!r} in object '{format_path(frame.path)}' (expected {expect})")
+
+        if c == "]" and expect in ("value_or_close", "comma_or_close"):
+            return self._close(i, events)
+        if c == "," and expect == "comma_or_close":
+            frame.expect = "value"
+            return i + 1
+        if expect in ("value_or_close", "value"):
+            frame.index += 1
+            return self._begin_value(c, i, frame.path + (frame.index,))
+        raise self._error(i, f"Unexpected {c!r} in array '{format_path(frame.path)}' (expected {expect})")
+
+    def _begin_value(self, c: str, i: int, path: Path) -> int:
+        if c == "{":
+            self._stack.append(_Frame("object", path, i, "key_or_close"))
+        elif c == "[":
+            self._stack.append(_Frame("array", path, i, "value_or_close"))
+        elif c == '"':
+            self._string = (i, path, False)
+        elif c in _SCALAR_START:
+            self._scalar = (i, path)
+        else:
+            raise self._error(i, f"Unexpected {c!r} where a value was expected")
+        return i + 1
+
+    def _end_string(self, end: int, events: List[Tuple[Path, Any]]) -> None:
+        start, path, is_key = self._string
+        self._string = None
+        if is_key:
+            frame = self._stack[-1]
+            try:
+                frame.key = json.loads(self._slice(start, end), strict=False)
+            except json.JSONDecodeError as e:
+                raise self._error(start, f"Invalid key in object '{format_path(frame.path)}': {e}") from None
+            frame.expect = "colon"
+        else:
+            self._value_done(path, start, end, events)
+
+    def _end_scalar(self, end: int, events: List[Tuple[Path, Any]]) -> None:
+        start, path = self._scalar
+        self._scalar = None
+        literal = self._slice(start, end)
+        try:
+            json.loads(literal)
+        except json.JSONDecodeError:
+            raise self._error(start, f"Invalid literal {literal!r}") from None
+        self._value_done(path, start, end, events)
+
+    def _close(self, i: int, events: List[Tuple[Path, Any]]) -> int:
+        frame = self._stack.pop()
+        self._value_done(frame.path, frame.start, i + 1, events)
+        return i + 1
+
+    def _value_done(self, path: Path, start: int, end: int, events: List[Tuple[Path, Any]]) -> None:
+        if self._stack:
+            self._stack[-1].expect = "comma_or_close"
+        else:
+            self._root = (start, end)
+        if any(self._matches(pattern, path) for pattern in self.watch):
+            try:
+                events.append((path, json.loads(self._slice(start, end), strict=False)))
+            except json.JSONDecodeError as e:
+                raise self._error(start, f"Invalid value at '{format_path(path)}': {e}") from None
+
+    @staticmethod
+    def _matches(pattern: Path, path: Path) -> bool:
+        return len(pattern) == len(path) and all(
+            p == q or (p == "*" and isinstance(q, int)) for p, q in zip(pattern, path))
@@ -31,10 +31,27 @@ class ExecutionContext:
     plan: Plan
     items: Dict[str, ContextItem] = field(default_factory=dict)
     lock: Lock = field(default_factory=Lock)
+    # Keys of the items added since the last checkpoint (see take_unsaved).
+    unsaved: List[str] = field(default_factory=list)
 
     def _remember_artifact(self, key: str, value: Any, step: Task) -> None:
         """Remembers an artifact from a step's execution for future tasks."""
         self.items[key] = ContextItem(name=key, content=value, step=step)
+        self.unsaved.append(key)
+
+    def take_unsaved(self) -> List[ContextItem]:
+        """Returns the items added since the previous call, to be checkpointed."""
+        with self.lock:
+            keys, self.unsaved = self.unsaved, []
+            return [self.items[key] for key in dict.fromkeys(keys)]
+
+    @classmethod
+    def restore(cls, session: 'Session', plan: Plan) -> 'ExecutionContext':
+        """Rebuilds the context of a workflow from the items checkpointed in its session."""
+        context = cls(session=session, plan=plan)
+        for name, content, step in session._db.get_context_items(session.session_id):
+            context.items[name] = ContextItem(name=name, content=content, step=Task.model_validate_json(step))
+        return context
 
     def record_artifact(self, key: str, value: Any, step: Task, mem: bool = False) -> None:
         """
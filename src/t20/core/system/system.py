@@ -13,10 +13,28 @@ import logging
 from typing import Any, AsyncGenerator, List, Optional, Dict, Tuple
 from pydantic import BaseModel
 import asyncio
+import time
+from collections import Counter
 
 from .session import Session, ExecutionContext
 from t20.core.agents.agent import Agent, find_agent_by_role
-from t20.core.orchestration.orchestrator import Orchestrator
+from t20.core.agents.cascade import configure_cascade, parse_cascade
+from t20.core.agents.circuit_breaker import get_breaker_registry
+from t20.core.agents.clients import get_client_registry
+from t20.core.agents.context_cache import configure_context_cache
+from t20.core.agents.llm import LLM
+from t20.core.agents.llm_cache import configure_response_cache
+from t20.core.agents.metrics import MetricsLedger, call_scope, configure_pricing
+from t20.core.agents.model_routing import configure_model_routing
+from t20.core.agents.providers.ollama_config import configure_ollama
+from t20.core.agents.rate_limit import get_limiter_registry
+from t20.core.agents.replay import ReplayStore, get_recorder, start_recording, start_replay, stop_recording
+from t20.core.agents.retry import RetryPolicy, configure_retry_policy
+from t20.core.agents.router import configure_router
+from t20.core.agents.token_budget import configure_token_budget
+from t20.core.orchestration.dispatch import (DISPATCH_POLICIES, ConcurrencyLimits, DispatchQueue, TaskLatencies,
+                                             make_dispatch_policy)
+from t20.core.orchestration.orchestrator import Orchestrator, PLANNING_MODES
 from .log import setup_logging
 from t20.core.common.loader import load_agent_classes
 from .paths import AGENTS_DIR_NAME, CONFIG_DIR_NAME, PROMPTS_DIR_NAME, RUNTIME_CONFIG_FILENAME
@@ -25,7 +43,7 @@ from t20.core.common.types import AgentOutput, Artifact, Plan, File, Task
 logger = logging.getLogger(__name__)
 
 from .message_bus import MessageBus
-from t20.core.orchestration.task_manager import TaskManager, TaskStatus
+from t20.core.orchestration.task_manager import FAILURE_POLICIES, TaskManager, TaskStatus
 from .system_interface import SystemInterfaceLayer
 
 class SystemConfig(BaseModel):
@@ -34,6 +52,13 @@ class SystemConfig(BaseModel):
     """
     logging_level: str = "INFO"
     default_model: str = "gemini-2.5-flash-lite"
+    # Caps on running tasks: overall, per agent name and per model (see ConcurrencyLimits).
+    max_parallel_tasks: Optional[int] = None
+    max_concurrent_agents: Optional[int] = None  # deprecated alias of max_parallel_tasks
+    agent_limits: Dict[str, int] = {}
+    model_limits: Dict[str, int] = {}
+    # Attempts of a failing task, with the backoff between them in seconds.
+    task_retry: Dict[str, Any] = {}
     # Add other system-wide configuration parameters here as needed
 
 
@@ -58,6 +83,18 @@ class System:
         self.session: Optional[Session] = None
         self.orchestrator: Optional[Orchestrator] = None
         self.completed_tasks: set = set()
+        self.metrics = MetricsLedger()
+        self._warm_task: Optional[asyncio.Task] = None
+        # Order of READY tasks (see t20.core.orchestration.dispatch), and task durations per agent it learns from.
+        self.dispatch_policy = "critical_path"
+        self.task_latencies = TaskLatencies()
+        # Caps on running tasks; tasks beyond them wait as QUEUED. Adjustable while a workflow runs.
+        self.concurrency = ConcurrencyLimits()
+        # What a failed task stops (see TaskManager), and how often a failing task is attempted.
+        self.failure_policy = "continue"
+        self.task_retry = RetryPolicy(max_attempts=1, deadline=None)
+        # Save task states and context items in the session DB as the workflow runs, for `resume`.
+        self.task_checkpoints = True
 
     def e(self, taskType: str, instruction: str, context: Optional[str] = None) -> Any:
         """
@@ -65,12 +102,14 @@ class System:
         """
         return self.interface.e(taskType, instruction, context)
 
-    def setup(self, orchestrator_name: Optional[str] = None) -> None:
+    def setup(self, orchestrator_name: Optional[str] = None, warm: bool = False) -> None:
         """
         Sets up the system by loading configurations and instantiating agents.
 
         Args:
             orchestrator_name (str, optional): The name of the orchestrator to use.
+            warm (bool): Open connections to every model used by the agents in the background,
+                so the first tasks do not pay for TCP/TLS setup. Requires a running event loop.
 
         Raises:
             RuntimeError: If no agents or orchestrator can be set up.
@@ -79,6 +118,18 @@ class System:
         print(f"Using default model: {self.default_model}")
 
         self.config = self._load_config(os.path.join(self.root_dir, CONFIG_DIR_NAME, RUNTIME_CONFIG_FILENAME))
+        configure_response_cache(self.config.get("llm_cache"))
+        get_limiter_registry().configure(self.config.get("llm_limits"))
+        configure_ollama(self.config.get("ollama"))
+        configure_retry_policy(self.config.get("llm_retry"))
+        configure_router(self.config.get("llm_router"))
+        configure_cascade(self.config.get("llm_cascade"))
+        configure_model_routing(self.config.get("model_routing"))
+        configure_token_budget(self.config.get("llm_budget"))
+        configure_pricing(self.config.get("llm_pricing"))
+        configure_context_cache(self.config.get("llm_context_cache"))
+        get_breaker_registry().configure(self.config.get("llm_breakers"))
+        get_client_registry().configure(self.config.get("http_pool"))
         agent_specs = self._load_agent_templates(os.path.join(self.root_dir, AGENTS_DIR_NAME), self.config, self.default_model)
         prompts = self._load_prompts(os.path.join(self.root_dir, PROMPTS_DIR_NAME))
         agent_classes = load_agent_classes(os.path.join(self.root_dir, AGENTS_DIR_NAME))
@@ -123,10 +174,50 @@ class System:
         if not isinstance(orchestrator, Orchestrator):
             raise RuntimeError(f"Agent '{orchestrator.profile.name}' is not a valid Orchestrator instance. System setup failed.")
 
+        orchestrator.planning_mode = self.config.get("planning_mode", orchestrator.planning_mode)
+        if orchestrator.planning_mode not in PLANNING_MODES:
+            raise RuntimeError(f"Unknown planning_mode '{orchestrator.planning_mode}'; expected one of {PLANNING_MODES}.")
         self.orchestrator = orchestrator
+        self.dispatch_policy = self.config.get("dispatch_policy", self.dispatch_policy)
+        if self.dispatch_policy not in DISPATCH_POLICIES:
+            raise RuntimeError(f"Unknown dispatch_policy '{self.dispatch_policy}'; expected one of {sorted(DISPATCH_POLICIES)}.")
+        try:
+            settings = SystemConfig.model_validate(self.config)
+            if settings.max_concurrent_agents is not None:
+                logger.warning("max_concurrent_agents is deprecated; use max_parallel_tasks instead.")
+                if settings.max_parallel_tasks is None:
+                    settings.max_parallel_tasks = settings.max_concurrent_agents
+            self.concurrency = ConcurrencyLimits(settings.max_parallel_tasks, settings.agent_limits, settings.model_limits)
+        except ValueError as e:
+            raise RuntimeError(f"Invalid task concurrency limits: {e}") from e
+        self.failure_policy = self.config.get("failure_policy", self.failure_policy)
+        if self.failure_policy not in FAILURE_POLICIES:
+            raise RuntimeError(f"Unknown failure_policy '{self.failure_policy}'; expected one of {FAILURE_POLICIES}.")
+        self.task_retry = RetryPolicy(deadline=None, **{k: v for k, v in settings.task_retry.items()
+                                                        if k in ("max_attempts", "base_delay", "max_delay")})
+        if self.task_retry.max_attempts < 1:
+            raise RuntimeError("task_retry.max_attempts must be at least 1.")
+        self.task_checkpoints = self.config.get("task_checkpoints", self.task_checkpoints)
         self.session = Session(agents=self.agents, project_root="./")
+        if self.config.get("llm_recording", False):
+            start_recording(self.session)
+        else:
+            stop_recording()
+        if warm:
+            self._start_warm_up()
         logger.info("--- System Setup Complete ---")
 
+    def _start_warm_up(self) -> None:
+        """Warms the connections of all distinct agent models in a background task."""
+        llms = {f"{agent.llm.provider_name}:{agent.llm.species}": agent.llm for agent in self.agents if agent.llm}
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            logger.warning("System.setup(warm=True) needs a running event loop; skipping connection warm-up.")
+            return
+        logger.info(f"Warming up connections for: {', '.join(sorted(llms))}")
+        self._warm_task = loop.create_task(get_client_registry().warm(llms.values()))
+
     async def start(self, high_level_goal: str, files: List[File] = [], plan: Plan = None) -> Plan:
         """
         Starts the system's main workflow, generating a plan if one is not provided.
@@ -146,8 +237,15 @@ class System:
         if not self.orchestrator or not self.session:
             raise RuntimeError("System is not set up. Please call setup() before start().")
 
+        self.metrics = MetricsLedger()
+        self.session.add_artifact("run_inputs.json", {
+            "high_level_goal": high_level_goal,
+            "files": [f.model_dump() for f in files],
+        })
         if not plan:
-            plan = await self.orchestrator.generate_plan(self.session, high_level_goal, files)
+            with call_scope(self.metrics, agent=self.orchestrator.profile.name, task_id="plan"):
+                plan = await self.orchestrator.generate_plan(self.session, high_level_goal, files)
+            self.session.add_artifact("metrics.json", self.metrics.summary())
             if not plan:
                 raise RuntimeError("Orchestration failed: Could not generate plan.")
 
@@ -165,9 +263,44 @@ class System:
 
         return plan
 
-    async def run(self, plan: Plan, rounds: int = 1, files: List[File] = [], confirmation_callback=None) -> AsyncGenerator[Tuple[Task, Optional[str]], None]:
+    def load_replay(self, session_id: str) -> Tuple[Plan, str, List[File]]:
+        """
+        Switches every agent to the `replay:` provider, answering from the LLM calls recorded in a previous session.
+
+        Args:
+            session_id (str): The recorded session.
+
+        Returns:
+            Tuple[Plan, str, List[File]]: The recorded plan, goal and input files, to pass to `start` and `run`.
+
+        Raises:
+            RuntimeError: If the system is not set up or the session has no recorded plan or responses.
+        """
+        if not self.session:
+            raise RuntimeError("System is not set up. Please call setup() before load_replay().")
+
+        db = self.session._db
+        plan = db.get_artifact(session_id, "initial_plan.json")
+        if not plan:
+            raise RuntimeError(f"Session '{session_id}' has no recorded plan.")
+        inputs = db.get_artifact(session_id, "run_inputs.json") or {}
+        try:
+            start_replay(ReplayStore.from_session(db, session_id))
+        except ValueError as e:
+            raise RuntimeError(str(e)) from e
+
+        for agent in self.agents:
+            agent.llm = LLM.factory(f"replay:{agent.model}", message_bus=self.message_bus)
+            agent.llm_prefix = "replay:"
+            agent._tier_llms.clear()
+        logger.info(f"Replaying session '{session_id}' with {len(self.agents)} agents.")
+        return (Plan.model_validate(plan), inputs.get("high_level_goal") or "",
+                [File.model_validate(f) for f in inputs.get("files", [])])
+
+    async def run(self, plan: Plan, rounds: int = 1, files: List[File] = [], confirmation_callback=None, stream: bool = False) -> AsyncGenerator[Tuple[Task, Optional[str]], None]:
         """
-        Runs the multi-agent workflow based on the provided plan.
+        Runs the multi-agent workflow based on the provided plan. Task states and context items
+        are checkpointed in the session DB as they change, so an interrupted run can be resumed.
 
         Args:
             plan (Plan): The execution plan generated by the orchestrator.
@@ -175,6 +308,8 @@ class System:
             files (List[File]): Initial files provided to the system.
             confirmation_callback (Callable[[Task], Awaitable[bool]], optional): A callback to confirm task execution.
                                                                                  Returns True to proceed, False to skip/abort.
+            stream (bool): Stream agent output; each chunk is published as a TokenDelta on the
+                           "token_delta" topic of the message bus.
 
         Yields:
             Tuple[Task, Optional[str]]: A tuple containing the executed task and its result.
@@ -185,73 +320,208 @@ class System:
         if not self.orchestrator or not self.session:
             raise RuntimeError("System is not set up. Please call start() before run().")
 
-        logger.info("--- Starting Workflow ---")
-
         context = ExecutionContext(session=self.session, plan=plan)
         context.record_initial("files", Artifact(task='initial',files=files).model_dump_json())
+        async for step in self._run_tasks(context, TaskManager(plan, self.failure_policy), confirmation_callback, stream):
+            yield step
+
+    async def resume(self, session_id: str, confirmation_callback=None, stream: bool = False) -> AsyncGenerator[Tuple[Task, Optional[str]], None]:
+        """
+        Continues the workflow of an interrupted session from its checkpoint: the context is rebuilt
+        and only the tasks that did not complete are executed (failed and blocked ones included).
+
+        Args:
+            session_id (str): The session to continue; it becomes the current session.
+            confirmation_callback (Callable[[Task], Awaitable[bool]], optional): As for `run`.
+            stream (bool): As for `run`.
+
+        Yields:
+            Tuple[Task, Optional[str]]: Each task executed now and its result.
+
+        Raises:
+            RuntimeError: If the system is not set up or the session has no plan.
+        """
+        if not self.orchestrator or not self.session:
+            raise RuntimeError("System is not set up. Please call setup() before resume().")
+
+        db = self.session._db
+        plan = db.get_artifact(session_id, "initial_plan.json")
+        if not plan:
+            raise RuntimeError(f"Session '{session_id}' has no plan to resume.")
+        plan = Plan.model_validate(plan)
+        self.session = Session(session_id=session_id, agents=self.agents, project_root=self.session.project_root)
+        if get_recorder():
+            start_recording(self.session)
+
+        completed = {task_id: result for task_id, (state, result) in db.get_task_states(session_id).items()
+                     if state == TaskStatus.COMPLETED.value}
+        task_manager = TaskManager(plan, self.failure_policy, completed=completed)
+        logger.info(f"Resuming session '{session_id}': {len(task_manager.results)} of {len(task_manager.tasks)} tasks completed.")
+        context = ExecutionContext.restore(self.session, plan)
+        async for step in self._run_tasks(context, task_manager, confirmation_callback, stream):
+            yield step
+
+    def _save_checkpoint(self, context: ExecutionContext, task_manager: TaskManager) -> None:
+        """Saves the task transitions and context items since the previous checkpoint in one transaction."""
+        if not self.task_checkpoints or not (task_manager.changed or context.unsaved):
+            return
+        tasks = {task_id: (task_manager.task_states[task_id].value, task_manager.results.get(task_id))
+                 for task_id in task_manager.changed}
+        task_manager.changed.clear()
+        items = [(item.name, item.content, item.step.model_dump_json()) for item in context.take_unsaved()]
+        self.session._db.save_checkpoint(self.session.session_id, tasks, items)
+
+    async def _run_tasks(self, context: ExecutionContext, task_manager: TaskManager, confirmation_callback=None,
+                         stream: bool = False) -> AsyncGenerator[Tuple[Task, Optional[str]], None]:
+        """Executes the tasks of `task_manager` that are not finished yet; see `run`."""
+        logger.info("--- Starting Workflow ---")
+        plan = context.plan
 
         if plan.team and plan.team.prompts:
             logger.info(f"Plan provided new prompts.")
             for prompt_data in plan.team.prompts:
                 self._update_agent_prompt(self.session, prompt_data.agent, prompt_data.system_prompt)
+        # A resumed workflow restores the prompts set by its completed tasks, in plan order.
+        for task_id in task_manager.tasks:
+            result = task_manager.results.get(task_id)
+            if not result:
+                continue
+            try:
+                agent_output = AgentOutput.model_validate_json(result)
+            except ValueError:
+                continue  # a plain-text result
+            if agent_output.team:
+                for prompt_data in agent_output.team.prompts:
+                    self._update_agent_prompt(self.session, prompt_data.agent, prompt_data.system_prompt)
 
-        task_manager = TaskManager(plan)
-        
-        running_tasks = {}
+        dispatch = make_dispatch_policy(self.dispatch_policy, self.task_latencies)
+        dispatch.prepare(task_manager)
 
-        while not task_manager.is_all_completed():
-            ready_tasks = task_manager.get_ready_tasks()
-            
-            # Filter out tasks that are already running
-            running_task_ids = {t.id for t in running_tasks.values()}
-            ready_tasks = [t for t in ready_tasks if t.id not in running_task_ids]
-
-            for task in ready_tasks:
-                task_manager.mark_running(task.id)
-                
-                # HITL Check
-                if confirmation_callback:
-                    logger.info(f"Requesting confirmation for task {task.id}: {task.description}")
-                    approved = await confirmation_callback(task)
-                    if not approved:
-                        logger.warning(f"Task {task.id} was rejected by user. Skipping.")
-                        task_manager.mark_failed(task.id, "Rejected by user")
+        # Tasks whose dependencies are met wait here (QUEUED) for a slot under the concurrency caps.
+        queue = DispatchQueue(dispatch, self.concurrency)
+        running_tasks = {}
+        started_at = {}
+        # Finished futures are queued with their finish time by their done callback,
+        # so each tick only handles what finished. None wakes the loop up when the caps change.
+        finished: asyncio.Queue = asyncio.Queue()
+        wake_up = lambda: finished.put_nowait(None)
+        self.concurrency.subscribe(wake_up)
+        loop = asyncio.get_running_loop()
+        # Failed tasks with attempts left wait PENDING for their retry timer.
+        attempts: Dict[str, int] = {}
+        retry_delays: Dict[str, float] = {}
+        retry_timers: Dict[str, asyncio.TimerHandle] = {}
+
+        def retry(task_id: str) -> None:
+            del retry_timers[task_id]
+            task_manager.retry(task_id)
+            wake_up()
+
+        try:
+            while not task_manager.is_finished():
+                # READY tasks are new: the ones that do not start now are marked QUEUED below.
+                ready_tasks = task_manager.get_ready_tasks()
+                for task in ready_tasks:
+                    agent = self._agent_for(task) or self.orchestrator
+                    # Model caps apply to the (routed) model the task is sent to first.
+                    queue.push(task, agent.profile.name, agent.model_for(context, task))
+
+                while (entry := queue.pop()) is not None:
+                    task, agent_name, model = entry
+                    if task_manager.task_states[task.id] not in (TaskStatus.READY, TaskStatus.QUEUED):
+                        queue.release(agent_name, model)  # blocked while it waited
                         continue
-
-                coro = self._execute_task(task, context)
-                running_tasks[asyncio.create_task(coro)] = task
-
-            if not running_tasks:
-                if not task_manager.is_all_completed():
-                     # Check if we are stuck (no running tasks, but not all completed)
-                     # This could happen if there are circular dependencies or failed tasks that block others
-                     # For now, we just break to avoid infinite loop
-                     logger.error("Workflow stuck: No running tasks and not all tasks completed.")
-                     break
-                else:
+                    task_manager.mark_running(task.id)
+
+                    # HITL Check
+                    if confirmation_callback:
+                        logger.info(f"Requesting confirmation for task {task.id}: {task.description}")
+                        approved = await confirmation_callback(task)
+                        if not approved:
+                            logger.warning(f"Task {task.id} was rejected by user. Skipping.")
+                            task_manager.mark_failed(task.id, "Rejected by user")
+                            queue.release(agent_name, model)
+                            continue
+
+                    future = asyncio.create_task(self._execute_task(task, context, stream))
+                    future.add_done_callback(lambda f: finished.put_nowait((f, time.monotonic())))
+                    running_tasks[future] = (task, agent_name, model)
+                    started_at[future] = time.monotonic()
+
+                for task in ready_tasks:
+                    if task_manager.task_states[task.id] == TaskStatus.READY:
+                        task_manager.mark_queued(task.id)
+                        self.message_bus.publish("task_queued", task)
+                self._save_checkpoint(context, task_manager)
+
+                if not running_tasks and not retry_timers:
+                    if not task_manager.is_finished():
+                         # Check if we are stuck (no running tasks, but tasks left that can never start)
+                         # This happens with circular or unknown dependencies
+                         logger.error("Workflow stuck: No running tasks and not all tasks finished.")
                     break
 
-            done, pending = await asyncio.wait(running_tasks.keys(), return_when=asyncio.FIRST_COMPLETED)
+                done = [await finished.get()]
+                while not finished.empty():
+                    done.append(finished.get_nowait())
 
-            for future in done:
-                task = running_tasks.pop(future)
-                try:
-                    result = await future
-                    task_manager.mark_completed(task.id, result)
-                    yield task, result
-                except Exception as e:
-                    logger.exception(f"Error executing task {task.id}: {e}")
-                    task_manager.mark_failed(task.id, str(e))
-                    yield task, f"Error executing task {task.id}: {e}"
-
-        logger.info("--- Workflow Complete ---")
+                for item in done:
+                    if item is None:
+                        continue
+                    future, finished_at = item
+                    task, agent_name, model = running_tasks.pop(future)
+                    queue.release(agent_name, model)
+                    elapsed = finished_at - started_at.pop(future)
+                    if future.cancelled() or task_manager.task_states[task.id] != TaskStatus.RUNNING:
+                        continue  # blocked while it ran
+                    try:
+                        result = await future
+                        self.task_latencies.observe(task.agent, elapsed)
+                        task_manager.mark_completed(task.id, result)
+                        self._save_checkpoint(context, task_manager)
+                        yield task, result
+                    except Exception as e:
+                        attempts[task.id] = attempts.get(task.id, 0) + 1
+                        if attempts[task.id] < self.task_retry.max_attempts:
+                            delay = self.task_retry.next_delay(retry_delays.get(task.id, self.task_retry.base_delay), e)
+                            retry_delays[task.id] = delay
+                            logger.warning(f"Task {task.id} failed (attempt {attempts[task.id]}): {e}. Retrying in {delay:.1f}s.")
+                            task_manager.mark_pending(task.id)
+                            retry_timers[task.id] = loop.call_later(delay, retry, task.id)
+                            continue
+                        logger.exception(f"Error executing task {task.id}: {e}")
+                        task_manager.mark_failed(task.id, str(e))
+                        self._save_checkpoint(context, task_manager)
+                        yield task, f"Error executing task {task.id}: {e}"
+
+                # Running tasks blocked by a failure are not waited for.
+                for future, (task, _, _) in running_tasks.items():
+                    if task_manager.task_states[task.id] != TaskStatus.RUNNING:
+                        future.cancel()
+        finally:
+            self._save_checkpoint(context, task_manager)
+            self.concurrency.unsubscribe(wake_up)
+            for timer in retry_timers.values():
+                timer.cancel()
+            for future in running_tasks:
+                future.cancel()
+
+        states = Counter(task_manager.task_states.values())
+        if states[TaskStatus.FAILED] or states[TaskStatus.BLOCKED]:
+            logger.warning(f"--- Workflow Finished: {states[TaskStatus.FAILED]} failed, {states[TaskStatus.BLOCKED]} blocked tasks ---")
+        else:
+            logger.info("--- Workflow Complete ---")
 
-    async def _execute_task(self, task: Task, context: ExecutionContext) -> Optional[str]:
+    def _agent_for(self, task: Task) -> Optional[Agent]:
+        """Returns the agent named by the task: a member of the orchestrator's team, else any agent of the system."""
         team_by_name = {agent.profile.name: agent for agent in self.orchestrator.team.values()} if self.orchestrator.team else {}
         delegate_agent = team_by_name.get(task.agent)
         if not delegate_agent:
             delegate_agent = next((agent for agent in self.agents if agent.profile.name.lower() == task.agent.lower()), None)
+        return delegate_agent
 
+    async def _execute_task(self, task: Task, context: ExecutionContext, stream: bool = False) -> Optional[str]:
+        delegate_agent = self._agent_for(task)
         if not delegate_agent:
             logger.warning(f"No agent found with name '{task.agent}'. Execution will continue with the Orchestrator as the fallback agent.")
             delegate_agent = self.orchestrator
@@ -259,7 +529,14 @@ class System:
         logger.info(f"Agent '{delegate_agent.profile.name}' is executing step {task.id}: '{task.description}' (Role: {task.role})")
         self.message_bus.publish("task_started", task)
 
-        result = await delegate_agent.execute_task(context, task)
+        with call_scope(self.metrics, agent=delegate_agent.profile.name, task_id=task.id):
+            # Agents with a custom execute_task keep their own (non-streaming) behaviour.
+            if stream and type(delegate_agent).execute_task is Agent.execute_task:
+                result = await delegate_agent.execute_task(
+                    context, task, on_delta=lambda delta: self.message_bus.publish("token_delta", delta))
+            else:
+                result = await delegate_agent.execute_task(context, task)
+        self._record_metrics(context, task)
         if result:
             context.record_artifact(f"{delegate_agent.profile.name}_result.txt", result, task, True)
             try:
@@ -272,6 +549,13 @@ class System:
                 logger.warning(f"Could not parse agent output as AgentOutput: {e}. Treating as plain text.")
         return result
 
+    def _record_metrics(self, context: ExecutionContext, task: Task) -> None:
+        """Attaches the task's LLM call metrics to the task and updates the session's metrics.json."""
+        records = self.metrics.for_task(task.id)
+        if records:
+            context.record_artifact("metrics.json", [r.model_dump() for r in records], task)
+        self.session.add_artifact("metrics.json", self.metrics.summary())
+
     def _update_agent_prompt(self, session: Session, agent_name: str, new_prompt: str) -> None:
         """
         Updates an agent's system prompt.
@@ -329,7 +613,7 @@ class System:
         else:
             agent_class = Orchestrator if agent_spec.get("delegation") else Agent
             
-        return agent_class(
+        agent = agent_class(
             name=agent_spec.get("name", "Unnamed Agent"),
             role=agent_spec.get("role", "Agent"),
             goal=agent_spec.get("goal", ""),
@@ -338,6 +622,14 @@ class System:
             message_bus=self.message_bus,
         )
 
+        agent.cascade = parse_cascade(agent_spec.get("cascade"))
+
+        # Per-agent limits apply to the provider/model the agent talks to.
+        if agent_spec.get("limits"):
+            get_limiter_registry().set_limits(f"{agent.llm.provider_name}:{agent.llm.species}", agent_spec["limits"])
+
+        return agent
+
     def _load_config(self, config_path: str) -> Any:
         """
         Loads the runtime configuration from a YAML file.
@@ -358,6 +650,7 @@ class System:
 
         Args:
             agents_dir (str): The absolute path to the directory containing agent YAML files.
+            default_model (str): The model of agents whose YAML does not name one.
 
         Returns:
             list: A list of dictionaries, where each dictionary represents an agent's specification.
@@ -373,7 +666,8 @@ class System:
                     base_dir = os.path.dirname(agent_file)
                     prompt_path = os.path.abspath(os.path.join(base_dir, template['system_prompt']))
                     template['system_prompt_path'] = prompt_path
-                template["model"] = default_model
+                # An agent's own `model` wins over the system default.
+                template["model"] = template.get("model") or default_model
                 templates.append(template)
         logger.info(f"{len(templates)} agent templates loaded.")
         return templates
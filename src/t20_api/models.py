@@ -114,6 +114,10 @@ class RunStatusResponseG2(BaseModel):
     status: Literal["pending", "running", "completed", "failed", "paused", "cancelling", "cancelled"]
     results: Optional[List[StepResultSummary]] = None
     error: Optional[ErrorResponse] = None
+    # LLM call metrics (tokens, latency, cost) aggregated per task, agent and model.
+    metrics: Optional[Dict[str, Any]] = None
+    # Queue depth and wait times of the process-wide rate limiters per `provider:model`.
+    rateLimits: Optional[Dict[str, Dict[str, Any]]] = None
 
 # --- Workflow Event Schemas ---
 
@@ -126,6 +130,15 @@ class StepStartedEvent(BaseModel):
     timestamp: datetime.datetime = Field(default_factory=datetime.datetime.now)
     details: StepStartedEventDetails
 
+class StepQueuedEventDetails(BaseModel):
+    stepId: str
+    agent: str
+
+class StepQueuedEvent(BaseModel):
+    type: Literal["StepQueued"] = "StepQueued"
+    timestamp: datetime.datetime = Field(default_factory=datetime.datetime.now)
+    details: StepQueuedEventDetails
+
 class AgentOutputReceivedEventDetails(BaseModel):
     stepId: str
     agent: str
@@ -146,6 +159,40 @@ class StepCompletedEvent(BaseModel):
     timestamp: datetime.datetime = Field(default_factory=datetime.datetime.now)
     details: StepCompletedEventDetails
 
+class TokenDeltaEventDetails(BaseModel):
+    stepId: str
+    agent: str
+    index: int
+    text: str
+    tier: int = 0
+
+class TokenDeltaEvent(BaseModel):
+    type: Literal["TokenDelta"] = "TokenDelta"
+    timestamp: datetime.datetime = Field(default_factory=datetime.datetime.now)
+    details: TokenDeltaEventDetails
+
+class AgentOutputFieldEventDetails(BaseModel):
+    stepId: str
+    agent: str
+    path: str
+    value: Any
+
+class AgentOutputFieldEvent(BaseModel):
+    type: Literal["AgentOutputField"] = "AgentOutputField"
+    timestamp: datetime.datetime = Field(default_factory=datetime.datetime.now)
+    details: AgentOutputFieldEventDetails
+
+class CircuitBreakerChangedEventDetails(BaseModel):
+    key: str
+    state: Literal["closed", "open", "half_open"]
+    previous: Literal["closed", "open", "half_open"]
+    reason: str
+
+class CircuitBreakerChangedEvent(BaseModel):
+    type: Literal["CircuitBreakerChanged"] = "CircuitBreakerChanged"
+    timestamp: datetime.datetime = Field(default_factory=datetime.datetime.now)
+    details: CircuitBreakerChangedEventDetails
+
 class WorkflowCompletedEvent(BaseModel):
     type: Literal["WorkflowCompleted"] = "WorkflowCompleted"
     timestamp: datetime.datetime = Field(default_factory=datetime.datetime.now)
@@ -168,12 +215,24 @@ class WorkflowResumedEvent(BaseModel):
 
 # Union type for events
 WorkflowEvent = (
-    StepStartedEvent | AgentOutputReceivedEvent | StepCompletedEvent |
-    WorkflowCompletedEvent | WorkflowFailedEvent | WorkflowPausedEvent | WorkflowResumedEvent
+    StepQueuedEvent | StepStartedEvent | AgentOutputReceivedEvent | StepCompletedEvent | TokenDeltaEvent |
+    AgentOutputFieldEvent | CircuitBreakerChangedEvent | WorkflowCompletedEvent | WorkflowFailedEvent |
+    WorkflowPausedEvent | WorkflowResumedEvent
 )
 
+class CircuitBreakerStatus(BaseModel):
+    key: str
+    state: Literal["closed", "open", "half_open"]
+    consecutiveFailures: int
+    trips: int
+    fallback: Optional[str] = None
+
 class ControlCommand(BaseModel):
-    command: Literal["pause", "resume", "cancel"]
+    command: Literal["pause", "resume", "cancel", "set_limits"]
+    # For "set_limits": caps on running tasks (null removes a cap). Omitted caps are kept.
+    maxParallelTasks: Optional[int] = None
+    agentLimits: Optional[Dict[str, Optional[int]]] = None
+    modelLimits: Optional[Dict[str, Optional[int]]] = None
 
 class WebhookSubscription(BaseModel):
     webhookId: Optional[str] = None
@@ -10,6 +10,9 @@ from sse_starlette.sse import EventSourceResponse
 
 # --- Runtime Imports ---
 from t20.core.system.system import System
+from t20.core.agents.circuit_breaker import BREAKER_TOPIC, get_breaker_registry
+from t20.core.agents.clients import get_client_registry
+from t20.core.agents.rate_limit import get_limiter_registry
 from t20.core.common.types import File as RuntimeFile
 from t20.core.common.types import Plan as RuntimePlan
 from t20.core.common.types import Task as RuntimeTask
@@ -36,17 +39,55 @@ def handle_task_started(task: Any):
         if job["status"] == "running":
             job["events"].put_nowait(event)
 
+def handle_task_queued(task: Any):
+    """Callback for task_queued events (a ready task waits for a concurrency slot) from the system message bus."""
+    event = models.StepQueuedEvent(details=models.StepQueuedEventDetails(stepId=task.id, agent=task.agent))
+
+    for job in JOBS.values():
+        if job["status"] == "running":
+            job["events"].put_nowait(event)
+
+def handle_token_delta(delta: Any):
+    """Callback for token_delta events (streamed agent output) from the system message bus."""
+    event = models.TokenDeltaEvent(details=models.TokenDeltaEventDetails(stepId=delta.task_id, agent=delta.agent, index=delta.index, text=delta.text, tier=delta.tier))
+
+    for job in JOBS.values():
+        if job["status"] == "running":
+            job["events"].put_nowait(event)
+
+def handle_output_field(field: Any):
+    """Callback for output_field events (a complete file, prompt or output of a streaming agent) from the system message bus."""
+    event = models.AgentOutputFieldEvent(details=models.AgentOutputFieldEventDetails(stepId=field.task_id, agent=field.agent, path=field.path, value=field.value))
+
+    for job in JOBS.values():
+        if job["status"] == "running":
+            job["events"].put_nowait(event)
+
+def handle_breaker_change(event: Any):
+    """Callback for circuit_breaker events (a provider/model breaker changed state) from the system message bus."""
+    api_event = models.CircuitBreakerChangedEvent(details=models.CircuitBreakerChangedEventDetails(
+        key=event.key, state=event.state.value, previous=event.previous.value, reason=event.reason))
+
+    for job in JOBS.values():
+        if job["status"] == "running":
+            job["events"].put_nowait(api_event)
+
 async def initialize_system(orchestrator_name="Meta-AI"):
     try:
-        system.setup(orchestrator_name=orchestrator_name)
+        system.setup(orchestrator_name=orchestrator_name, warm=True)
     except Exception as e:
         print(f"Warning: System setup failed on startup: {e}")
     
     # Subscribe to task started events
     system.message_bus.subscribe("task_started", handle_task_started)
+    system.message_bus.subscribe("task_queued", handle_task_queued)
+    system.message_bus.subscribe("token_delta", handle_token_delta)
+    system.message_bus.subscribe("output_field", handle_output_field)
+    system.message_bus.subscribe(BREAKER_TOPIC, handle_breaker_change)
     print("System initialized.")
 
 async def shutdown_system():
+    await get_client_registry().aclose()
     print("System shutdown.")
 
 # --- Helper Functions ---
@@ -107,7 +148,7 @@ async def run_workflow_background(job_id: str, plan: RuntimePlan, rounds: int, f
     job["start_time"] = datetime.datetime.now()
     
     try:
-        async for task, result in system.run(plan, rounds=rounds, files=files):
+        async for task, result in system.run(plan, rounds=rounds, files=files, stream=True):
             # Check for cancellation
             if job["status"] == "cancelling":
                 job["status"] = "cancelled"
@@ -139,6 +180,7 @@ async def run_workflow_background(job_id: str, plan: RuntimePlan, rounds: int, f
                 "status": "completed",
                 "output": summary
             })
+            job["metrics"] = system.metrics.summary()
             
         if job["status"] != "cancelled":
             job["status"] = "completed"
@@ -228,7 +270,9 @@ async def get_run_status(jobId: str):
         jobId=jobId,
         status=job["status"],
         results=results_summary,
-        error=job.get("error")
+        error=job.get("error"),
+        metrics=job.get("metrics"),
+        rateLimits=get_limiter_registry().metrics()
     )
 
 @router.get("/runs/{jobId}/stream", response_class=EventSourceResponse)
@@ -289,6 +333,23 @@ async def control_workflow(jobId: str, command: models.ControlCommand):
         else:
              raise HTTPException(status_code=409, detail="Cannot cancel. Job is not active.")
 
+    elif cmd == "set_limits":
+        if job["status"] not in ["running", "paused"]:
+            raise HTTPException(status_code=409, detail="Cannot set limits. Job is not active.")
+        changes = {"max_parallel_tasks": command.maxParallelTasks} if "maxParallelTasks" in command.model_fields_set else {}
+        try:
+            system.concurrency.update(agents=command.agentLimits, models=command.modelLimits, **changes)
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+
+@router.get("/llm/breakers", response_model=List[models.CircuitBreakerStatus])
+async def list_circuit_breakers():
+    return [
+        models.CircuitBreakerStatus(key=key, state=state["state"], consecutiveFailures=state["consecutive_failures"],
+                                    trips=state["trips"], fallback=state["fallback"])
+        for key, state in get_breaker_registry().states().items()
+    ]
+
 @router.post("/webhooks", status_code=201)
 async def register_webhook(subscription: models.WebhookSubscription):
     webhook_id = str(uuid.uuid4())
@@ -8,6 +8,8 @@ import asyncio
 import json
 import logging
 import os
+import sys
+import time
 from typing import List, Optional
 from pathlib import Path
 
@@ -15,6 +17,7 @@ import typer
 from typing_extensions import Annotated
 
 from t20.core import Plan
+from t20.core.agents.replay import get_replay_store
 from t20.core.common.types import File
 from t20.core.system.log import setup_logging
 from t20.core.system.system import System
@@ -45,7 +48,8 @@ async def system_run(
     rounds: int,
     files: List[str],
     orchestrator: str,
-    model: str
+    model: str,
+    resume: Optional[str] = None
 ):
     try:
         project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../t20'))
@@ -67,12 +71,19 @@ async def system_run(
 
         # 4. Instantiate and set up the system
         system = System(root_dir=project_root, default_model=model)
-        system.setup(orchestrator_name=orchestrator)
+        system.setup(orchestrator_name=orchestrator, warm=not plan_only)
 
         # 5. Re-configure logging based on loaded config
         log_level = system.config.get("logging_level", "INFO")
         setup_application_logging(log_level=log_level)
 
+        if resume:
+            steps = 0
+            async for step, result in system.resume(resume):
+                steps += 1
+            logger.info(f"Resumed session '{resume}': {steps} tasks executed.")
+            return
+
         # 6. Start the system's main workflow
         plan_arg = None
         if plan_from:
@@ -110,6 +121,34 @@ async def system_run(
         logger.error(f"An unexpected error occurred during system main execution: {e}")
         return
 
+async def system_replay(session_id: str, rounds: int, orchestrator: str, model: str):
+    try:
+        project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../t20'))
+        setup_application_logging()
+
+        system = System(root_dir=project_root, default_model=model)
+        system.setup(orchestrator_name=orchestrator)
+        setup_application_logging(log_level=system.config.get("logging_level", "INFO"))
+
+        plan, goal, files = system.load_replay(session_id)
+        started = time.perf_counter()
+        plan = await system.start(high_level_goal=goal, files=files, plan=plan)
+        steps = 0
+        async for step, result in system.run(plan=plan, rounds=rounds, files=files):
+            steps += 1
+        elapsed = time.perf_counter() - started
+
+        stats = get_replay_store().as_dict()
+        print(f"Replayed session '{session_id}' as '{system.session.session_id}': "
+              f"{steps} steps in {elapsed:.3f}s, {stats['hits']} recorded responses, {stats['misses']} misses.")
+
+    except (FileNotFoundError, RuntimeError) as e:
+        logger.error(f"A critical error occurred: {e}")
+        return
+    except Exception as e:
+        logger.error(f"An unexpected error occurred during system replay: {e}")
+        return
+
 @app.command()
 def run(
     task: Annotated[Optional[str], typer.Argument(help="The initial task for the orchestrator to perform.")] = None,
@@ -119,6 +158,7 @@ def run(
     files: Annotated[List[str], typer.Option("--files", "-f", help="List of files to be used in the task.")] = [],
     orchestrator: Annotated[str, typer.Option("--orchestrator", "-o", help="The name of the orchestrator to use.")] = "Meta-AI",
     model: Annotated[str, typer.Option("--model", "-m", help="Default LLM model to use.")] = "gemini-2.5-flash-lite",
+    resume: Annotated[Optional[str], typer.Option("--resume", help="Continue an interrupted session, running only its unfinished tasks.")] = None,
 ):
     """
     Run the T20 Multi-Agent System.
@@ -127,13 +167,30 @@ def run(
         typer.echo("Number of rounds must be at least 1.", err=True)
         raise typer.Exit(code=1)
     
-    if not task and not plan_from:
-        typer.echo("The task argument is required unless --plan-from is specified.", err=True)
+    if not task and not plan_from and not resume:
+        typer.echo("The task argument is required unless --plan-from or --resume is specified.", err=True)
         raise typer.Exit(code=1)
 
-    asyncio.run(system_run(task, plan_from, plan_only, rounds, files, orchestrator, model))
+    asyncio.run(system_run(task, plan_from, plan_only, rounds, files, orchestrator, model, resume))
+
+@app.command()
+def replay(
+    session_id: Annotated[str, typer.Argument(help="The recorded session to re-execute.")],
+    rounds: Annotated[int, typer.Option("--rounds", "-r", help="The number of rounds to execute the workflow.")] = 1,
+    orchestrator: Annotated[str, typer.Option("--orchestrator", "-o", help="The name of the orchestrator to use.")] = "Meta-AI",
+    model: Annotated[str, typer.Option("--model", "-m", help="Default LLM model to use.")] = "gemini-2.5-flash-lite",
+):
+    """
+    Re-execute the plan of a recorded session with its recorded LLM responses (no model calls).
+    """
+    asyncio.run(system_replay(session_id, rounds, orchestrator, model))
+
+COMMANDS = ("run", "replay")
 
 def main():
+    # `t20-system "task"` predates the subcommands and still means `t20-system run "task"`.
+    if len(sys.argv) > 1 and sys.argv[1] not in COMMANDS and sys.argv[1] not in ("--help", "--install-completion", "--show-completion"):
+        sys.argv.insert(1, "run")
     app()
 
 if __name__ == "__main__":
@@ -0,0 +1,82 @@
+import json
+import shutil
+import tempfile
+
+import pytest
+
+from t20.core.agents.agent import Agent
+from t20.core.agents.cascade import configure_cascade, parse_cascade
+from t20.core.agents.llm import LLM, register_provider
+from t20.core.common.types import Plan, Role, Task
+from t20.core.data.db import SessionDB
+from t20.core.system.session import ExecutionContext, Session
+
+GOOD = json.dumps({"output": "done", "artifact": {"task": "T1", "files": [{"path": "a.py", "content": "print('big')"}]}})
+NO_FILES = json.dumps({"output": "done"})
+CALLS = []
+
+
+@register_provider("tier")
+class TierLLM(LLM):
+    """Answers with the response named by the model, e.g. `tier:good`."""
+    responses = {"good": GOOD, "nofiles": NO_FILES, "broken": "I am not sure what you mean."}
+
+    async def generate_content(self, model_name, contents, *args, **kwargs):
+        return self.responses[model_name.split(":")[1]]
+
+    async def generate_stream(self, model_name, contents, system_instruction='', temperature=0.7,
+                              response_mime_type='text/plain', response_schema=None):
+        CALLS.append(model_name)
+        text = self.responses[model_name.split(":")[1]]
+        for i in range(0, len(text), 10):
+            yield text[i:i + 10]
+
+
+@pytest.fixture
+def context():
+    SessionDB._reset_instance()
+    CALLS.clear()
+    temp_dir = tempfile.mkdtemp()
+    plan = Plan(high_level_goal="Goal", reasoning="r", roles=[Role(title="Coder", purpose="p")],
+                tasks=[Task(id="T1", description="Write", role="Coder", agent="Writer", deps=[])])
+    yield ExecutionContext(session=Session(project_root=temp_dir), plan=plan)
+    configure_cascade(None)
+    SessionDB._reset_instance()
+    shutil.rmtree(temp_dir)
+
+
+def make_agent():
+    return Agent(name="Writer", role="Coder", goal="Write", model="tier:good", system_prompt="", message_bus=None)
+
+
+def test_parse_cascade():
+    assert parse_cascade("ollama:small -> gemini-2.5-flash-lite ->gemini-2.5-pro") == [
+        "ollama:small", "gemini-2.5-flash-lite", "gemini-2.5-pro"]
+    assert parse_cascade(["a", " b "]) == ["a", "b"] and parse_cascade(None) == []
+
+
+@pytest.mark.asyncio
+async def test_cheap_tier_serves_valid_output(context):
+    configure_cascade({"roles": {"coder": "tier:nofiles -> tier:good"}})
+    agent = make_agent()
+
+    result = await agent.execute_task(context, context.plan.tasks[0])
+
+    assert json.loads(result)["output"] == "done" and CALLS == ["tier:nofiles"]
+    assert context.session.get_artifact("__step_T1_cascade.json")["served_by"] == "tier:nofiles"
+
+
+@pytest.mark.asyncio
+async def test_escalates_on_invalid_or_rejected_output(context):
+    configure_cascade({"require_files": True})
+    agent = make_agent()
+    agent.cascade = parse_cascade("tier:broken -> tier:nofiles -> tier:good")
+
+    deltas = [delta async for delta in agent.execute_task_stream(context, context.plan.tasks[0])]
+
+    assert CALLS == ["tier:broken", "tier:nofiles", "tier:good"]
+    assert "".join(d.text for d in deltas if d.tier == 2) == GOOD and deltas[-1].tier == 2
+    assert context.session.get_artifact("a.py") == "print('big')"
+    record = context.session.get_artifact("__step_T1_cascade.json")
+    assert record["served_by"] == "tier:good" and record["tier"] == 2
+    assert [reason.split(":")[1] for reason in record["escalations"]] == ["broken", "nofiles"]
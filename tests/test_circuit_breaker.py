@@ -0,0 +1,115 @@
+import asyncio
+
+import pytest
+
+from t20.core.agents.circuit_breaker import (BreakerEvent, BreakerRegistry, CircuitBreakerLLM, CircuitState)
+from t20.core.agents.llm import LLM, CircuitOpenError, register_provider
+from t20.core.agents.retry import RetryingLLM, RetryPolicy
+from t20.core.system.message_bus import MessageBus
+
+
+class Outage(Exception):
+    status_code = 503
+
+
+class ScriptedLLM(LLM):
+    provider_name = "fake"
+
+    def __init__(self, species="fake-model", failing=True, delay=0.0):
+        super().__init__(species)
+        self.failing = failing
+        self.delay = delay
+        self.calls = 0
+
+    async def generate_content(self, model_name, contents, system_instruction='', temperature=0.7,
+                               response_mime_type='text/plain', response_schema=None):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.failing:
+            raise Outage("service unavailable")
+        return f"{self.provider_name}:{self.species}"
+
+
+@register_provider("standby")
+class StandbyLLM(ScriptedLLM):
+    def __init__(self, species):
+        super().__init__(species, failing=False)
+
+
+def make(inner, **settings):
+    registry = BreakerRegistry()
+    registry.configure({"default": {"failure_threshold": 3, "reset_timeout": 0.05, **settings}})
+    bus = MessageBus()
+    events = []
+    bus.subscribe("circuit_breaker", events.append)
+    return CircuitBreakerLLM(inner, registry, bus), registry, events
+
+
+@pytest.mark.asyncio
+async def test_trips_and_fails_fast():
+    inner = ScriptedLLM()
+    llm, registry, events = make(inner)
+
+    for _ in range(3):
+        with pytest.raises(Outage):
+            await llm.generate_content("fake-model", "q")
+    with pytest.raises(CircuitOpenError):
+        await llm.generate_content("fake-model", "q")
+
+    assert inner.calls == 3
+    assert registry.states()["fake:fake-model"]["state"] == "open"
+    assert [(e.previous, e.state) for e in events] == [(CircuitState.CLOSED, CircuitState.OPEN)]
+    assert all(isinstance(e, BreakerEvent) for e in events)
+
+    # Retries stop as soon as the breaker is open.
+    retrying = RetryingLLM(llm, RetryPolicy(max_attempts=5, base_delay=0.0, max_delay=0.0))
+    assert await retrying.generate_content("fake-model", "q") is None
+    assert inner.calls == 3
+
+
+@pytest.mark.asyncio
+async def test_half_open_sends_a_single_probe():
+    inner = ScriptedLLM(delay=0.02)
+    llm, registry, events = make(inner)
+    for _ in range(3):
+        with pytest.raises(Outage):
+            await llm.generate_content("fake-model", "q")
+
+    await asyncio.sleep(0.06)
+    inner.failing = False
+    results = await asyncio.gather(llm.generate_content("fake-model", "q"),
+                                   llm.generate_content("fake-model", "q"), return_exceptions=True)
+
+    assert results[0] == "fake:fake-model"
+    assert isinstance(results[1], CircuitOpenError)
+    assert inner.calls == 4
+    assert [e.state for e in events] == [CircuitState.OPEN, CircuitState.HALF_OPEN, CircuitState.CLOSED]
+
+
+@pytest.mark.asyncio
+async def test_slow_calls_trip_and_open_breaker_uses_fallback():
+    inner = ScriptedLLM(failing=False, delay=0.02)
+    llm, registry, events = make(inner, latency_budget=0.01, failure_threshold=2, fallback="standby:spare")
+
+    await llm.generate_content("fake-model", "q")
+    await llm.generate_content("fake-model", "q")
+    assert registry.states()["fake:fake-model"]["state"] == "open"
+
+    assert await llm.generate_content("fake-model", "q") == "standby:spare"
+    assert inner.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_client_errors_do_not_trip():
+    class BadRequest(ScriptedLLM):
+        async def generate_content(self, *args, **kwargs):
+            self.calls += 1
+            raise ValueError("invalid schema")
+
+    llm, registry, events = make(BadRequest())
+    for _ in range(5):
+        with pytest.raises(ValueError):
+            await llm.generate_content("fake-model", "q")
+
+    assert registry.states()["fake:fake-model"]["state"] == "closed"
+    assert events == []
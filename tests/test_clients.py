@@ -0,0 +1,58 @@
+import asyncio
+import time
+
+import pytest
+
+from t20.core.agents.clients import ClientRegistry
+from t20.core.agents.llm import LLM
+from t20.core.agents.rate_limit import RateLimitedLLM
+from t20.core.agents.retry import RetryingLLM
+
+CONNECT_DELAY = 0.1
+
+
+class SlowConnectLLM(LLM):
+    provider_name = "fake"
+
+    def __init__(self, species, fail=False):
+        super().__init__(species)
+        self.fail = fail
+        self.warmed = False
+
+    async def generate_content(self, model_name, contents, system_instruction='', temperature=0.7,
+                               response_mime_type='text/plain', response_schema=None):
+        return "ok"
+
+    async def warm(self):
+        await asyncio.sleep(CONNECT_DELAY)
+        if self.fail:
+            raise ConnectionError("unreachable")
+        self.warmed = True
+
+
+@pytest.mark.asyncio
+async def test_clients_share_one_pool_per_loop():
+    registry = ClientRegistry()
+    registry.configure({"max_connections": 7, "http2": False})
+
+    first = registry.get("a", lambda r: r.http_client())
+    second = registry.get("b", lambda r: r.http_client())
+
+    assert registry.get("a", lambda r: pytest.fail("client was rebuilt")) is first
+    assert first._transport is second._transport is registry.transport()
+    assert registry.transport()._pool._max_connections == 7
+    await registry.aclose()
+
+
+@pytest.mark.asyncio
+async def test_warm_up_is_concurrent_and_tolerates_failures():
+    registry = ClientRegistry()
+    llms = [RetryingLLM(RateLimitedLLM(SlowConnectLLM(f"m{i}"))) for i in range(5)]
+    broken = SlowConnectLLM("down", fail=True)
+
+    started = time.perf_counter()
+    await registry.warm([*llms, broken])
+    elapsed = time.perf_counter() - started
+
+    assert all(llm.inner.inner.warmed for llm in llms)
+    assert elapsed < 2 * CONNECT_DELAY
@@ -0,0 +1,110 @@
+from types import SimpleNamespace
+
+import pytest
+from google.genai import types
+
+from t20.core.agents.clients import get_client_registry
+from t20.core.agents.context_cache import configure_context_cache
+from t20.core.agents.llm import Gemini
+from t20.core.agents.metrics import MeteredLLM, MetricsLedger, call_scope, configure_pricing
+
+PREFIX_TOKENS = 3000
+
+
+class ApiError(Exception):
+    def __init__(self, code):
+        super().__init__(f"HTTP {code}")
+        self.code = code
+
+
+class StandInCaches:
+    """Stands in for the cached-content API of the GenAI client."""
+
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.attempts = 0
+        self.created = []
+
+    async def create(self, model, config):
+        self.attempts += 1
+        if self.fail:
+            raise ApiError(400)
+        self.created.append(config)
+        return types.CachedContent(name=f"cachedContents/{len(self.created)}", model=model)
+
+
+class StandInModels:
+    def __init__(self):
+        self.configs = []
+        self.rejected = set()
+
+    async def generate_content(self, model, contents, config):
+        self.configs.append(config)
+        if config.cached_content in self.rejected:
+            raise ApiError(404)
+        cached = PREFIX_TOKENS if config.cached_content else 0
+        return types.GenerateContentResponse(
+            candidates=[types.Candidate(content=types.Content(role="model", parts=[types.Part(text="answer")]))],
+            usage_metadata=types.GenerateContentResponseUsageMetadata(
+                prompt_token_count=PREFIX_TOKENS + 10, candidates_token_count=5, cached_content_token_count=cached),
+        )
+
+
+@pytest.fixture
+def gemini():
+    models, caches = StandInModels(), StandInCaches()
+    get_client_registry().override("gemini", SimpleNamespace(aio=SimpleNamespace(models=models, caches=caches)))
+    configure_context_cache({"enabled": True, "min_tokens": 1})
+    configure_pricing({"gemini": {"input_per_mtok": 1.0, "cached_input_per_mtok": 0.25}})
+    yield Gemini("stand-in"), models, caches
+    get_client_registry().override("gemini", None)
+    configure_context_cache(None)
+    configure_pricing(None)
+
+
+@pytest.mark.asyncio
+async def test_prefix_is_uploaded_once_and_reused(gemini):
+    llm, models, caches = gemini
+    ledger = MetricsLedger()
+    metered = MeteredLLM(llm)
+
+    with call_scope(ledger):
+        for _ in range(3):
+            assert await metered.generate_content("stand-in", "question", "You are a writer.") == "answer"
+
+    assert len(caches.created) == 1
+    assert all(c.cached_content == "cachedContents/1" and c.system_instruction is None for c in models.configs)
+    record = ledger.records[0]
+    assert record.cached_input_tokens == PREFIX_TOKENS
+    assert record.cost == pytest.approx((10 * 1.0 + PREFIX_TOKENS * 0.25) / 1_000_000)
+    assert ledger.summary()["totals"]["cached_input_tokens"] == 3 * PREFIX_TOKENS
+
+
+@pytest.mark.asyncio
+async def test_falls_back_to_inline_prefix(gemini):
+    llm, models, caches = gemini
+
+    # A handle the provider no longer accepts is dropped and the request is resent inline.
+    await llm.generate_content("stand-in", "question", "You are a writer.")
+    models.rejected.add("cachedContents/1")
+    assert await llm.generate_content("stand-in", "question", "You are a writer.") == "answer"
+    assert models.configs[-1].cached_content is None and models.configs[-1].system_instruction
+
+    # A failed upload is not retried on every call.
+    caches.fail = True
+    models.configs.clear()
+    await llm.generate_content("stand-in", "question", "You are an editor.")
+    await llm.generate_content("stand-in", "question", "You are an editor.")
+    assert caches.attempts == 2
+    assert all(c.cached_content is None for c in models.configs)
+
+
+@pytest.mark.asyncio
+async def test_small_prefixes_are_sent_inline(gemini):
+    llm, models, caches = gemini
+    configure_context_cache({"enabled": True, "min_tokens": 10 ** 6})
+
+    await llm.generate_content("stand-in", "question", "You are a writer.")
+
+    assert caches.created == []
+    assert models.configs[0].cached_content is None
@@ -0,0 +1,61 @@
+import pytest
+
+from t20.core.common.types import Plan, Task
+from t20.core.orchestration.dispatch import CriticalPathPolicy, TaskLatencies, make_dispatch_policy
+from t20.core.orchestration.task_manager import TaskManager
+
+
+def task(task_id, agent="Fast", deps=(), subtasks=None, priority=None):
+    return Task(id=task_id, description=task_id, role="R", agent=agent, deps=list(deps), subtasks=subtasks,
+                priority=priority)
+
+
+def latencies():
+    history = TaskLatencies()
+    history.observe("Fast", 1.0)
+    history.observe("Slow", 10.0)
+    return history
+
+
+def ready_order(policy_name, *tasks):
+    manager = TaskManager(Plan(high_level_goal="Goal", reasoning="r", roles=[], tasks=list(tasks)))
+    policy = make_dispatch_policy(policy_name, latencies())
+    policy.prepare(manager)
+    return [t.id for t in policy.order(manager.get_ready_tasks())], policy
+
+
+def test_critical_path_starts_the_longest_remaining_chain_first():
+    order, policy = ready_order(
+        "critical_path",
+        task("short"),
+        task("head"),
+        task("P", deps=["head"], subtasks=[task("P.1", agent="Slow"), task("P.2", deps=["P.1"])]),
+        task("tail", deps=["P"]),
+    )
+
+    assert order == ["head", "short"]
+    assert policy.ranks == {"short": 1.0, "head": 13.0, "P.1": 12.0, "P.2": 2.0, "tail": 1.0}
+
+
+def test_sjf_and_explicit_priority():
+    tasks = [task("slow", agent="Slow"), task("fast"), task("new", agent="Unknown")]
+
+    assert ready_order("sjf", *tasks)[0] == ["fast", "new", "slow"]  # unknown agents get the average
+    assert ready_order("fifo", *tasks)[0] == ["slow", "fast", "new"]
+    assert ready_order("sjf", task("urgent", agent="Slow", priority=5), task("fast"))[0] == ["urgent", "fast"]
+    with pytest.raises(ValueError):
+        make_dispatch_policy("random")
+
+
+def test_latency_history_and_dependency_cycles():
+    history = TaskLatencies(default=7.0, alpha=0.5)
+    assert history.estimate("Writer") == 7.0
+    history.observe("Writer", 10.0)
+    history.observe("writer", 20.0)
+    assert history.estimate("WRITER") == 15.0
+
+    manager = TaskManager(Plan(high_level_goal="Goal", reasoning="r", roles=[],
+                               tasks=[task("A", deps=["B"]), task("B", deps=["A"]), task("C")]))
+    policy = CriticalPathPolicy(latencies())
+    policy.prepare(manager)
+    assert set(policy.ranks) == {"A", "B", "C"}
@@ -0,0 +1,38 @@
+import json
+import subprocess
+import sys
+
+# Importing the provider SDKs eagerly took about 2s; t20 itself takes about 0.5s.
+IMPORT_BUDGET = 1.5
+
+SDKS = ("google.genai", "ollama", "huggingface_hub", "openai", "mistralai")
+
+
+def run(code):
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def test_import_stays_within_budget_and_loads_no_sdk():
+    report = run(
+        "import json, sys, time\n"
+        "started = time.perf_counter()\n"
+        "import t20\n"
+        "elapsed = time.perf_counter() - started\n"
+        f"print(json.dumps({{'elapsed': elapsed, 'sdks': [m for m in {SDKS!r} if m in sys.modules]}}))"
+    )
+
+    assert report["sdks"] == []
+    assert report["elapsed"] < IMPORT_BUDGET
+
+
+def test_factory_imports_only_the_requested_provider():
+    report = run(
+        "import json, sys\n"
+        "from t20.core.agents.llm import LLM\n"
+        "llm = LLM.provider('opi:gpt-4o-mini')\n"
+        f"print(json.dumps({{'provider': type(llm).__name__, 'species': llm.species, "
+        f"'sdks': [m for m in {SDKS!r} if m in sys.modules]}}))"
+    )
+
+    assert report == {"provider": "Opi", "species": "gpt-4o-mini", "sdks": ["openai"]}
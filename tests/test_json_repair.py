@@ -0,0 +1,136 @@
+import json
+import shutil
+import tempfile
+
+import pytest
+
+from t20.core.agents.agent import Agent
+from t20.core.agents.llm import LLM
+from t20.core.agents.metrics import MeteredLLM, MetricsLedger, call_scope
+from t20.core.agents.repair import RepairingLLM
+from t20.core.common.types import AgentOutput, Plan, Role, Task
+from t20.core.data.db import SessionDB
+from t20.core.parsing.json_repair import JSONRepairError, repair_json
+from t20.core.orchestration.orchestrator import Orchestrator
+from t20.core.system.session import ExecutionContext, Session
+from t20.core.system.system import System
+
+
+@pytest.mark.parametrize("text, value, repairs", [
+    ('{"a": [1, 2]}', {"a": [1, 2]}, []),
+    ('```json\n{"a": 1}\n```', {"a": 1}, ["fence"]),
+    ('Sure! Here it is: {"a": [1, 2,],} Hope it helps.', {"a": [1, 2]}, ["prose", "trailing_comma"]),
+    ('{"a": 1 "b": 2}', {"a": 1, "b": 2}, ["missing_comma"]),
+    ("{'a': 'it\\'s', \"b\": True, 'c': None}", {"a": "it's", "b": True, "c": None}, ["quotes", "literal"]),
+    ('{a: 1, b: "x"}', {"a": 1, "b": "x"}, ["unquoted"]),
+    ('{"a": [1, {"b": "cut', {"a": [1, {"b": "cut"}]}, ["truncated"]),
+    ('{"a": 1, "b":', {"a": 1}, ["truncated"]),
+    (r'{"a": "C:\users\Alice"}', {"a": "C:\\users\\Alice"}, []),
+    (r'{"a": "\uZZ \\uZZ \u0041"}', {"a": "\\uZZ \\uZZ A"}, []),
+])
+def test_repairs_common_defects(text, value, repairs):
+    result = repair_json(text)
+    assert result.value == value
+    assert result.repairs == repairs
+
+
+def test_coerces_and_completes_documents_towards_the_schema():
+    result = repair_json('{"Output": 42, "artifact": {"task": "T1", "files": {"path": "a.py", "content": "x"}}}', AgentOutput)
+    assert result.value.output == "42" and result.value.artifact.files[0].path == "a.py"
+    assert result.repairs == ["schema"]
+
+    truncated = '{"output": "x", "artifact": {"task": "T1", "files": [{"path": "a.py", "content": "x"}, {"path": "b'
+    result = repair_json(truncated, AgentOutput)
+    assert [f.path for f in result.value.artifact.files] == ["a.py"]
+    assert result.repairs == ["truncated", "schema"]
+
+    with pytest.raises(JSONRepairError):
+        repair_json("I cannot help with that.", AgentOutput)
+
+
+class SloppyLLM(LLM):
+    provider_name = "fake"
+
+    def __init__(self, text):
+        super().__init__("fake-model")
+        self.text = text
+        self.calls = 0
+
+    async def generate_content(self, *args, **kwargs):
+        self.calls += 1
+        return self.text
+
+    async def generate_stream(self, *args, **kwargs):
+        for i in range(0, len(self.text), 8):
+            yield self.text[i:i + 8]
+
+
+@pytest.mark.asyncio
+async def test_repaired_calls_are_metered():
+    ledger = MetricsLedger()
+    inner = SloppyLLM("```json\n{'output': 'done', 'reasoning': 'r',}\n```")
+    llm = MeteredLLM(RepairingLLM(inner))
+
+    with call_scope(ledger, agent="Writer", task_id="T1"):
+        response = await llm.generate_content("fake-model", "q", response_mime_type="application/json",
+                                              response_schema=AgentOutput)
+        assert await llm.generate_content("fake-model", "q") == inner.text
+
+    assert response == AgentOutput(output="done", reasoning="r") and inner.calls == 2
+    totals = ledger.summary()["totals"]
+    assert totals["repaired_calls"] == 1
+    assert totals["repairs"] == {"fence": 1, "quotes": 1, "trailing_comma": 1}
+
+
+@pytest.mark.asyncio
+async def test_agent_repairs_malformed_streamed_output():
+    SessionDB._reset_instance()
+    temp_dir = tempfile.mkdtemp()
+    try:
+        plan = Plan(high_level_goal="Goal", reasoning="r", roles=[Role(title="Writer", purpose="p")],
+                    tasks=[Task(id="T1", description="Write", role="Writer", agent="Writer", deps=[])])
+        context = ExecutionContext(session=Session(project_root=temp_dir), plan=plan)
+        text = json.dumps({"output": "x", "artifact": {"task": "T1", "files": [{"path": "a.py", "content": "print(1)"}]}})
+        agent = Agent(name="Writer", role="Writer", goal="Write", model="fake", system_prompt="", message_bus=None)
+        agent.llm = MeteredLLM(SloppyLLM("Here you go:\n" + text[:-3]))
+        ledger = MetricsLedger()
+
+        with call_scope(ledger, agent="Writer", task_id="T1"):
+            await agent.execute_task(context, plan.tasks[0])
+
+        assert context.session.get_artifact("a.py") == "print(1)"
+        assert ledger.records[0].repairs == ["prose", "truncated"]
+    finally:
+        SessionDB._reset_instance()
+        shutil.rmtree(temp_dir)
+
+
+@pytest.mark.asyncio
+async def test_system_applies_prompt_updates_from_repaired_output():
+    SessionDB._reset_instance()
+    temp_dir = tempfile.mkdtemp()
+    try:
+        system = System(root_dir=temp_dir)
+        text = json.dumps({"output": "x", "team": {"notes": "n", "prompts": [
+            {"agent": "Reviewer", "role": "Reviewer", "system_prompt": "Be strict."}]}})
+        writer = Agent(name="Writer", role="Writer", goal="Write", model="fake", system_prompt="",
+                       message_bus=system.message_bus)
+        writer.llm = SloppyLLM("```json\n" + text[:-1] + ",}\n```")
+        reviewer = Agent(name="Reviewer", role="Reviewer", goal="Review", model="fake", system_prompt="",
+                         message_bus=system.message_bus)
+        system.orchestrator = Orchestrator(name="Boss", role="Orchestrator", goal="Plan", model="fake",
+                                           system_prompt="", message_bus=system.message_bus)
+        system.orchestrator.team = {"Writer": writer, "Reviewer": reviewer}
+        system.agents = [system.orchestrator, writer, reviewer]
+        system.session = Session(agents=system.agents, project_root=temp_dir)
+        plan = Plan(high_level_goal="Goal", reasoning="r", roles=[Role(title="Writer", purpose="p")],
+                    tasks=[Task(id="T1", description="Write", role="Writer", agent="Writer", deps=[])])
+        context = ExecutionContext(session=system.session, plan=plan)
+
+        result = await system._execute_task(plan.tasks[0], context, stream=True)
+
+        assert AgentOutput.model_validate_json(result).output == "x"
+        assert reviewer.system_instructions == "Be strict."
+    finally:
+        SessionDB._reset_instance()
+        shutil.rmtree(temp_dir)
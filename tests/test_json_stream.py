@@ -0,0 +1,148 @@
+import json
+import shutil
+import tempfile
+
+import pytest
+
+from t20.core.agents.agent import STREAMED_OUTPUT_FIELDS, Agent
+from t20.core.agents.llm import LLM
+from t20.core.common.types import OutputField, Plan, Role, Task
+from t20.core.data.db import SessionDB
+from t20.core.parsing.json_stream import JSONStreamError, StreamingJSONParser
+from t20.core.system.message_bus import MessageBus
+from t20.core.system.session import ExecutionContext, Session
+
+DOCUMENT = {
+    "output": "Wrote \"two\" files \\ done",
+    "artifact": {"task": "T1", "files": [{"path": "a.py", "content": "x = [1, {}]\n"},
+                                         {"path": "b.md", "content": "# B"}]},
+    "team": {"notes": "n", "prompts": [{"agent": "Writer", "role": "r", "system_prompt": "s"}]},
+    "reasoning": "long " * 50,
+}
+
+
+def parse(text, size):
+    parser = StreamingJSONParser(STREAMED_OUTPUT_FIELDS)
+    events = []
+    for i in range(0, len(text), size):
+        events += parser.feed(text[i:i + size])
+    return events, parser.close()
+
+
+@pytest.mark.parametrize("text", [json.dumps(DOCUMENT), json.dumps(DOCUMENT, indent=2),
+                                  "```json\n" + json.dumps(DOCUMENT) + "\n```"])
+@pytest.mark.parametrize("size", [1, 3, 64, 100000])
+def test_fields_are_emitted_once_complete(text, size):
+    events, document = parse(text, size)
+
+    assert document == DOCUMENT
+    assert events == [(("output",), DOCUMENT["output"]),
+                      (("artifact", "files", 0), DOCUMENT["artifact"]["files"][0]),
+                      (("artifact", "files", 1), DOCUMENT["artifact"]["files"][1]),
+                      (("team", "prompts", 0), DOCUMENT["team"]["prompts"][0])]
+
+
+@pytest.mark.parametrize("text", ['{"output": "x" "artifact": 1}', '{"output": tru}', '{"a": [1 2]}',
+                                  'Sure! Here is the JSON', '{"a": 1} trailing'])
+def test_malformed_documents_fail_at_the_offending_chunk(text):
+    with pytest.raises(JSONStreamError):
+        StreamingJSONParser().feed(text)
+
+
+@pytest.mark.parametrize("size", [1, 100000])
+def test_raw_newlines_in_strings_are_accepted(size):
+    events, document = parse('{"output": "line1\nline2", "reasoning": "r"}', size)
+
+    assert events == [(("output",), "line1\nline2")]
+    assert document == {"output": "line1\nline2", "reasoning": "r"}
+
+
+def test_invalid_escapes_fail_as_stream_errors():
+    with pytest.raises(JSONStreamError, match="Invalid key"):
+        StreamingJSONParser().feed('{"a\\x": 1}')
+    parser = StreamingJSONParser()
+    parser.feed('{"reasoning": "C:\\users"}')
+    with pytest.raises(JSONStreamError, match="Invalid JSON document"):
+        parser.close()
+
+
+def test_truncated_documents_fail_on_close():
+    parser = StreamingJSONParser()
+    parser.feed('{"output": "x", "artifact": {"files": [{"path": "a')
+    with pytest.raises(JSONStreamError, match="artifact.files\\[0\\].path"):
+        parser.close()
+
+
+class ChunkedLLM(LLM):
+    provider_name = "fake"
+
+    def __init__(self, text, chunk_size=16):
+        super().__init__("fake-model")
+        self.text = text
+        self.chunk_size = chunk_size
+        self.sent = 0
+        self.closed = False
+
+    async def generate_content(self, *args, **kwargs):
+        return self.text
+
+    async def generate_stream(self, *args, **kwargs):
+        try:
+            for i in range(0, len(self.text), self.chunk_size):
+                self.sent += 1
+                yield self.text[i:i + self.chunk_size]
+        finally:
+            self.closed = True
+
+
+@pytest.fixture
+def context():
+    SessionDB._reset_instance()
+    temp_dir = tempfile.mkdtemp()
+    plan = Plan(high_level_goal="Goal", reasoning="r", roles=[Role(title="Writer", purpose="p")],
+                tasks=[Task(id="T1", description="Write", role="Writer", agent="Writer", deps=[])])
+    yield ExecutionContext(session=Session(project_root=temp_dir), plan=plan)
+    SessionDB._reset_instance()
+    shutil.rmtree(temp_dir)
+
+
+@pytest.mark.asyncio
+async def test_files_are_stored_before_the_reasoning_is_generated(context):
+    bus = MessageBus()
+    fields = []
+    bus.subscribe("output_field", fields.append)
+    agent = Agent(name="Writer", role="Writer", goal="Write", model="fake", system_prompt="", message_bus=bus)
+    agent.llm = ChunkedLLM(json.dumps(DOCUMENT))
+    task = context.plan.tasks[0]
+
+    stored_while_streaming = None
+    async for delta in agent.execute_task_stream(context, task):
+        if stored_while_streaming is None and "reasoning" in delta.text:
+            stored_while_streaming = context.session.get_artifact("b.md")
+
+    assert stored_while_streaming == "# B"
+    assert all(isinstance(f, OutputField) for f in fields)
+    assert [f.path for f in fields] == ["output", "artifact.files[0]", "artifact.files[1]", "team.prompts[0]"]
+
+
+@pytest.mark.asyncio
+async def test_malformed_output_aborts_the_request(context):
+    agent = Agent(name="Writer", role="Writer", goal="Write", model="fake", system_prompt="", message_bus=None)
+    agent.llm = ChunkedLLM('{"output": "x", "artifact": {"task": "T1", "files": [{"name": "a.py"}]}, '
+                           '"reasoning": "' + "r" * 10000 + '"}')
+
+    with pytest.raises(JSONStreamError, match="artifact.files\\[0\\]"):
+        await agent.execute_task(context, context.plan.tasks[0])
+
+    assert agent.llm.closed
+    assert agent.llm.sent < 10
+
+
+@pytest.mark.asyncio
+async def test_raw_newlines_in_streamed_output_are_accepted(context):
+    agent = Agent(name="Writer", role="Writer", goal="Write", model="fake", system_prompt="", message_bus=None)
+    agent.llm = ChunkedLLM('{"output": "line1\nline2", "reasoning": "r"}', chunk_size=4)
+
+    result = await agent.execute_task(context, context.plan.tasks[0])
+
+    assert json.loads(result)["output"] == "line1\nline2"
@@ -0,0 +1,81 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from t20.core.agents.clients import get_client_registry
+from t20.core.agents.llm import Opi, iterate_blocking
+
+DELAY = 0.5
+
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    """Streams a two-chunk chat completion after a fixed delay."""
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        time.sleep(DELAY)
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        for text in ("hello ", "world"):
+            chunk = {
+                "id": "chatcmpl-1", "object": "chat.completion.chunk", "created": 0, "model": "stand-in",
+                "choices": [{"index": 0, "delta": {"content": text}, "finish_reason": None}],
+            }
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+        self.wfile.write(b"data: [DONE]\n\n")
+
+    def log_message(self, *args):
+        pass
+
+
+class StandInServer(ThreadingHTTPServer):
+    request_queue_size = 64
+
+
+@pytest.fixture
+def openai_server(monkeypatch):
+    server = StandInServer(("127.0.0.1", 0), FakeOpenAIHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setenv("OPENAI_API_BASE", f"http://127.0.0.1:{server.server_address[1]}/v1")
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    get_client_registry().configure(None)
+    yield server
+    server.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_openai_calls_overlap(openai_server):
+    llm = Opi(species="stand-in")
+    n = 10
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(llm.generate_content("stand-in", f"q{i}") for i in range(n)))
+    elapsed = time.perf_counter() - start
+
+    assert results == ["hello world"] * n
+    # Serialized calls would take n * DELAY; overlapping ones take about one DELAY.
+    assert elapsed < n * DELAY / 2
+
+
+@pytest.mark.asyncio
+async def test_blocking_iterators_do_not_block_the_loop():
+    def slow_stream():
+        for i in range(3):
+            time.sleep(0.1)
+            yield i
+
+    async def consume():
+        return [item async for item in iterate_blocking(slow_stream())]
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(consume() for _ in range(6)))
+    elapsed = time.perf_counter() - start
+
+    assert results == [[0, 1, 2]] * 6
+    assert elapsed < 6 * 0.3 / 2
@@ -0,0 +1,116 @@
+import os
+import shutil
+import tempfile
+
+import pytest
+
+from t20.core.agents.llm import LLM, register_provider
+from t20.core.agents.llm_cache import CachedLLM, ResponseCache, configure_response_cache, make_cache_key
+from t20.core.common.types import AgentOutput
+
+
+@register_provider("counting")
+class CountingLLM(LLM):
+
+    def __init__(self, response=None, species="fake-model"):
+        super().__init__(species)
+        self.calls = 0
+        self.response = response
+
+    async def generate_content(self, model_name, contents, system_instruction='', temperature=0.7,
+                               response_mime_type='text/plain', response_schema=None):
+        self.calls += 1
+        if self.response is not None:
+            return self.response
+        return f"answer to {contents}"
+
+
+@pytest.fixture
+def cache_dir():
+    temp_dir = tempfile.mkdtemp()
+    yield temp_dir
+    shutil.rmtree(temp_dir)
+
+
+def test_cache_key_is_stable_and_sensitive():
+    key = make_cache_key("gemini", "m", "sys", "hello", 0.0, "application/json", AgentOutput)
+    assert key == make_cache_key("gemini", "m", "sys", "hello", 0.0, "application/json", AgentOutput)
+    assert key != make_cache_key("gemini", "m", "sys", "hello", 0.1, "application/json", AgentOutput)
+    assert key != make_cache_key("gemini", "m", "sys", "hello", 0.0, "application/json", None)
+    assert key != make_cache_key("ollama", "m", "sys", "hello", 0.0, "application/json", AgentOutput)
+
+
+@pytest.mark.asyncio
+async def test_cached_llm_hits_and_bypass():
+    inner = CountingLLM()
+    llm = CachedLLM(inner, ResponseCache())
+
+    assert await llm.generate_content("m", "q") == "answer to q"
+    assert await llm.generate_content("m", "q") == "answer to q"
+    assert inner.calls == 1
+    assert llm.cache.stats.memory_hits == 1
+    assert llm.cache.stats.misses == 1
+
+    await llm.generate_content("m", "q", use_cache=False)
+    assert inner.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_streams_do_not_answer_structured_calls():
+    output = AgentOutput(output="done", reasoning="because")
+    llm = CachedLLM(CountingLLM(response=output), ResponseCache())
+
+    assert "".join([c async for c in llm.generate_stream("m", "q", response_schema=AgentOutput)]).startswith("{")
+    assert isinstance(await llm.generate_content("m", "q", response_schema=AgentOutput), AgentOutput)
+    assert llm.inner.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_use_cache_is_accepted_with_the_cache_disabled():
+    configure_response_cache({"enabled": False})
+    llm = LLM.factory("counting:m")
+
+    assert await llm.generate_content("m", "q", use_cache=False) == "answer to q"
+    assert "".join([c async for c in llm.generate_stream("m", "q", use_cache=False)]) == "answer to q"
+
+
+@pytest.mark.asyncio
+async def test_disk_tier_survives_restart_and_restores_models(cache_dir):
+    path = os.path.join(cache_dir, "cache.db")
+    output = AgentOutput(output="done", reasoning="because")
+
+    first = CachedLLM(CountingLLM(response=output), ResponseCache(disk_path=path))
+    await first.generate_content("m", "q", response_mime_type="application/json", response_schema=AgentOutput)
+
+    inner = CountingLLM(response=output)
+    second = CachedLLM(inner, ResponseCache(disk_path=path))
+    result = await second.generate_content("m", "q", response_mime_type="application/json", response_schema=AgentOutput)
+
+    assert inner.calls == 0
+    assert second.cache.stats.disk_hits == 1
+    assert isinstance(result, AgentOutput)
+    assert result == output
+
+
+def test_ttl_expiry(cache_dir, monkeypatch):
+    import t20.core.agents.llm_cache as llm_cache
+
+    now = [1000.0]
+    monkeypatch.setattr(llm_cache.time, "time", lambda: now[0])
+    cache = ResponseCache(disk_path=os.path.join(cache_dir, "cache.db"), ttl_seconds=10)
+    cache.set("k", "payload")
+    assert cache.get("k") == "payload"
+
+    now[0] += 11
+    assert cache.get("k") is None
+    assert cache.stats.misses == 1
+
+
+def test_disk_size_eviction(cache_dir):
+    cache = ResponseCache(memory_entries=1, disk_path=os.path.join(cache_dir, "cache.db"), max_disk_bytes=250)
+    for i in range(5):
+        cache.set(f"k{i}", "x" * 100)
+
+    assert cache.stats.evictions >= 3
+    assert cache.get("k4") == "x" * 100
+    assert cache.get("k0") is None
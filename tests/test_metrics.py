@@ -0,0 +1,109 @@
+import json
+import shutil
+import tempfile
+
+import pytest
+
+from t20.core.agents.agent import Agent
+from t20.core.agents.llm import LLM, report_usage
+from t20.core.agents.llm_cache import CachedLLM, ResponseCache
+from t20.core.agents.metrics import MeteredLLM, MetricsLedger, PricingTable, call_scope, configure_pricing
+from t20.core.agents.rate_limit import LimiterRegistry, RateLimitedLLM
+from t20.core.common.types import Plan, Role, Task
+from t20.core.data.db import SessionDB
+from t20.core.orchestration.orchestrator import Orchestrator
+from t20.core.system.session import Session
+from t20.core.system.system import System
+
+OUTPUT = json.dumps({"output": "done", "reasoning": "counted"})
+
+
+class CountingLLM(LLM):
+    provider_name = "fake"
+
+    def __init__(self, usage=None):
+        super().__init__("fake-model")
+        self.usage = usage
+
+    async def generate_content(self, model_name, contents, system_instruction='', temperature=0.7,
+                               response_mime_type='text/plain', response_schema=None):
+        if self.usage:
+            report_usage(*self.usage)
+        return OUTPUT
+
+
+@pytest.fixture
+def pricing():
+    configure_pricing({"fake": {"input_per_mtok": 1.0, "output_per_mtok": 4.0}})
+    yield
+    configure_pricing(None)
+
+
+def test_pricing_resolves_most_specific_key():
+    table = PricingTable({"default": {"input_per_mtok": 1.0}, "gemini:gemini-2.5-pro": {"input_per_mtok": 2.0}})
+    assert table.cost("gemini", "gemini-2.5-pro", 1_000_000, 0) == 2.0
+    assert table.cost("ollama", "llama3", 1_000_000, 1_000_000) == 1.0
+
+
+@pytest.mark.asyncio
+async def test_records_reported_usage_and_cost(pricing):
+    ledger = MetricsLedger()
+    llm = MeteredLLM(RateLimitedLLM(CountingLLM(usage=(1000, 250)), LimiterRegistry()))
+
+    with call_scope(ledger, agent="Writer", task_id="T1"):
+        assert await llm.generate_content("fake-model", "q") == OUTPUT
+
+    [record] = ledger.for_task("T1")
+    assert record.agent == "Writer" and record.provider == "fake" and record.model == "fake-model"
+    assert (record.input_tokens, record.output_tokens, record.tokens_reported) == (1000, 250, True)
+    assert record.cost == pytest.approx((1000 * 1.0 + 250 * 4.0) / 1_000_000)
+    assert record.time_to_first_token is not None and record.latency >= record.queue_wait >= 0
+
+
+@pytest.mark.asyncio
+async def test_estimates_tokens_and_marks_cache_hits(pricing):
+    ledger = MetricsLedger()
+    llm = MeteredLLM(CachedLLM(CountingLLM(), ResponseCache()))
+
+    with call_scope(ledger, agent="Writer", task_id="T1"):
+        [chunk async for chunk in llm.generate_stream("fake-model", "q" * 400)]
+        chunks = [chunk async for chunk in llm.generate_stream("fake-model", "q" * 400)]
+
+    first, second = ledger.records
+    assert not first.tokens_reported and first.input_tokens == 100 and first.output_tokens > 0
+    assert first.cost > 0
+    assert second.streamed and second.cache_hit and second.cost == 0.0
+    assert chunks == [OUTPUT]
+    assert ledger.summary()["totals"]["cache_hits"] == 1
+
+
+@pytest.fixture
+def project_root():
+    SessionDB._reset_instance()
+    temp_dir = tempfile.mkdtemp()
+    yield temp_dir
+    SessionDB._reset_instance()
+    shutil.rmtree(temp_dir)
+
+
+@pytest.mark.asyncio
+async def test_system_run_writes_metrics_artifacts(project_root):
+    system = System(root_dir=project_root)
+    writer = Agent(name="Writer", role="Writer", goal="Write", model="fake", system_prompt="",
+                   message_bus=system.message_bus)
+    writer.llm = MeteredLLM(CountingLLM(usage=(10, 5)))
+    system.orchestrator = Orchestrator(name="Boss", role="Orchestrator", goal="Plan", model="fake",
+                                       system_prompt="", message_bus=system.message_bus)
+    system.orchestrator.team = {"Writer": writer}
+    system.agents = [system.orchestrator, writer]
+    system.session = Session(agents=system.agents, project_root=project_root)
+    plan = Plan(high_level_goal="Goal", reasoning="r", roles=[Role(title="Writer", purpose="p")],
+                tasks=[Task(id="T1", description="Write", role="Writer", agent="Writer", deps=[])])
+
+    [_ async for _ in system.run(plan)]
+
+    summary = system.session.get_artifact("metrics.json")
+    assert summary["by_agent"]["Writer"]["input_tokens"] == 10
+    assert summary["by_task"]["T1"]["calls"] == 1
+    task_records = system.session.get_artifact("__step_T1_metrics.json")
+    assert task_records[0]["output_tokens"] == 5
@@ -0,0 +1,123 @@
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+
+import pytest
+
+from t20.core.agents.agent import Agent
+from t20.core.agents.llm import LLM, register_provider
+from t20.core.agents.model_routing import ModelRouting, action_verb, configure_model_routing
+from t20.core.common.types import Plan, Role, Task
+from t20.core.data.db import SessionDB
+from t20.core.orchestration.orchestrator import Orchestrator
+from t20.core.system.session import ExecutionContext, Session
+from t20.core.system.system import System
+
+RULES = [
+    {"when": {"action": "summari[sz]e|review", "max_prompt_tokens": 1000}, "model": "routed:small"},
+    {"when": {"role": "coder", "min_prompt_tokens": 1000}, "model": "routed:large"},
+]
+CALLS = []
+
+
+@register_provider("routed")
+class RoutedLLM(LLM):
+    async def generate_content(self, model_name, contents, *args, **kwargs):
+        CALLS.append(model_name)
+        return json.dumps({"output": model_name})
+
+    async def generate_stream(self, model_name, contents, *args, **kwargs):
+        yield await self.generate_content(model_name, contents)
+
+
+def task(description, role="Writer"):
+    return Task(id="T1", description=description, role=role, agent="Writer", deps=[])
+
+
+def test_first_matching_rule_picks_the_model():
+    routing = ModelRouting(RULES)
+
+    assert action_verb(task("Summarize: the findings")) == "summarize"
+    assert routing.model_for("Writer", task("Summarize the findings"), 200) == "routed:small"
+    assert routing.model_for("Writer", task("Summarize the findings"), 5000) is None
+    assert routing.model_for("Kodax", task("Implement the parser", role="Coder"), 5000) == "routed:large"
+    assert routing.model_for("Kodax", task("Implement the parser", role="Coder"), 200) is None
+    with pytest.raises(ValueError):
+        ModelRouting([{"when": {"size": 1}, "model": "x"}])
+
+
+@pytest.mark.asyncio
+async def test_agent_runs_routed_tasks_on_the_routed_model():
+    SessionDB._reset_instance()
+    CALLS.clear()
+    temp_dir = tempfile.mkdtemp()
+    configure_model_routing(RULES)
+    try:
+        plan = Plan(high_level_goal="Goal", reasoning="r", roles=[Role(title="Writer", purpose="p")],
+                    tasks=[task("Review the draft"), task("Write the draft")])
+        context = ExecutionContext(session=Session(project_root=temp_dir), plan=plan)
+        agent = Agent(name="Writer", role="Writer", goal="Write", model="routed:default", system_prompt="",
+                      message_bus=None)
+
+        assert json.loads(await agent.execute_task(context, plan.tasks[0]))["output"] == "routed:small"
+        assert json.loads(await agent.execute_task(context, plan.tasks[1]))["output"] == "routed:default"
+        assert CALLS == ["routed:small", "routed:default"]
+    finally:
+        configure_model_routing(None)
+        SessionDB._reset_instance()
+        shutil.rmtree(temp_dir)
+
+
+class OverlapSystem(System):
+    """Tracks how many tasks run at the same time."""
+
+    running = peak = 0
+
+    async def _execute_task(self, task, context, stream=False):
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        await asyncio.sleep(0.01)
+        self.running -= 1
+        return task.id
+
+
+@pytest.mark.asyncio
+async def test_model_caps_apply_to_the_routed_model():
+    SessionDB._reset_instance()
+    temp_dir = tempfile.mkdtemp()
+    configure_model_routing(RULES)
+    try:
+        system = OverlapSystem(root_dir=temp_dir)
+        system.session = Session(project_root=temp_dir)
+        system.orchestrator = Orchestrator(name="Lead", role="Orchestrator", goal="", model="routed:default",
+                                           system_prompt="", message_bus=system.message_bus)
+        system.agents = [Agent(name="Writer", role="Writer", goal="Write", model="routed:default", system_prompt="",
+                               message_bus=system.message_bus)]
+        system.concurrency.update(models={"routed:small": 1})
+        tasks = [Task(id=f"T{i}", description="Review the draft", role="Writer", agent="Writer", deps=[])
+                 for i in range(4)]
+        plan = Plan(high_level_goal="Goal", reasoning="r", roles=[Role(title="Writer", purpose="p")], tasks=tasks)
+
+        assert len([result async for result in system.run(plan)]) == 4
+        assert system.peak == 1
+    finally:
+        configure_model_routing(None)
+        SessionDB._reset_instance()
+        shutil.rmtree(temp_dir)
+
+
+def test_agent_templates_keep_their_own_model():
+    agents_dir = tempfile.mkdtemp()
+    try:
+        with open(os.path.join(agents_dir, "a.yaml"), "w") as f:
+            f.write("name: A\nrole: Writer\nmodel: gemini-2.5-pro\n")
+        with open(os.path.join(agents_dir, "b.yaml"), "w") as f:
+            f.write("name: B\nrole: Writer\n")
+
+        templates = System(root_dir=agents_dir)._load_agent_templates(agents_dir, {}, "ollama:llama3")
+
+        assert {t["name"]: t["model"] for t in templates} == {"A": "gemini-2.5-pro", "B": "ollama:llama3"}
+    finally:
+        shutil.rmtree(agents_dir)
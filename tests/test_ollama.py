@@ -0,0 +1,103 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from pydantic import BaseModel
+
+from t20.core.agents.clients import get_client_registry
+from t20.core.agents.llm import LLM
+from t20.core.agents.providers.ollama_config import configure_ollama
+from t20.core.agents.rate_limit import get_limiter_registry
+
+
+class Answer(BaseModel):
+    output: str
+
+
+class FakeOllama(BaseHTTPRequestHandler):
+    """A stand-in for an Ollama server: records request bodies and the peak of concurrent chat requests."""
+
+    requests = []
+    in_flight = 0
+    max_in_flight = 0
+    lock = threading.Lock()
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        type(self).requests.append((self.path, body))
+        if self.path == "/api/generate":
+            self._send({"model": body["model"], "response": "", "done": True})
+            return
+        with self.lock:
+            type(self).in_flight += 1
+            type(self).max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(0.1)
+        with self.lock:
+            type(self).in_flight -= 1
+        content = json.dumps({"output": "ok"}) if body.get("format") else "plain"
+        self._send({"model": body["model"], "message": {"role": "assistant", "content": content}, "done": False},
+                   {"model": body["model"], "message": {"role": "assistant", "content": ""}, "done": True,
+                    "prompt_eval_count": 5, "eval_count": 3})
+
+    def _send(self, *lines):
+        payload = "".join(json.dumps(line) + "\n" for line in lines).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    FakeOllama.requests, FakeOllama.max_in_flight = [], 0
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), FakeOllama)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    get_limiter_registry().configure(None)
+    get_client_registry().configure(None)
+    configure_ollama({"host": f"http://127.0.0.1:{httpd.server_address[1]}", "keep_alive": "10m", "parallel": 2})
+    yield FakeOllama
+    configure_ollama(None)
+    get_limiter_registry().configure(None)
+    get_client_registry().configure(None)
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.mark.asyncio
+async def test_warm_up_preloads_the_model(server):
+    await LLM.factory("ollama:tiny").warm()
+
+    assert server.requests == [("/api/generate", {"model": "tiny", "keep_alive": "10m", "stream": False})]
+
+
+@pytest.mark.asyncio
+async def test_requests_keep_the_model_loaded_and_send_the_schema(server):
+    llm = LLM.factory("ollama:tiny")
+
+    structured = await llm.generate_content("tiny", "q1", response_mime_type="application/json",
+                                            response_schema=Answer)
+    plain = await llm.generate_content("tiny", "q2")
+
+    assert structured.output == "ok" and plain == "plain"
+    (_, with_schema), (_, without_schema) = server.requests
+    assert with_schema["format"] == Answer.model_json_schema() and with_schema["keep_alive"] == "10m"
+    assert "format" not in without_schema and without_schema["keep_alive"] == "10m"
+
+
+@pytest.mark.asyncio
+async def test_calls_beyond_the_parallel_slots_wait_locally(server):
+    llm = LLM.factory("ollama:tiny")
+
+    results = await asyncio.gather(*(llm.generate_content("tiny", f"q{i}") for i in range(5)))
+
+    assert results == ["plain"] * 5
+    assert server.max_in_flight == 2
+    assert get_limiter_registry().metrics()["ollama:tiny"]["max_wait_seconds"] > 0
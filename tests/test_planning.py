@@ -0,0 +1,65 @@
+import shutil
+import tempfile
+
+import pytest
+
+from t20.core.agents.agent import Agent
+from t20.core.agents.llm import LLM
+from t20.core.common.types import Plan, Role, Task
+from t20.core.data.db import SessionDB
+from t20.core.orchestration.orchestrator import Orchestrator
+from t20.core.system.session import Session
+
+PLAN = Plan(high_level_goal="Goal", reasoning="Split into one writing step.",
+            roles=[Role(title="Writer", purpose="p")],
+            tasks=[Task(id="T1", description="Write", role="Writer", agent="Writer", deps=[])])
+
+
+class PlanningLLM(LLM):
+    provider_name = "fake"
+
+    def __init__(self):
+        super().__init__("fake-model")
+        self.calls = 0
+
+    async def generate_content(self, model_name, contents, system_instruction='', temperature=0.7,
+                               response_mime_type='text/plain', response_schema=None):
+        self.calls += 1
+        return PLAN if response_schema is Plan else "Free-text plan."
+
+
+@pytest.fixture
+def session():
+    SessionDB._reset_instance()
+    temp_dir = tempfile.mkdtemp()
+    yield Session(project_root=temp_dir)
+    SessionDB._reset_instance()
+    shutil.rmtree(temp_dir)
+
+
+def make_orchestrator(mode):
+    orchestrator = Orchestrator(name="Boss", role="Orchestrator", goal="Plan", model="fake", system_prompt="", message_bus=None)
+    orchestrator.llm = PlanningLLM()
+    orchestrator.planning_mode = mode
+    orchestrator.team = {"Writer": Agent(name="Writer", role="Writer", goal="Write", model="fake", system_prompt="", message_bus=None)}
+    return orchestrator
+
+
+async def plan_rounds(orchestrator, session, rounds=5):
+    for _ in range(rounds):
+        plan = await orchestrator.generate_plan(session, "Goal")
+    return plan
+
+
+@pytest.mark.asyncio
+async def test_single_pass_planning_halves_calls(session):
+    # Latencies are compared by benchmarks/planning_latency.py.
+    single, verbose = make_orchestrator("single"), make_orchestrator("verbose")
+
+    single_plan = await plan_rounds(single, session)
+    assert session.get_artifact("planning_response.txt") == PLAN.reasoning
+    verbose_plan = await plan_rounds(verbose, session)
+    assert session.get_artifact("planning_response.txt") == "Free-text plan."
+
+    assert single_plan == verbose_plan == PLAN
+    assert single.llm.calls == 5 and verbose.llm.calls == 10
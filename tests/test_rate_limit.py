@@ -0,0 +1,76 @@
+import asyncio
+import time
+
+import pytest
+
+from t20.core.agents.llm import LLM
+from t20.core.agents.rate_limit import LimiterRegistry, ProviderLimiter, RateLimitedLLM
+
+
+class SlowLLM(LLM):
+    provider_name = "fake"
+
+    def __init__(self):
+        super().__init__("fake-model")
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def generate_content(self, model_name, contents, system_instruction='', temperature=0.7,
+                               response_mime_type='text/plain', response_schema=None):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.05)
+        self.in_flight -= 1
+        return "ok"
+
+
+def test_limits_resolve_from_most_specific_key():
+    registry = LimiterRegistry()
+    registry.configure({"default": {"max_concurrent": 8}, "gemini": {"rpm": 30}})
+    registry.set_limits("gemini:gemini-2.5-pro", {"max_concurrent": 1})
+
+    pro = registry.get("gemini", "gemini-2.5-pro")
+    flash = registry.get("gemini", "gemini-2.5-flash")
+
+    assert pro.max_concurrent == 1 and pro.requests_bucket is not None
+    assert flash.max_concurrent == 8 and flash.requests_bucket is not None
+    assert registry.get("ollama", "llama3").requests_bucket is None
+
+
+@pytest.mark.asyncio
+async def test_concurrency_cap_and_queue_metrics():
+    registry = LimiterRegistry()
+    registry.configure({"fake": {"max_concurrent": 2}})
+    inner = SlowLLM()
+    llm = RateLimitedLLM(inner, registry)
+
+    await asyncio.gather(*(llm.generate_content("fake-model", "q") for _ in range(6)))
+
+    metrics = registry.metrics()["fake:fake-model"]
+    assert inner.max_in_flight == 2
+    assert metrics["requests"] == 6
+    assert metrics["queue_depth"] == 0
+    assert metrics["max_wait_seconds"] > 0
+
+
+@pytest.mark.asyncio
+async def test_requests_per_minute_bucket_spaces_requests():
+    limiter = ProviderLimiter("fake:m", rpm=1200, burst=1)  # one request every 50ms
+
+    async def call():
+        async with limiter.acquire():
+            pass
+
+    start = time.monotonic()
+    await asyncio.gather(*(call() for _ in range(5)))
+    assert time.monotonic() - start >= 0.19
+
+
+@pytest.mark.asyncio
+async def test_tokens_per_minute_bucket_charges_output():
+    limiter = ProviderLimiter("fake:m", tpm=60000)  # 1000 tokens per second
+    async with limiter.acquire(tokens=100):
+        pass
+    limiter.record_output(60000)
+
+    assert limiter.tokens_bucket.delay_for(100) > 0
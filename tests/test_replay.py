@@ -0,0 +1,97 @@
+import shutil
+import tempfile
+
+import pytest
+from pydantic import BaseModel
+
+from t20.core.agents.llm import LLM, register_provider
+from t20.core.agents.replay import ReplayLLM, ReplayMissError, ReplayStore, start_recording, start_replay, stop_recording
+from t20.core.agents.token_budget import configure_token_budget
+from t20.core.data.db import SessionDB
+from t20.core.system.session import Session
+
+
+class Answer(BaseModel):
+    text: str
+
+
+@register_provider("scripted")
+class ScriptedLLM(LLM):
+    calls = 0
+
+    async def generate_content(self, model_name, contents, system_instruction='', temperature=0.7,
+                               response_mime_type='text/plain', response_schema=None):
+        ScriptedLLM.calls += 1
+        if response_schema is Answer:
+            return Answer(text=contents)
+        return f"{contents} #{ScriptedLLM.calls}"
+
+
+@pytest.fixture
+def session():
+    SessionDB._reset_instance()
+    temp_dir = tempfile.mkdtemp()
+    yield Session(project_root=temp_dir)
+    stop_recording()
+    start_replay(None)
+    SessionDB._reset_instance()
+    shutil.rmtree(temp_dir)
+
+
+@pytest.mark.asyncio
+async def test_recorded_run_replays_without_calling_the_model(session):
+    start_recording(session)
+    live = LLM.factory("scripted:m")
+    recorded = [
+        await live.generate_content("scripted:m", "q", "sys"),
+        await live.generate_content("scripted:m", "q", "sys"),
+        await live.generate_content("scripted:m", "q", "sys", response_schema=Answer),
+        "".join([chunk async for chunk in live.generate_stream("scripted:m", "s")]),
+    ]
+    stop_recording()
+    calls = ScriptedLLM.calls
+
+    start_replay(ReplayStore.from_session(session._db, session.session_id))
+    replay = LLM.factory("replay:scripted:m")
+    replayed = [
+        await replay.generate_content("scripted:m", "q", "sys"),
+        await replay.generate_content("scripted:m", "q", "sys"),
+        await replay.generate_content("scripted:m", "q", "sys", response_schema=Answer),
+        "".join([chunk async for chunk in replay.generate_stream("scripted:m", "s")]),
+    ]
+
+    assert replayed == recorded
+    assert recorded[:2] == ["q #1", "q #2"] and recorded[2] == Answer(text="q")
+    assert ScriptedLLM.calls == calls
+    # Repeating a request beyond the recording reuses its last response.
+    assert await replay.generate_content("scripted:m", "q", "sys") == "q #2"
+
+
+@pytest.mark.asyncio
+async def test_unrecorded_requests_are_reported(session):
+    with pytest.raises(ValueError):
+        ReplayStore.from_session(session._db, session.session_id)
+
+    store = ReplayStore("other", {})
+    with pytest.raises(ReplayMissError):
+        await ReplayLLM("scripted:m", store).generate_content("scripted:m", "never asked")
+    assert store.misses == 1
+
+
+@pytest.mark.asyncio
+async def test_compacted_prompts_replay(session):
+    configure_token_budget({"context_windows": {"default": 400}, "min_output_tokens": 100})
+    try:
+        prompt = "Goal. " + "lorem ipsum dolor " * 200 + "Instructions."
+        start_recording(session)
+        recorded = await LLM.factory("scripted:m").generate_content("scripted:m", prompt)
+        stop_recording()
+        assert "omitted" in recorded
+
+        store = ReplayStore.from_session(session._db, session.session_id)
+        start_replay(store)
+        replay = LLM.factory("replay:scripted:m")
+        assert await replay.generate_content("scripted:m", prompt) == recorded
+        assert store.misses == 0
+    finally:
+        configure_token_budget(None)
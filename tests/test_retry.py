@@ -0,0 +1,130 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+import t20.core.agents.retry as retry
+from t20.core.agents.llm import LLM, EmptyResponseError
+from t20.core.agents.retry import RetryEvent, RetryingLLM, RetryPolicy, retry_after_of
+from t20.core.system.message_bus import MessageBus
+
+
+class HttpError(Exception):
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+class FlakyLLM(LLM):
+    provider_name = "fake"
+
+    def __init__(self, errors):
+        super().__init__("fake-model")
+        self.errors = list(errors)
+        self.calls = 0
+
+    async def generate_content(self, model_name, contents, system_instruction='', temperature=0.7,
+                               response_mime_type='text/plain', response_schema=None):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return "ok"
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    recorded = []
+
+    async def fake_sleep(delay):
+        recorded.append(delay)
+
+    monkeypatch.setattr(retry.asyncio, "sleep", fake_sleep)
+    return recorded
+
+
+def test_error_classification():
+    policy = RetryPolicy()
+    assert policy.is_retryable(HttpError(429))
+    assert policy.is_retryable(HttpError(503))
+    assert policy.is_retryable(EmptyResponseError("empty"))
+    assert policy.is_retryable(TimeoutError())
+    assert policy.is_retryable(httpx.ConnectError("refused"))
+    assert policy.is_retryable(httpx.RemoteProtocolError("peer closed connection"))
+    assert policy.is_retryable(httpx.ReadTimeout("slow"))
+    assert not policy.is_retryable(HttpError(400))
+    assert not policy.is_retryable(ValueError("bad schema"))
+
+
+def test_retry_after_hints():
+    assert retry_after_of(HttpError(429, {"retry-after": "7"})) == 7.0
+    assert retry_after_of(HttpError(429, {"retry-after-ms": "250"})) == 0.25
+    assert retry_after_of(HttpError(500)) is None
+
+
+@pytest.mark.asyncio
+async def test_retries_with_backoff_and_publishes_events(sleeps):
+    bus = MessageBus()
+    events = []
+    bus.subscribe("llm_retry", events.append)
+    inner = FlakyLLM([HttpError(503), HttpError(429, {"retry-after": "3"})])
+    llm = RetryingLLM(inner, RetryPolicy(max_attempts=5, base_delay=0.5, max_delay=10), message_bus=bus)
+
+    assert await llm.generate_content("fake-model", "q") == "ok"
+    assert inner.calls == 3
+    assert 0.5 <= sleeps[0] <= 1.5
+    assert sleeps[1] == 3.0
+    assert [e.attempt for e in events] == [2, 3]
+    assert all(isinstance(e, RetryEvent) for e in events)
+
+
+@pytest.mark.asyncio
+async def test_fatal_errors_are_not_retried(sleeps):
+    inner = FlakyLLM([HttpError(400)])
+    llm = RetryingLLM(inner, RetryPolicy())
+
+    assert await llm.generate_content("fake-model", "q") is None
+    assert inner.calls == 1
+    assert sleeps == []
+
+
+@pytest.mark.asyncio
+async def test_attempt_budget_and_deadline(sleeps):
+    inner = FlakyLLM([HttpError(503)] * 10)
+    assert await RetryingLLM(inner, RetryPolicy(max_attempts=3, base_delay=0.1)).generate_content("m", "q") is None
+    assert inner.calls == 3
+
+    inner = FlakyLLM([HttpError(429, {"retry-after": "120"})])
+    assert await RetryingLLM(inner, RetryPolicy(deadline=60)).generate_content("m", "q") is None
+    assert inner.calls == 1
+
+
+class HangingLLM(LLM):
+    provider_name = "fake"
+
+    def __init__(self):
+        super().__init__("fake-model")
+        self.calls = 0
+
+    async def generate_content(self, *args, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(10)
+        return "late"
+
+    async def generate_stream(self, *args, **kwargs):
+        yield await self.generate_content(*args, **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_hung_attempts_are_cut_off_at_the_deadline():
+    policy = RetryPolicy(max_attempts=5, base_delay=0.01, max_delay=0.01, deadline=0.2)
+    inner = HangingLLM()
+    started = time.monotonic()
+    assert await RetryingLLM(inner, policy).generate_content("m", "q") is None
+    assert time.monotonic() - started < 1
+    assert inner.calls == 1
+
+    started = time.monotonic()
+    assert [chunk async for chunk in RetryingLLM(HangingLLM(), policy).generate_stream("m", "q")] == []
+    assert time.monotonic() - started < 1
@@ -0,0 +1,90 @@
+import asyncio
+
+import pytest
+
+from t20.core.agents.llm import LLM
+from t20.core.agents.router import RouterConfig, RouterLLM, configure_router
+
+
+class TimedLLM(LLM):
+    provider_name = "fake"
+
+    def __init__(self, species, delay=0.0, fail=False):
+        super().__init__(species)
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+
+    async def generate_content(self, model_name, contents, system_instruction='', temperature=0.7,
+                               response_mime_type='text/plain', response_schema=None):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise ConnectionError(f"{self.species} is down")
+        return self.species
+
+
+@pytest.fixture(autouse=True)
+def fresh_stats():
+    configure_router(None)
+    yield
+    configure_router(None)
+
+
+@pytest.mark.asyncio
+async def test_routes_to_fastest_backend():
+    slow, fast = TimedLLM("slow", delay=0.05), TimedLLM("fast", delay=0.01)
+    router = RouterLLM("slow,fast", [slow, fast], RouterConfig(hedge=False))
+
+    # The first calls measure each backend; afterwards the fastest one wins.
+    await router.generate_content("m", "q")
+    await router.generate_content("m", "q")
+    results = [await router.generate_content("m", "q") for _ in range(3)]
+
+    assert results == ["fast"] * 3
+    assert router.ranked()[0] is fast
+
+
+@pytest.mark.asyncio
+async def test_hedges_slow_calls():
+    stalled, backup = TimedLLM("stalled", delay=5.0), TimedLLM("backup", delay=0.01)
+    router = RouterLLM("stalled,backup", [stalled, backup], RouterConfig(hedge_min_delay=0.05, hedge_cold_delay=0.05))
+
+    result = await asyncio.wait_for(router.generate_content("m", "q"), timeout=1.0)
+
+    assert result == "backup"
+    assert stalled.calls == 1 and backup.calls == 1
+    # The cancelled hedge loser is not counted as a failure.
+    assert router.stats(stalled).error_rate == 0.0
+
+
+def test_hedge_delay_is_conservative_until_latencies_are_known():
+    backend = TimedLLM("cold")
+    router = RouterLLM("cold", [backend], RouterConfig(hedge_min_delay=0.5, min_samples=3))
+
+    assert router.hedge_delay(backend) == 10.0
+    for latency in (1.0, 2.0, 3.0):
+        router.stats(backend).record(latency, ok=True)
+    assert router.hedge_delay(backend) == 3.0
+
+
+@pytest.mark.asyncio
+async def test_fails_over_and_demotes_unhealthy_backends():
+    down, up = TimedLLM("down", fail=True), TimedLLM("up")
+    router = RouterLLM("down,up", [down, up], RouterConfig(hedge=False, min_samples=2))
+
+    assert await router.generate_content("m", "q") == "up"
+    assert await router.generate_content("m", "q") == "up"
+    assert router.ranked() == [up, down]
+
+    router = RouterLLM("down", [TimedLLM("down", fail=True)], RouterConfig(hedge=False))
+    with pytest.raises(ConnectionError):
+        await router.generate_content("m", "q")
+
+
+def test_factory_builds_router_species():
+    llm = LLM.factory("router:ollama:llama3,opi:gpt-4o-mini")
+
+    while not isinstance(llm, RouterLLM):
+        llm = llm.inner
+    assert [(b.provider_name, b.species) for b in llm.backends] == [("ollama", "llama3"), ("opi", "gpt-4o-mini")]
@@ -0,0 +1,90 @@
+import asyncio
+
+import pytest
+
+from t20.core.agents.llm import LLM
+from t20.core.agents.single_flight import SingleFlight, SingleFlightLLM
+from t20.core.common.types import AgentOutput
+
+
+class SlowLLM(LLM):
+    provider_name = "fake"
+
+    def __init__(self, error=None):
+        super().__init__("fake-model")
+        self.calls = 0
+        self.error = error
+
+    async def generate_content(self, model_name, contents, system_instruction='', temperature=0.7,
+                               response_mime_type='text/plain', response_schema=None):
+        self.calls += 1
+        await asyncio.sleep(0.05)
+        if self.error:
+            raise self.error
+        if response_schema:
+            return AgentOutput(output=contents)
+        return f"answer to {contents}"
+
+
+@pytest.mark.asyncio
+async def test_identical_concurrent_calls_share_one_provider_call():
+    group = SingleFlight()
+    inner = SlowLLM()
+    llm = SingleFlightLLM(inner, group)
+
+    results = await asyncio.gather(*(llm.generate_content("m", "q") for _ in range(5)),
+                                   llm.generate_content("m", "other"))
+
+    assert results[:5] == ["answer to q"] * 5
+    assert results[5] == "answer to other"
+    assert inner.calls == 2
+    assert group.coalesced == 4
+    assert group.in_flight() == 0
+
+    await llm.generate_content("m", "q")
+    assert inner.calls == 3
+
+
+@pytest.mark.asyncio
+async def test_followers_get_independent_copies_and_errors():
+    llm = SingleFlightLLM(SlowLLM(), SingleFlight())
+    first, second = await asyncio.gather(*(llm.generate_content("m", "q", response_schema=AgentOutput) for _ in range(2)))
+    assert first == second and first is not second
+
+    failing = SingleFlightLLM(SlowLLM(error=RuntimeError("boom")), SingleFlight())
+    results = await asyncio.gather(*(failing.generate_content("m", "q") for _ in range(3)), return_exceptions=True)
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_cancel_shared_call():
+    inner = SlowLLM()
+    llm = SingleFlightLLM(inner, SingleFlight())
+
+    leader = asyncio.ensure_future(llm.generate_content("m", "q"))
+    follower = asyncio.ensure_future(llm.generate_content("m", "q"))
+    await asyncio.sleep(0)
+    leader.cancel()
+
+    assert await follower == "answer to q"
+    assert inner.calls == 1
+
+
+class OptionsLLM(SlowLLM):
+    async def generate_content(self, model_name, contents, system_instruction='', temperature=0.7,
+                               response_mime_type='text/plain', response_schema=None, **options):
+        answer = await super().generate_content(model_name, contents, system_instruction, temperature,
+                                                response_mime_type, response_schema)
+        return f"{answer} {options}"
+
+
+@pytest.mark.asyncio
+async def test_extra_options_are_passed_on_and_part_of_the_key():
+    inner = OptionsLLM()
+    llm = SingleFlightLLM(inner, SingleFlight())
+
+    results = await asyncio.gather(llm.generate_content("m", "q", seed=1), llm.generate_content("m", "q", seed=1),
+                                   llm.generate_content("m", "q", seed=2))
+
+    assert results == ["answer to q {'seed': 1}"] * 2 + ["answer to q {'seed': 2}"]
+    assert inner.calls == 2
@@ -0,0 +1,104 @@
+import json
+import shutil
+import tempfile
+
+import pytest
+
+from t20.core.agents.agent import Agent
+from t20.core.agents.llm import LLM
+from t20.core.agents.llm_cache import CachedLLM, ResponseCache
+from t20.core.agents.retry import RetryingLLM, RetryPolicy
+from t20.core.common.types import AgentOutput, Plan, Role, Task, TokenDelta
+from t20.core.data.db import SessionDB
+from t20.core.orchestration.orchestrator import Orchestrator
+from t20.core.system.session import Session
+from t20.core.system.system import System
+
+OUTPUT = json.dumps({"output": "done", "reasoning": "streamed"})
+
+
+class StreamingLLM(LLM):
+    provider_name = "fake"
+
+    def __init__(self, fail_first=0):
+        super().__init__("fake-model")
+        self.calls = 0
+        self.fail_first = fail_first
+
+    async def generate_content(self, model_name, contents, system_instruction='', temperature=0.7,
+                               response_mime_type='text/plain', response_schema=None):
+        return "".join([chunk async for chunk in self.generate_stream(model_name, contents)])
+
+    async def generate_stream(self, model_name, contents, system_instruction='', temperature=0.7,
+                              response_mime_type='text/plain', response_schema=None):
+        self.calls += 1
+        if self.calls <= self.fail_first:
+            raise TimeoutError("slow region")
+        for i in range(0, len(OUTPUT), 8):
+            yield OUTPUT[i:i + 8]
+
+
+@pytest.fixture
+def project_root():
+    SessionDB._reset_instance()
+    temp_dir = tempfile.mkdtemp()
+    yield temp_dir
+    SessionDB._reset_instance()
+    shutil.rmtree(temp_dir)
+
+
+def make_plan():
+    return Plan(high_level_goal="Goal", reasoning="r", roles=[Role(title="Writer", purpose="p")],
+                tasks=[Task(id="T1", description="Write", role="Writer", agent="Writer", deps=[])])
+
+
+@pytest.mark.asyncio
+async def test_cache_replays_streams_as_one_chunk():
+    inner = StreamingLLM()
+    llm = CachedLLM(inner, ResponseCache())
+
+    first = [chunk async for chunk in llm.generate_stream("m", "q")]
+    second = [chunk async for chunk in llm.generate_stream("m", "q")]
+
+    assert len(first) > 1
+    assert second == [OUTPUT]
+    assert inner.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_retry_before_first_chunk(monkeypatch):
+    import t20.core.agents.retry as retry
+
+    async def no_sleep(delay):
+        pass
+
+    monkeypatch.setattr(retry.asyncio, "sleep", no_sleep)
+    inner = StreamingLLM(fail_first=2)
+    llm = RetryingLLM(inner, RetryPolicy(max_attempts=3))
+
+    assert "".join([chunk async for chunk in llm.generate_stream("m", "q")]) == OUTPUT
+    assert inner.calls == 3
+
+
+@pytest.mark.asyncio
+async def test_system_run_publishes_token_deltas(project_root):
+    system = System(root_dir=project_root)
+    writer = Agent(name="Writer", role="Writer", goal="Write", model="fake", system_prompt="",
+                   message_bus=system.message_bus)
+    writer.llm = StreamingLLM()
+    system.orchestrator = Orchestrator(name="Boss", role="Orchestrator", goal="Plan", model="fake",
+                                       system_prompt="", message_bus=system.message_bus)
+    system.orchestrator.team = {"Writer": writer}
+    system.agents = [system.orchestrator, writer]
+    system.session = Session(agents=system.agents, project_root=project_root)
+
+    deltas = []
+    system.message_bus.subscribe("token_delta", deltas.append)
+
+    results = [result async for _, result in system.run(make_plan(), stream=True)]
+
+    assert results == [AgentOutput.model_validate_json(OUTPUT).model_dump_json()]
+    assert len(deltas) > 1
+    assert all(isinstance(d, TokenDelta) and d.task_id == "T1" for d in deltas)
+    assert [d.index for d in deltas] == list(range(len(deltas)))
+    assert "".join(d.text for d in deltas) == OUTPUT
@@ -0,0 +1,295 @@
+import asyncio
+import shutil
+import tempfile
+import time
+from collections import Counter
+
+import pytest
+
+from t20.core.agents.agent import Agent
+from t20.core.agents.llm import LLM, register_provider
+from t20.core.agents.retry import RetryPolicy
+from t20.core.common.types import AgentOutput, Plan, Prompt, Task, Team
+from t20.core.data.db import SessionDB
+from t20.core.orchestration.orchestrator import Orchestrator
+from t20.core.orchestration.task_manager import TaskManager, TaskStatus
+from t20.core.system.session import Session
+from t20.core.system.system import System
+
+
+def task(task_id, deps=(), subtasks=None, agent="A"):
+    return Task(id=task_id, description=task_id, role="R", agent=agent, deps=list(deps), subtasks=subtasks)
+
+
+def plan(*tasks):
+    return Plan(high_level_goal="Goal", reasoning="r", roles=[], tasks=list(tasks))
+
+
+def ids(tasks):
+    return [t.id for t in tasks]
+
+
+def test_completions_release_dependents_and_containers():
+    manager = TaskManager(plan(
+        task("A"),
+        task("P", deps=["A"], subtasks=[task("P.1"), task("P.2", deps=["P.1"])]),
+        task("B", deps=["P", "A"]),
+    ))
+
+    assert ids(manager.get_ready_tasks()) == ["A"]
+    assert ids(manager.get_ready_tasks()) == ["A"]  # still READY until it is started
+    manager.mark_running("A")
+    assert manager.get_ready_tasks() == []
+
+    manager.mark_completed("A", "a")
+    assert manager.task_states["P"] == TaskStatus.RUNNING
+    assert ids(manager.get_ready_tasks()) == ["P.1"]
+    manager.mark_completed("P.1", "p1")
+    assert ids(manager.get_ready_tasks()) == ["P.2"]
+    manager.mark_completed("P.2", "p2")
+
+    assert manager.task_states["P"] == TaskStatus.COMPLETED
+    assert ids(manager.get_ready_tasks()) == ["B"]
+    assert not manager.is_all_completed()
+    manager.mark_completed("B", "b")
+    assert manager.is_all_completed()
+
+
+def test_unknown_or_failed_dependencies_never_start():
+    manager = TaskManager(plan(task("A"), task("B", deps=["A"]), task("C", deps=["missing"])))
+
+    manager.mark_failed("A", "boom")
+
+    assert manager.get_ready_tasks() == []
+    assert manager.task_states["B"] == TaskStatus.BLOCKED
+    assert manager.task_states["C"] == TaskStatus.PENDING
+
+
+def failing_plan(policy):
+    optional = Task(id="P.3", description="P.3", role="R", agent="A", deps=[], optional=True)
+    manager = TaskManager(plan(
+        task("P", subtasks=[task("P.1"), task("P.2"), optional, task("P.4", deps=["P.1"])]),
+        task("after", deps=["P"]),
+        task("after.after", deps=["after"]),
+        task("other"),
+    ), failure_policy=policy)
+    for task_id in ("P.1", "P.2", "P.3", "other"):
+        manager.mark_running(task_id)
+    return manager
+
+
+def states(manager, *task_ids):
+    return [manager.task_states[task_id].value for task_id in task_ids]
+
+
+def test_failure_policies_block_what_can_no_longer_run():
+    manager = failing_plan("continue")
+    manager.mark_failed("P.3", "optional")
+    assert states(manager, "P", "after") == ["RUNNING", "PENDING"]
+    manager.mark_failed("P.1", "boom")
+    # The container keeps its running subtasks but is already known to fail.
+    assert states(manager, "P", "P.2", "P.4", "after", "after.after", "other") == [
+        "RUNNING", "RUNNING", "BLOCKED", "BLOCKED", "BLOCKED", "RUNNING"]
+    manager.mark_completed("P.2", "p2")
+    assert states(manager, "P") == ["FAILED"]
+    assert not manager.is_finished()
+    manager.mark_completed("other", "o")
+    assert manager.is_finished() and not manager.is_all_completed()
+
+    manager = failing_plan("skip_subtree")
+    manager.mark_failed("P.1", "boom")
+    assert states(manager, "P", "P.2", "P.3", "P.4", "after", "other") == [
+        "FAILED", "BLOCKED", "BLOCKED", "BLOCKED", "BLOCKED", "RUNNING"]
+
+    manager = failing_plan("fail_fast")
+    manager.mark_failed("P.3", "optional")
+    assert not manager.is_finished()
+    manager.mark_failed("P.1", "boom")
+    assert states(manager, "P", "P.2", "other") == ["BLOCKED", "BLOCKED", "BLOCKED"]
+    assert manager.is_finished()
+    with pytest.raises(ValueError):
+        TaskManager(plan(task("A")), failure_policy="ignore")
+
+
+@register_provider("instant")
+class InstantLLM(LLM):
+    async def generate_content(self, model_name, contents, *args, **kwargs):
+        return ""
+
+
+class InstantSystem(System):
+    async def _execute_task(self, task, context, stream=False):
+        return f"result of {task.id}"
+
+
+def instant_system(project_root, agents=("A",), system_class=InstantSystem):
+    system = system_class(root_dir=project_root)
+    system.session = Session(project_root=project_root)
+    system.orchestrator = Orchestrator(name="Lead", role="Orchestrator", goal="", model="instant:lead",
+                                       system_prompt="", message_bus=system.message_bus)
+    system.agents = [Agent(name=name, role="R", goal="", model=f"instant:{name.lower()}", system_prompt="",
+                           message_bus=system.message_bus) for name in agents]
+    return system
+
+
+@pytest.mark.asyncio
+async def test_run_yields_tasks_in_dependency_order():
+    SessionDB._reset_instance()
+    temp_dir = tempfile.mkdtemp()
+    try:
+        system = instant_system(temp_dir)
+        tasks = [task(f"T{i}", deps=[f"T{i - 1}"] if i else []) for i in range(50)]
+        tasks.append(task("P", subtasks=[task("P.1"), task("P.2")]))
+
+        results = [(t.id, result) async for t, result in system.run(plan(*tasks))]
+
+        assert [i for i, _ in results if i.startswith("T")] == [f"T{i}" for i in range(50)]
+        assert sorted(i for i, _ in results if i.startswith("P")) == ["P.1", "P.2"]
+        assert results[0][1] == "result of T0"
+    finally:
+        SessionDB._reset_instance()
+        shutil.rmtree(temp_dir)
+
+
+class GatedSystem(InstantSystem):
+    """Tasks run until the test opens the gate; records the peak of running tasks per agent."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.gate = asyncio.Event()
+        self.running = Counter()
+        self.peak = Counter()
+
+    async def _execute_task(self, task, context, stream=False):
+        for key in ("all", task.agent):
+            self.running[key] += 1
+            self.peak[key] = max(self.peak[key], self.running[key])
+        await self.gate.wait()
+        for key in ("all", task.agent):
+            self.running[key] -= 1
+        return await super()._execute_task(task, context, stream)
+
+
+@pytest.mark.asyncio
+async def test_caps_queue_tasks_and_can_be_raised_while_running():
+    SessionDB._reset_instance()
+    temp_dir = tempfile.mkdtemp()
+    try:
+        system = instant_system(temp_dir, agents=("A", "B"), system_class=GatedSystem)
+        system.concurrency.update(max_parallel_tasks=3, agents={"a": 1}, models={"instant:b": 2})
+        queued = []
+        system.message_bus.subscribe("task_queued", lambda t: queued.append(t.id))
+        tasks = [task(f"A{i}") for i in range(3)] + [task(f"B{i}", agent="B") for i in range(4)]
+
+        run = system.run(plan(*tasks))
+        first = asyncio.ensure_future(run.__anext__())
+        await asyncio.sleep(0.01)
+        assert (system.running["A"], system.running["B"], system.running["all"]) == (1, 2, 3)
+        assert sorted(queued) == ["A1", "A2", "B2", "B3"]
+
+        system.concurrency.update(max_parallel_tasks=None, agents={"a": None})
+        await asyncio.sleep(0.01)
+        assert (system.running["A"], system.running["B"]) == (3, 2)
+
+        system.gate.set()
+        results = [(await first)[0].id] + [t.id async for t, _ in run]
+        assert sorted(results) == sorted(t.id for t in tasks)
+        assert system.peak["B"] == 2
+        with pytest.raises(ValueError):
+            system.concurrency.update(max_parallel_tasks=0)
+    finally:
+        SessionDB._reset_instance()
+        shutil.rmtree(temp_dir)
+
+
+class FlakySystem(InstantSystem):
+    """Tasks fail on their first attempt; "slow" runs for a long time; "broken" always fails."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.attempts = Counter()
+
+    async def _execute_task(self, task, context, stream=False):
+        self.attempts[task.id] += 1
+        if task.id == "slow":
+            await asyncio.sleep(60)
+        if task.id == "broken" or self.attempts[task.id] == 1:
+            raise RuntimeError(f"{task.id} failed")
+        return await super()._execute_task(task, context, stream)
+
+
+@pytest.mark.asyncio
+async def test_failed_tasks_are_retried_and_fail_fast_cancels_running_tasks():
+    SessionDB._reset_instance()
+    temp_dir = tempfile.mkdtemp()
+    try:
+        system = instant_system(temp_dir, system_class=FlakySystem)
+        system.task_retry = RetryPolicy(max_attempts=2, base_delay=0.01, max_delay=0.01, deadline=None)
+        results = [(t.id, result) async for t, result in system.run(plan(task("A"), task("B", deps=["A"])))]
+        assert results == [("A", "result of A"), ("B", "result of B")]
+        assert system.attempts == {"A": 2, "B": 2}
+
+        system = instant_system(temp_dir, system_class=FlakySystem)
+        system.failure_policy = "fail_fast"
+        started = time.monotonic()
+        results = [t.id async for t, _ in system.run(plan(task("slow"), task("broken"), task("next", deps=["broken"])))]
+        assert results == ["broken"]
+        assert time.monotonic() - started < 5
+    finally:
+        SessionDB._reset_instance()
+        shutil.rmtree(temp_dir)
+
+
+class Crash(BaseException):
+    """Stands in for the process dying: not handled by System.run."""
+
+
+class CrashingSystem(InstantSystem):
+    """Remembers each result in the context; "B" crashes the process (the first time), "A" updates a prompt."""
+
+    crash = True
+
+    async def _execute_task(self, task, context, stream=False):
+        if task.id == "B" and self.crash:
+            raise Crash
+        seen = sorted(key for key in context.items if key.startswith("__step_"))
+        context.record_artifact("result.txt", f"{task.id} after {seen}", task, True)
+        if task.id == "A":
+            prompts = [Prompt(agent="A", role="R", system_prompt="Prompt set by A")]
+            return AgentOutput(output="a", team=Team(notes="", prompts=prompts)).model_dump_json()
+        return await super()._execute_task(task, context, stream)
+
+
+@pytest.mark.asyncio
+async def test_resume_runs_only_unfinished_tasks_with_the_restored_context():
+    SessionDB._reset_instance()
+    temp_dir = tempfile.mkdtemp()
+    try:
+        system = instant_system(temp_dir, system_class=CrashingSystem)
+        session_id = system.session.session_id
+        workflow = plan(task("A"), task("P", subtasks=[task("P.1")]), task("B", deps=["A"]), task("C", deps=["B"]))
+        system.session.add_artifact("initial_plan.json", workflow.model_dump())
+        with pytest.raises(Crash):
+            async for _ in system.run(workflow):
+                pass
+
+        SessionDB._reset_instance()
+        system = instant_system(temp_dir, system_class=CrashingSystem)
+        system.orchestrator.team = {agent.profile.name: agent for agent in system.agents}
+        system.crash = False
+        executed = []
+        async for t, _ in system.resume(session_id):
+            executed.append(t.id)
+
+        assert executed == ["B", "C"]
+        assert system.agents[0].system_instructions == "Prompt set by A"
+        assert system.session.session_id == session_id
+        states = system.session._db.get_task_states(session_id)
+        assert {task_id: state for task_id, (state, _) in states.items()} == dict.fromkeys(
+            ["A", "P", "P.1", "B", "C"], "COMPLETED")
+        items = dict((name, content) for name, content, _ in system.session._db.get_context_items(session_id))
+        assert items["__step_C_result.txt"] == "C after ['__step_A_result.txt', '__step_B_result.txt', '__step_P.1_result.txt']"
+        assert "files" in items
+    finally:
+        SessionDB._reset_instance()
+        shutil.rmtree(temp_dir)
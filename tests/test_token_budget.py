@@ -0,0 +1,74 @@
+import pytest
+
+from t20.core.agents.llm import DEFAULT_MAX_OUTPUT_TOKENS, LLM, max_output_tokens
+from t20.core.agents.metrics import MetricsLedger, call_scope
+from t20.core.agents.token_budget import (PromptTooLargeError, TokenBudget, TokenBudgetLLM, configure_token_budget,
+                                          count_tokens)
+
+
+class CapturingLLM(LLM):
+    provider_name = "fake"
+
+    def __init__(self, output):
+        super().__init__("fake-model")
+        self.output = output
+        self.requests = []
+
+    async def generate_content(self, model_name, contents, *args, **kwargs):
+        self.requests.append((contents, max_output_tokens()))
+        return self.output
+
+    async def generate_stream(self, model_name, contents, *args, **kwargs):
+        self.requests.append((contents, max_output_tokens()))
+        yield self.output
+
+
+@pytest.fixture
+def budget():
+    yield configure_token_budget({"context_windows": {"fake": 2000}, "min_output_tokens": 100,
+                                  "max_output_tokens": 1000, "headroom": 2.0, "min_samples": 2})
+    configure_token_budget(None)
+
+
+def test_count_tokens_approximates_tokenizers():
+    assert count_tokens("") == 0
+    assert count_tokens("Hello, world!") == 4
+    assert count_tokens("internationalization", "mistral") > count_tokens("internationalization", "opi")
+    assert count_tokens("x = [1, 2, 3]") == 9
+
+
+def test_oversized_prompts_are_compacted_or_rejected():
+    prompt = "GOAL " + "filler words " * 2000 + " INSTRUCTIONS"
+    budget = TokenBudget(context_windows={"default": 1000}, min_output_tokens=200)
+
+    contents, limit = budget.plan("fake", "m", "Writer", "system", prompt)
+
+    assert count_tokens(contents) <= 800 and limit == 200
+    assert contents.startswith("GOAL ") and contents.endswith(" INSTRUCTIONS") and "omitted" in contents
+    assert budget.plan("fake", "m", "Writer", "system", "short") == ("short", 998)
+    with pytest.raises(PromptTooLargeError):
+        TokenBudget(context_windows={"default": 1000}, on_oversize="reject").plan("fake", "m", "W", "", prompt)
+
+
+@pytest.mark.asyncio
+async def test_output_cap_adapts_to_the_agents_history(budget):
+    inner = CapturingLLM("word " * 150)
+    llm = TokenBudgetLLM(inner)
+
+    with call_scope(MetricsLedger(), agent="Writer", task_id="T1"):
+        for _ in range(3):
+            await llm.generate_content("fake-model", "q")
+        chunks = [chunk async for chunk in llm.generate_stream("fake-model", "q")]
+    await llm.generate_content("fake-model", "q")  # another key, no history yet
+
+    assert chunks == [inner.output]
+    assert [limit for _, limit in inner.requests] == [1000, 1000, 300, 300, 1000]
+    assert max_output_tokens() == DEFAULT_MAX_OUTPUT_TOKENS
+
+
+def test_output_that_hits_its_cap_raises_the_cap(budget):
+    budget.record_output("Writer", 100, limit=1000)
+    budget.record_output("Writer", 150, limit=1000)
+    assert budget.output_limit("Writer") == 300
+    budget.record_output("Writer", 300, limit=300)
+    assert budget.output_limit("Writer") == 1000
@@ -71,6 +71,11 @@ export function ExecutionConsole({ events, executionState }: { events: any[], ex
                 if (details.outputSummary) {
                     step.output = details.outputSummary;
                 }
+            } else if (type === 'TokenDelta') {
+                const step = stepsMap.get(details.stepId);
+                if (step && step.status === 'running') {
+                    step.output += details.text;
+                }
             } else if (type === 'StepCompleted') {
                 let step = stepsMap.get(details.stepId);
                 if (!step) {